@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+
+import os
+import copy
+import time
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pinch.overlap_and_svm import (
+    build_parser,
+    check_args,
+    parse_omicron_paths,
+    load_timeslides,
+    build_model_cache,
+    build_stage_cache,
+    write_checkpoint_report,
+    metrics_dir,
+    start_instrumentation,
+    run_ifo,
+)
+from pinch.utils.chunk_parse import ChunkParse
+from pinch.utils.segments import SegmentList
+from pinch.utils.trigger_io import TIO, BatchWriter, TABLE_EXTENSIONS
+from pinch.utils.duckdb_sink import DuckDBSink
+from pinch.utils import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# placeholder substituted with the chunk id in per-chunk input paths
+CHUNK_PLACEHOLDER = '{chunk}'
+
+# per-chunk directory of the typed tables jobs hand to the parent's DuckDB sink
+STAGING_DIR = 'duckdb_staging'
+STAGED_TABLES = ('clean', 'dirty', 'scored')
+
+
+def parse_args():
+    parser = build_parser(
+            description="Run the glitch overlap pipeline and SVM for every chunk of a chunk definition file in parallel")
+
+    parser.add_argument(
+            '--chunk-definition-file',
+            required=True,
+            help='Chunk definition file (.txt or .csv) listing chunk, start and end')
+    parser.add_argument('--chunks', nargs='+', help='Only run these chunks (default: all); merged outputs then cover only these chunks')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count(), help='Number of (chunk, IFO) jobs run at once')
+    parser.add_argument('--retries', type=int, default=1, help='Times a failed (chunk, IFO) job is rerun')
+    parser.add_argument(
+            '--no-merge',
+            action='store_true',
+            help='Keep only the per-chunk outputs and skip merging them')
+
+    return check_args(parser, parser.parse_args())
+
+
+class BatchJob:
+    """
+    One (chunk, IFO) run of the overlap pipeline and SVM.
+
+    Attributes:
+        chunk (str): Chunk id.
+        ifo (str): Interferometer.
+        start (float): Chunk start time.
+        end (float): Chunk end time.
+        attempts (int): Number of times the job has been started.
+        status (str): 'pending', 'done', 'skipped' (no science time in the chunk) or 'failed'.
+        seconds (float): Wall time of the last attempt.
+        counts (dict): Trigger counts returned by a successful run.
+        error (str or None): Last error message.
+    """
+    def __init__(self, chunk: str, ifo: str, start: float, end: float) -> None:
+        self.chunk = chunk
+        self.ifo = ifo
+        self.start = start
+        self.end = end
+        self.attempts = 0
+        self.status = 'pending'
+        self.seconds = 0.0
+        self.counts = {}
+        self.error = None
+
+    def record(self) -> Dict[str, object]:
+        return {
+            'chunk': self.chunk,
+            'ifo': self.ifo,
+            'start': self.start,
+            'end': self.end,
+            'status': self.status,
+            'attempts': self.attempts,
+            'seconds': self.seconds,
+            **{f"n_{key}": value for key, value in self.counts.items()},
+            'error': self.error,
+        }
+
+
+def chunk_dir(base: str | Path, chunk: str) -> str:
+    """
+    Return the per-chunk output directory below `base`.
+    """
+    return os.path.join(str(base), 'chunks', str(chunk))
+
+
+def chunk_args(args: argparse.Namespace, chunk: str) -> argparse.Namespace:
+    """
+    Return a copy of the arguments with inputs and outputs of one chunk.
+
+    `{chunk}` in `--pipeline-triggers`, `--omicron-paths` and `--gspy-source` is replaced with
+    the chunk id, outputs go to `chunks/<chunk>` below the output paths, and a
+    saved model is written next to the chunk's scored output.
+    """
+    job_args = copy.copy(args)
+
+    job_args.pipeline_triggers = args.pipeline_triggers.replace(CHUNK_PLACEHOLDER, chunk)
+    job_args.output_dir = chunk_dir(args.output_dir, chunk)
+    job_args.scored_output_path = chunk_dir(args.scored_output_path, chunk)
+
+    if args.metrics_dir:
+        job_args.metrics_dir = chunk_dir(args.metrics_dir, chunk)
+
+    if args.omicron_paths:
+        job_args.omicron_paths = args.omicron_paths.replace(CHUNK_PLACEHOLDER, chunk)
+
+    if args.gspy_source:
+        job_args.gspy_source = args.gspy_source.replace(CHUNK_PLACEHOLDER, chunk)
+
+    if args.save_model and not args.score_only:
+        # run_ifo derives the per-IFO file from this name
+        job_args.model_path = os.path.join(job_args.scored_output_path, Path(args.model_path).name)
+
+    return job_args
+
+
+class ParquetStagingSink:
+    """
+    Stage one chunk's clean, dirty and scored triggers as Parquet for the DuckDB sink.
+
+    Only the parent process writes to DuckDB, so a worker's `run_ifo` hands
+    its in-memory tables to this sink instead, and the parent loads them
+    with `read_chunk`. Parquet keeps the typed overlap id lists and the
+    columns that CSV outputs drop, so the database gets the same tables
+    as a single `overlap_and_score --duckdb-path` run.
+
+    Attributes:
+        directory (str): Staging directory of one chunk.
+
+    Methods:
+        write_chunk(ifo, chunk, tables): Write each table as `<ifo>_<name>.parquet`.
+        read_chunk(ifo): Read the staged tables of one IFO.
+        remove(ifo): Delete the staged tables of one IFO.
+    """
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = str(directory)
+
+    def _path_base(self, ifo: str, name: str) -> str:
+        return os.path.join(self.directory, f"{ifo}_{name}")
+
+    def _staged(self, ifo: str) -> Dict[str, str]:
+        paths = {name: f"{self._path_base(ifo, name)}.parquet" for name in STAGED_TABLES}
+
+        return {name: path for name, path in paths.items() if os.path.exists(path)}
+
+    def write_chunk(self, ifo: str, chunk: str, tables: Dict[str, Optional[pd.DataFrame]]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+
+        for name, df in tables.items():
+            if df is not None:
+                TIO.write(df, self._path_base(ifo, name), fmt='parquet')
+
+    def read_chunk(self, ifo: str) -> Dict[str, pd.DataFrame]:
+        return {name: TIO.read_table(path) for name, path in self._staged(ifo).items()}
+
+    def remove(self, ifo: str) -> None:
+        for path in self._staged(ifo).values():
+            os.remove(path)
+
+
+def staging_sink(args: argparse.Namespace, chunk: str) -> ParquetStagingSink:
+    """
+    Return the Parquet staging sink of one chunk.
+    """
+    return ParquetStagingSink(os.path.join(chunk_dir(args.output_dir, chunk), STAGING_DIR))
+
+
+def run_job(args: argparse.Namespace, chunk: str, ifo: str, start: float, end: float) -> Optional[Dict[str, int]]:
+    """
+    Run one (chunk, IFO) job in a worker process.
+
+    The segments of the run are the chunk's time range, intersected with
+    `--segment-file` when one is given. Stage checkpoints default to
+    `checkpoints` in the chunk's output directory. With `--duckdb-path`,
+    the results are staged as Parquet for the parent to append.
+
+    Returns:
+        dict or None: Number of clean, dirty and scored triggers, or None if
+        the chunk falls entirely outside `--segment-file`.
+    """
+    job_args = chunk_args(args, chunk)
+
+    os.makedirs(job_args.output_dir, exist_ok=True)
+    os.makedirs(job_args.scored_output_path, exist_ok=True)
+
+    if args.segment_file:
+        segments = SegmentList.from_file(args.segment_file).restrict(start, end)
+    else:
+        segments = SegmentList(np.array([start]), np.array([end]))
+
+    # chunks in a gap between science segments are expected over an observing run
+    if len(segments) == 0:
+        logger.info(f"Chunk {chunk} {ifo} has no science time in {args.segment_file}, skipping")
+        return None
+
+    omicron_path = parse_omicron_paths(job_args).get(ifo) if args.omicron else None
+    stage_cache = build_stage_cache(job_args)
+    recorder = start_instrumentation(job_args)
+
+    try:
+        counts = run_ifo(
+                job_args,
+                ifo,
+                omicron_path=omicron_path,
+                timeslides=load_timeslides(args),
+                model_cache=build_model_cache(args),
+                segments=segments,
+                sink=staging_sink(args, chunk) if args.duckdb_path else None,
+                chunk=chunk,
+                stage_cache=stage_cache,
+            )
+    finally:
+        instrumentation.disable()
+        instrumentation.write_metrics(recorder, metrics_dir(job_args), prefix=f"{ifo}_")
+
+    write_checkpoint_report(stage_cache, os.path.join(job_args.output_dir, f"{ifo}_checkpoint_status.csv"))
+
+    return counts
+
+
+class BatchRunner:
+    """
+    Run the overlap pipeline and SVM over every (chunk, IFO) pair on a local process pool.
+
+    At most `max_workers` jobs run at once. A job that raises, or whose
+    worker dies, is resubmitted until it has been attempted `retries + 1`
+    times; a dead worker also replaces the pool. Each job writes to its own
+    `chunks/<chunk>` directories, so jobs never share an output file.
+
+    Once every job has finished, the per-chunk tables of each IFO are merged
+    into the top-level output directories with a `chunk` column, one chunk
+    at a time so memory stays bounded by the largest chunk. With a DuckDB
+    path, every successful job stages its typed tables as Parquet and the
+    parent process, the only writer, appends them to the database.
+
+    Attributes:
+        args (Namespace): Parsed command-line arguments shared by all jobs.
+        jobs (list[BatchJob]): One job per (chunk, IFO).
+        max_workers (int): Concurrency limit.
+        retries (int): Reruns allowed per failed job.
+        sink (DuckDBSink or None): Sink for successful jobs.
+
+    Methods:
+        run(): Run every job and return the status table.
+        merge(): Merge per-chunk outputs of successful jobs.
+        return_status(): Return one row per job.
+    """
+    def __init__(
+            self,
+            args: argparse.Namespace,
+            chunks: List[Tuple[str, float, float]],
+            max_workers: int = 1,
+            retries: int = 1,
+        ) -> None:
+
+        self.args = args
+        self.jobs = [BatchJob(chunk, ifo, start, end) for chunk, start, end in chunks for ifo in args.ifos]
+        self.max_workers = max(int(max_workers), 1)
+        self.retries = retries
+        self.sink = DuckDBSink(args.duckdb_path) if args.duckdb_path else None
+
+    def run(self) -> pd.DataFrame:
+        """
+        Run every job with retries.
+
+        Returns:
+            pd.DataFrame: The status of every job.
+        """
+        pending = deque(self.jobs)
+        running = {}
+        started = {}
+
+        logger.info(f"Running {len(self.jobs)} jobs on {self.max_workers} workers")
+        pool = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        try:
+            while pending or running:
+                while pending and len(running) < self.max_workers:
+                    job = pending.popleft()
+                    job.attempts += 1
+                    started[job] = time.perf_counter()
+                    running[pool.submit(run_job, self.args, job.chunk, job.ifo, job.start, job.end)] = job
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                broken = False
+
+                for future in done:
+                    job = running.pop(future)
+                    job.seconds = time.perf_counter() - started[job]
+
+                    try:
+                        counts = future.result()
+                    except Exception as exc:
+                        broken = broken or isinstance(exc, BrokenProcessPool)
+                        self._handle_failure(job, exc, pending)
+                        continue
+
+                    job.error = None
+
+                    if counts is None:
+                        job.status = 'skipped'
+                        job.counts = dict.fromkeys(('clean', 'dirty', 'scored'), 0)
+                        logger.info(f"Chunk {job.chunk} {job.ifo} skipped: no science time")
+                        continue
+
+                    job.counts = counts
+                    job.status = 'done'
+                    logger.info(f"Chunk {job.chunk} {job.ifo} done in {job.seconds:.1f} s: {job.counts}")
+
+                    if self.sink is not None:
+                        self._sink_job(job)
+
+                if broken:
+                    # every job on a broken pool fails; collect them and start a new pool
+                    for future in list(running):
+                        job = running.pop(future)
+                        self._handle_failure(job, future.exception(), pending)
+
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        return self.return_status()
+
+    def _handle_failure(self, job: BatchJob, exc: BaseException, pending: deque) -> None:
+        job.error = f"{type(exc).__name__}: {exc}"
+
+        if job.attempts <= self.retries:
+            logger.warning(f"Chunk {job.chunk} {job.ifo} failed (attempt {job.attempts}), retrying: {job.error}")
+            pending.append(job)
+        else:
+            job.status = 'failed'
+            logger.error(f"Chunk {job.chunk} {job.ifo} failed after {job.attempts} attempts: {job.error}")
+
+    def _sink_job(self, job: BatchJob) -> None:
+        staging = staging_sink(self.args, job.chunk)
+
+        self.sink.write_chunk(job.ifo, job.chunk, staging.read_chunk(job.ifo))
+        staging.remove(job.ifo)
+
+    def merge(self) -> List[str]:
+        """
+        Merge the per-chunk tables of successful jobs into the top-level output directories.
+
+        Every table name found under any chunk directory is merged across
+        chunks in job order, with a `chunk` column added. Columns are aligned
+        to the first chunk's table.
+
+        Returns:
+            list[str]: Paths of the merged files.
+        """
+        merged = []
+        done = [job for job in self.jobs if job.status == 'done']
+
+        for base in dict.fromkeys([self.args.output_dir, self.args.scored_output_path]):
+            sources = {}
+
+            for job in done:
+                directory = chunk_dir(base, job.chunk)
+
+                if not os.path.isdir(directory):
+                    continue
+
+                for file in sorted(os.listdir(directory)):
+                    stem, extension = os.path.splitext(file)
+
+                    if extension in TABLE_EXTENSIONS and file.startswith(f"{job.ifo}_"):
+                        sources.setdefault(stem, []).append((job.chunk, os.path.join(directory, file)))
+
+            for stem, paths in sources.items():
+                merged.append(self._merge_table(os.path.join(str(base), stem), paths))
+
+        return merged
+
+    def _merge_table(self, path_base: str, paths: List[Tuple[str, str]]) -> str:
+        fmt = 'csv' if paths[0][1].endswith('.csv') else self.args.output_format
+        columns = None
+
+        with BatchWriter(path_base, fmt=fmt) as writer:
+            for chunk, path in paths:
+                df = TIO.read_table(path)
+                df = df.loc[:, ~df.columns.astype(str).str.startswith('Unnamed')]
+
+                if columns is None:
+                    columns = list(df.columns)
+                elif list(df.columns) != columns:
+                    extra = [c for c in df.columns if c not in columns]
+
+                    if extra:
+                        logger.warning(f"Dropping columns {extra} of chunk {chunk} not in the first chunk of {path_base}")
+
+                    df = df.reindex(columns=columns)
+
+                writer.write(df.assign(chunk=chunk))
+
+        logger.info(f"Merged {len(paths)} chunks into {writer.path} ({writer.n_rows} rows)")
+
+        return writer.path
+
+    def return_status(self) -> pd.DataFrame:
+        """
+        Return the status of every job.
+
+        Returns:
+            pd.DataFrame: One row per (chunk, IFO) job.
+        """
+        return pd.DataFrame([job.record() for job in self.jobs])
+
+
+def main():
+    """
+    Entry point for the chunk-parallel batch runner.
+
+    Runs every (chunk, IFO) job, writes `batch_status.csv` to the output
+    directory, merges the per-chunk outputs and exits non-zero if any job
+    failed; jobs skipped for lack of science time are not failures.
+    """
+    args = parse_args()
+
+    chunks = ChunkParse().list_chunks(args.chunk_definition_file)
+
+    if args.chunks:
+        chunks = [c for c in chunks if c[0] in set(args.chunks)]
+
+    if not chunks:
+        msg = f"No chunks to run from {args.chunk_definition_file}"
+        logger.error(msg)
+        raise ValueError(msg)
+
+    runner = BatchRunner(args, chunks, max_workers=args.max_workers, retries=args.retries)
+    status = runner.run()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    status.to_csv(os.path.join(args.output_dir, 'batch_status.csv'), index=False)
+
+    if not args.no_merge:
+        runner.merge()
+
+    n_failed = int((status['status'] == 'failed').sum())
+
+    if n_failed:
+        logger.error(f"{n_failed} / {len(status)} jobs failed; see batch_status.csv")
+        raise SystemExit(1)
+
+    n_skipped = int((status['status'] == 'skipped').sum())
+    logger.info(f"All {len(status)} jobs done ({n_skipped} skipped with no science time)")
+
+
+if __name__ == '__main__':
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    main()
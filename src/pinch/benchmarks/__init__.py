@@ -0,0 +1 @@
+# src/pinch/benchmarks/__init__.py
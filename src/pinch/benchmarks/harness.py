@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import subprocess
+import logging
+from typing import Dict, List, Optional, Sequence
+from pathlib import Path
+
+import pandas as pd
+
+from pinch.benchmarks.synthetic import SCALES, BenchmarkScale, SyntheticDataset
+
+logger = logging.getLogger(__name__)
+
+# bump when the result layout changes so old baselines are rejected instead of misread
+RESULTS_VERSION = 2
+
+# command-line entry points whose import time is measured
+IMPORT_TARGETS = ('pinch.overlap_and_svm', 'pinch.batch_runner', 'pinch.train_score_svm')
+
+# heavy dependencies that must only load in the stage that uses them, never on import
+LAZY_MODULES = ('gwpy', 'sklearn', 'duckdb', 'intervaltree')
+
+_IMPORT_PROBE = """
+import sys, json, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'modules': sorted({{name.split('.')[0] for name in sys.modules}})}}))
+"""
+
+
+def measure_import(module: str, repeats: int = 3) -> Dict[str, object]:
+    """
+    Time importing a module in fresh interpreters and list the lazy dependencies it loads.
+
+    Only the import itself is timed, not interpreter startup; the fastest of
+    `repeats` runs is kept.
+
+    Args:
+        module (str): Module to import, e.g. 'pinch.overlap_and_svm'.
+        repeats (int): Interpreters to start.
+
+    Returns:
+        dict: module, seconds and eager (modules of `LAZY_MODULES` loaded by the import).
+    """
+    runs = []
+
+    for _ in range(repeats):
+        output = subprocess.run(
+                [sys.executable, '-c', _IMPORT_PROBE.format(module=module)],
+                capture_output=True,
+                text=True,
+            )
+
+        if output.returncode != 0:
+            msg = f"Importing {module} failed:\n{output.stderr}"
+            logger.error(msg)
+            raise RuntimeError(msg)
+
+        runs.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    return {
+        'module': module,
+        'seconds': min(run['seconds'] for run in runs),
+        'eager': [name for name in LAZY_MODULES if name in runs[0]['modules']],
+    }
+
+
+class BenchmarkHarness:
+    """
+    Time the full `overlap_and_score` command on synthetic data at several scales.
+
+    For each scale a `SyntheticDataset` is written once under
+    `<work_dir>/data/<scale>` (and reused while its parameters are unchanged),
+    then the CLI is run in a fresh process per IFO with Gravity Spy read from
+    the dataset's local glitch table, so nothing touches the network. Each run
+    writes stage metrics (see `pinch.utils.instrumentation`); the harness keeps
+    the end-to-end wall time, throughput in triggers per second, the peak RSS
+    of the run and the wall time of every stage. With `repeats` > 1 the fastest
+    run is kept, which is the least noisy estimate on a shared machine.
+
+    Before the runs, the import time of every entry point in `IMPORT_TARGETS`
+    is measured, together with any of `LAZY_MODULES` it loads eagerly.
+
+    Attributes:
+        work_dir (Path): Directory for datasets, run outputs and results.
+        scales (list[BenchmarkScale]): Dataset sizes to benchmark.
+        ifos (list[str]): IFOs run, one process each.
+        omicron_format (str): 'csv' or 'duckdb' Omicron inputs.
+        repeats (int): Runs per (scale, IFO); the fastest is kept.
+        extra_args (list[str]): Additional `overlap_and_score` arguments.
+        seed (int): Dataset seed.
+        results (list[dict]): One result per (scale, IFO).
+        imports (list[dict]): Import time of each entry point.
+
+    Methods:
+        prepare(scale): Write or reuse the dataset of a scale.
+        run_case(scale, ifo, paths): Run the CLI for one IFO and return its result.
+        measure_imports(): Time importing every entry point.
+        run(): Measure imports, then benchmark every scale and IFO.
+        return_payload(): Return the results with the run configuration and machine.
+        write_results(path): Write the results as JSON.
+    """
+    def __init__(
+            self,
+            work_dir: str | Path,
+            scales: Sequence[BenchmarkScale],
+            ifos: Sequence[str] = ('H1', 'L1'),
+            omicron_format: str = 'csv',
+            repeats: int = 1,
+            extra_args: Sequence[str] = (),
+            seed: int = 0,
+        ) -> None:
+
+        if omicron_format not in ('csv', 'duckdb'):
+            msg = f"omicron_format must be 'csv' or 'duckdb', got {omicron_format}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        if repeats < 1:
+            msg = "repeats must be at least 1"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.work_dir = Path(work_dir)
+        self.scales = list(scales)
+        self.ifos = list(ifos)
+        self.omicron_format = omicron_format
+        self.repeats = repeats
+        self.extra_args = list(extra_args)
+        self.seed = seed
+        self.results = []
+        self.imports = []
+
+    def prepare(self, scale: BenchmarkScale) -> Dict[str, object]:
+        """
+        Write the dataset of a scale, or reuse it if it was written with the same parameters.
+
+        Returns:
+            dict: Dataset paths as returned by `SyntheticDataset.generate`.
+        """
+        data_dir = self.work_dir / 'data' / scale.name
+        spec_path = data_dir / 'dataset.json'
+        spec = {'scale': vars(scale), 'ifos': self.ifos, 'seed': self.seed}
+
+        if spec_path.exists():
+            with open(spec_path) as f:
+                stored = json.load(f)
+
+            if stored['spec'] == spec:
+                logger.info(f"Reusing {scale.name} dataset in {data_dir}")
+                return stored['paths']
+
+        shutil.rmtree(data_dir, ignore_errors=True)
+        paths = SyntheticDataset(data_dir, scale, ifos=self.ifos, seed=self.seed).generate()
+
+        with open(spec_path, 'w') as f:
+            json.dump({'spec': spec, 'paths': paths}, f, indent=1)
+
+        return paths
+
+    def command(self, paths: Dict[str, object], ifo: str, run_dir: Path) -> List[str]:
+        """
+        Return the `overlap_and_score` command line of one IFO.
+        """
+        omicron_path = paths[f"omicron_{self.omicron_format}"][ifo]
+
+        return [
+            sys.executable, '-m', 'pinch.overlap_and_svm',
+            '--ifos', ifo,
+            '--pipeline-triggers', paths['gstlal'],
+            '--output-dir', str(run_dir / 'overlap'),
+            '--scored-output-path', str(run_dir / 'scored'),
+            '--gspy',
+            '--gspy-source', paths['gspy'],
+            '--omicron',
+            '--omicron-paths', f"{ifo}:{omicron_path}",
+            '--random-state', str(self.seed),
+            '--metrics-dir', str(run_dir / 'metrics'),
+            *self.extra_args,
+        ]
+
+    def run_case(self, scale: BenchmarkScale, ifo: str, paths: Dict[str, object]) -> Dict[str, object]:
+        """
+        Run the CLI for one IFO `repeats` times and return the fastest run.
+
+        Returns:
+            dict: scale, ifo, triggers, wall_seconds, throughput, peak_rss_bytes and per-stage wall seconds.
+        """
+        best = None
+
+        for repeat in range(self.repeats):
+            run_dir = self.work_dir / 'runs' / scale.name / ifo / str(repeat)
+            shutil.rmtree(run_dir, ignore_errors=True)
+            os.makedirs(run_dir / 'overlap')
+            os.makedirs(run_dir / 'scored')
+
+            log_path = run_dir / 'run.log'
+            start = time.perf_counter()
+
+            with open(log_path, 'w') as log:
+                returncode = subprocess.call(self.command(paths, ifo, run_dir), stdout=log, stderr=subprocess.STDOUT)
+
+            wall = time.perf_counter() - start
+
+            if returncode != 0:
+                msg = f"Benchmark run {scale.name}/{ifo} failed with exit code {returncode}; see {log_path}"
+                logger.error(msg)
+                raise RuntimeError(msg)
+
+            with open(run_dir / 'metrics' / 'metrics.json') as f:
+                stages = json.load(f)['stages']
+
+            result = {
+                'scale': scale.name,
+                'ifo': ifo,
+                'triggers': scale.n_triggers,
+                'wall_seconds': wall,
+                'throughput': scale.n_triggers / wall,
+                # ru_maxrss of the run's own process, sampled at the end of every stage
+                'peak_rss_bytes': max((s['peak_rss_bytes'] for s in stages), default=None),
+                'stages': self._stage_seconds(stages),
+            }
+
+            logger.info(
+                    f"{scale.name}/{ifo} run {repeat + 1}/{self.repeats}: {wall:.2f} s, "
+                    f"{result['throughput']:.0f} triggers/s, peak RSS {(result['peak_rss_bytes'] or 0) / 1e6:.0f} MB"
+                )
+
+            if best is None or wall < best['wall_seconds']:
+                best = result
+
+        return best
+
+    @staticmethod
+    def _stage_seconds(stages: List[Dict[str, object]]) -> Dict[str, float]:
+        seconds = {}
+
+        for record in stages:
+            seconds[record['stage']] = seconds.get(record['stage'], 0.0) + record['wall_seconds']
+
+        return seconds
+
+    def measure_imports(self) -> List[Dict[str, object]]:
+        """
+        Time importing every entry point of `IMPORT_TARGETS`.
+
+        Returns:
+            list[dict]: One `measure_import` result per entry point.
+        """
+        self.imports = [measure_import(module, repeats=self.repeats) for module in IMPORT_TARGETS]
+
+        for record in self.imports:
+            logger.info(f"import {record['module']}: {record['seconds']:.3f} s, eager: {record['eager'] or 'none'}")
+
+        return self.imports
+
+    def run(self) -> List[Dict[str, object]]:
+        """
+        Measure imports, then benchmark every scale and IFO.
+
+        Returns:
+            list[dict]: One result per (scale, IFO).
+        """
+        self.measure_imports()
+        self.results = []
+
+        for scale in self.scales:
+            paths = self.prepare(scale)
+
+            for ifo in self.ifos:
+                self.results.append(self.run_case(scale, ifo, paths))
+
+        return self.results
+
+    def return_payload(self) -> Dict[str, object]:
+        """
+        Return the results with the run configuration and the machine they were measured on.
+        """
+        return {
+            'version': RESULTS_VERSION,
+            'created': time.time(),
+            'machine': machine_info(),
+            'omicron_format': self.omicron_format,
+            'extra_args': self.extra_args,
+            'imports': self.imports,
+            'results': self.results,
+        }
+
+    def write_results(self, path: str | Path) -> None:
+        """
+        Write `return_payload()` as JSON.
+        """
+        os.makedirs(os.path.dirname(str(path)) or '.', exist_ok=True)
+
+        with open(path, 'w') as f:
+            json.dump(self.return_payload(), f, indent=1)
+
+
+def machine_info() -> Dict[str, object]:
+    """
+    Describe the machine a benchmark ran on; baselines only compare well on the same one.
+    """
+    return {
+        'node': platform.node(),
+        'machine': platform.machine(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare_to_baseline(
+        current: Dict[str, object],
+        baseline: Dict[str, object],
+        tolerance: float = 0.25,
+        memory_tolerance: float = 0.25,
+        min_seconds: float = 0.25,
+    ) -> pd.DataFrame:
+    """
+    Compare benchmark results with a stored baseline.
+
+    Both must come from the same Omicron format and extra arguments. Every
+    (scale, IFO) in both is compared on end-to-end wall time, peak RSS
+    and the wall time of each stage, and every entry point on import time. A metric regresses when it exceeds the
+    baseline by more than its tolerance; stages faster than `min_seconds` in
+    the baseline are reported but never fail, since their timing is mostly noise.
+
+    Args:
+        current (dict): Results payload of `BenchmarkHarness.return_payload`.
+        baseline (dict): Payload stored by an earlier `write_results`.
+        tolerance (float): Allowed relative slowdown, e.g. 0.25 for 25%.
+        memory_tolerance (float): Allowed relative peak RSS growth.
+        min_seconds (float): Baseline wall time below which a stage cannot regress.
+
+    Returns:
+        pd.DataFrame: One row per compared metric with baseline, current, ratio and regressed.
+    """
+    if baseline.get('version') != RESULTS_VERSION:
+        msg = f"Baseline has results version {baseline.get('version')}, expected {RESULTS_VERSION}"
+        logger.error(msg)
+        raise ValueError(msg)
+
+    for setting in ('omicron_format', 'extra_args'):
+        if baseline[setting] != current[setting]:
+            msg = f"Baseline was run with {setting}={baseline[setting]}, not {current[setting]}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+    if baseline['machine'] != current['machine']:
+        logger.warning(f"Baseline was measured on a different machine: {baseline.get('machine')}")
+
+    reference = {(r['scale'], r['ifo']): r for r in baseline['results']}
+    rows = []
+
+    def compare(result, metric, value, previous, allowed, floor=0.0):
+        if value is None or not previous:
+            return
+
+        ratio = value / previous
+        rows.append({
+            'scale': result['scale'],
+            'ifo': result['ifo'],
+            'metric': metric,
+            'baseline': previous,
+            'current': value,
+            'ratio': ratio,
+            'regressed': previous >= floor and ratio > 1.0 + allowed,
+        })
+
+    import_reference = {r['module']: r['seconds'] for r in baseline['imports']}
+
+    for record in current['imports']:
+        compare(
+                {'scale': 'import', 'ifo': ''},
+                record['module'],
+                record['seconds'],
+                import_reference.get(record['module']),
+                tolerance,
+            )
+
+    for result in current['results']:
+        previous = reference.get((result['scale'], result['ifo']))
+
+        if previous is None:
+            logger.warning(f"No baseline for {result['scale']}/{result['ifo']}")
+            continue
+
+        compare(result, 'wall_seconds', result['wall_seconds'], previous['wall_seconds'], tolerance)
+        compare(result, 'peak_rss_bytes', result['peak_rss_bytes'], previous['peak_rss_bytes'], memory_tolerance)
+
+        for stage, seconds in result['stages'].items():
+            compare(result, f"stage:{stage}", seconds, previous['stages'].get(stage), tolerance, floor=min_seconds)
+
+    return pd.DataFrame(rows, columns=['scale', 'ifo', 'metric', 'baseline', 'current', 'ratio', 'regressed'])
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+            description="Benchmark overlap_and_score end to end on synthetic GstLAL, Omicron and Gravity Spy data")
+
+    parser.add_argument('--work-dir', default='pinch_benchmark', help='Directory for datasets, run outputs and results.json')
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=['small', 'medium'], help='Dataset sizes to run')
+    parser.add_argument('--ifos', nargs='+', default=['H1', 'L1'], help='IFOs to run, one process each')
+    parser.add_argument('--omicron-format', choices=['csv', 'duckdb'], default='csv', help='Omicron input format')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per scale and IFO; the fastest is kept')
+    parser.add_argument('--seed', type=int, default=0, help='Dataset and SVM sampling seed')
+    parser.add_argument('--baseline', help='Results JSON to compare against; exits non-zero on a regression')
+    parser.add_argument('--save-baseline', help='Also write the results to this path for later comparisons')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative slowdown before failing')
+    parser.add_argument('--memory-tolerance', type=float, default=0.25, help='Allowed relative peak RSS growth before failing')
+    parser.add_argument(
+            '--min-stage-seconds',
+            type=float,
+            default=0.25,
+            help='Stages faster than this in the baseline never fail the comparison')
+    parser.add_argument(
+            '--imports-only',
+            action='store_true',
+            help='Only measure entry point import times and check that heavy dependencies load lazily')
+    parser.add_argument(
+            'extra_args',
+            nargs=argparse.REMAINDER,
+            help='Extra overlap_and_score arguments after --, e.g. -- --cluster-window 1 --model-type approx')
+
+    args = parser.parse_args(argv)
+
+    if args.extra_args[:1] == ['--']:
+        args.extra_args = args.extra_args[1:]
+
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    harness = BenchmarkHarness(
+            args.work_dir,
+            [] if args.imports_only else [SCALES[name] for name in args.scales],
+            ifos=args.ifos,
+            omicron_format=args.omicron_format,
+            repeats=args.repeats,
+            extra_args=args.extra_args,
+            seed=args.seed,
+        )
+
+    results = harness.run()
+    harness.write_results(Path(args.work_dir) / 'results.json')
+
+    print(pd.DataFrame(harness.imports).to_string(index=False, float_format='%.3f'))
+
+    if results:
+        summary = pd.DataFrame(results).drop(columns=['stages'])
+        summary['peak_rss_mb'] = summary.pop('peak_rss_bytes') / 1e6
+        print(summary.to_string(index=False, float_format='%.2f'))
+
+    if args.save_baseline:
+        harness.write_results(args.save_baseline)
+        logger.info(f"Saved baseline to {args.save_baseline}")
+
+    eager = [record for record in harness.imports if record['eager']]
+
+    if eager:
+        msg = '; '.join(f"{record['module']} imports {', '.join(record['eager'])}" for record in eager)
+        logger.error(f"Heavy dependencies loaded at import time: {msg}")
+        raise SystemExit(1)
+
+    if not args.baseline:
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    comparison = compare_to_baseline(
+            harness.return_payload(),
+            baseline,
+            tolerance=args.tolerance,
+            memory_tolerance=args.memory_tolerance,
+            min_seconds=args.min_stage_seconds,
+        )
+    print(comparison.to_string(index=False, float_format='%.3f'))
+
+    regressions = comparison[comparison['regressed']]
+
+    if len(regressions):
+        msg = f"{len(regressions)} benchmark metrics regressed against {args.baseline}"
+        logger.error(msg)
+        raise SystemExit(1)
+
+    logger.info(f"No regressions against {args.baseline}")
+
+if __name__ == '__main__':
+    main()
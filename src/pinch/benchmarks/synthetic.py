@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+
+import os
+import argparse
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+GSPY_LABELS = ['Blip', 'Koi_Fish', 'Scattered_Light', 'Tomte', 'Whistle', 'Low_Frequency_Burst']
+
+
+@dataclass
+class BenchmarkScale:
+    """
+    Size of a synthetic observing period.
+
+    Attributes:
+        name (str): Scale name used in results and baselines.
+        duration (float): Seconds of data per IFO.
+        trigger_rate (float): GstLAL triggers per second per IFO.
+        omicron_rate (float): Omicron triggers per second per IFO.
+        glitch_fraction (float): Fraction of GstLAL triggers placed on an Omicron glitch.
+        file_duration (float): Seconds of triggers per GstLAL file.
+    """
+    name: str
+    duration: float
+    trigger_rate: float = 2.0
+    omicron_rate: float = 0.2
+    glitch_fraction: float = 0.25
+    file_duration: float = 1000.0
+
+    @property
+    def n_triggers(self) -> int:
+        return int(self.duration * self.trigger_rate)
+
+    @property
+    def n_omicron(self) -> int:
+        return int(self.duration * self.omicron_rate)
+
+
+SCALES = {
+    'small': BenchmarkScale('small', duration=2000),
+    'medium': BenchmarkScale('medium', duration=10000),
+    'large': BenchmarkScale('large', duration=50000),
+}
+
+
+class SyntheticDataset:
+    """
+    Write a reproducible set of pipeline inputs for benchmarking.
+
+    Generates, per IFO, Omicron glitches, a Gravity Spy classification of
+    the louder ones and GstLAL triggers of which `glitch_fraction` are
+    placed on glitches (louder and with a worse chi-squared), so overlap,
+    separation and SVM training all see realistic work. The layout matches
+    what the pipeline reads in production:
+
+        gstlal/<IFOS>-SYNTHETIC_TRIGGERS-<start>-<duration>.csv
+        omicron/<IFO>-OMICRON.csv and <IFO>-OMICRON.duckdb
+        gspy_glitches.csv  (local stand-in for the Gravity Spy database)
+
+    Attributes:
+        output_dir (Path): Directory the dataset is written to.
+        scale (BenchmarkScale): Size of the dataset.
+        ifos (list[str]): Interferometers to generate.
+        start (float): GPS start time.
+        seed (int): Random seed; the same seed always gives the same files.
+
+    Methods:
+        generate(): Write every input and return their paths.
+        make_omicron(ifo, rng): Return synthetic Omicron triggers of one IFO.
+        make_gspy(omicron, ifo, rng): Return the Gravity Spy glitches of one IFO.
+        make_triggers(omicron, ifo, rng): Return synthetic GstLAL triggers of one IFO.
+    """
+    def __init__(
+            self,
+            output_dir: str | Path,
+            scale: BenchmarkScale,
+            ifos: Sequence[str] = ('H1', 'L1'),
+            start: float = 1_000_000_000,
+            seed: int = 0,
+        ) -> None:
+        self.output_dir = Path(output_dir)
+        self.scale = scale
+        self.ifos = list(ifos)
+        self.start = float(start)
+        self.seed = seed
+
+    def generate(self) -> Dict[str, object]:
+        """
+        Write the GstLAL directory, Omicron CSV and DuckDB files and the Gravity Spy table.
+
+        Returns:
+            dict: Paths with keys 'gstlal', 'omicron_csv' and 'omicron_duckdb' (per IFO), and 'gspy'.
+        """
+        gstlal_dir = self.output_dir / 'gstlal'
+        omicron_dir = self.output_dir / 'omicron'
+        os.makedirs(gstlal_dir, exist_ok=True)
+        os.makedirs(omicron_dir, exist_ok=True)
+
+        triggers, gspy = [], []
+        paths = {'gstlal': str(gstlal_dir), 'omicron_csv': {}, 'omicron_duckdb': {}, 'gspy': str(self.output_dir / 'gspy_glitches.csv')}
+
+        for i, ifo in enumerate(self.ifos):
+            rng = np.random.default_rng([self.seed, i])
+
+            omicron = self.make_omicron(ifo, rng)
+            gspy.append(self.make_gspy(omicron, ifo, rng))
+            triggers.append(self.make_triggers(omicron, ifo, rng))
+
+            paths['omicron_csv'][ifo] = str(omicron_dir / f"{ifo}-OMICRON.csv")
+            paths['omicron_duckdb'][ifo] = str(omicron_dir / f"{ifo}-OMICRON.duckdb")
+
+            # raw Omicron CSVs carry no tstart/tend; the DuckDB tables are queried on them
+            omicron.drop(columns=['tstart', 'tend']).to_csv(paths['omicron_csv'][ifo], index=False)
+            self._write_duckdb(omicron, paths['omicron_duckdb'][ifo])
+
+        pd.concat(gspy, ignore_index=True).to_csv(paths['gspy'], index=False)
+        self._write_gstlal(pd.concat(triggers, ignore_index=True), gstlal_dir)
+
+        logger.info(
+                f"Wrote {self.scale.name} dataset to {self.output_dir}: "
+                f"{self.scale.n_triggers} triggers and {self.scale.n_omicron} Omicron glitches per IFO"
+            )
+
+        return paths
+
+    def make_omicron(self, ifo: str, rng: np.random.Generator) -> pd.DataFrame:
+        """
+        Return Omicron triggers spread uniformly over the period, most above the 5.5 SNR cut.
+        """
+        n = self.scale.n_omicron
+        tstart = np.sort(self.start + rng.random(n) * self.scale.duration)
+
+        omicron = pd.DataFrame({
+            'start_time': np.floor(tstart).astype(np.int64),
+            'start_time_ns': np.round((tstart % 1) * 1e9).astype(np.int64),
+            'duration': rng.lognormal(mean=-0.5, sigma=0.8, size=n),
+            'snr': 4.5 + rng.exponential(5.0, size=n),
+            'peak_frequency': rng.lognormal(mean=4.5, sigma=1.0, size=n),
+        })
+
+        omicron['tstart'] = omicron['start_time'] + 1e-9 * omicron['start_time_ns']
+        omicron['tend'] = omicron['tstart'] + omicron['duration']
+
+        return omicron
+
+    def make_gspy(self, omicron: pd.DataFrame, ifo: str, rng: np.random.Generator) -> pd.DataFrame:
+        """
+        Return a Gravity Spy classification of the Omicron glitches louder than SNR 7.5.
+
+        Columns follow the `glitches_v2d0` table queried by `GravitySpyHandler`.
+        """
+        loud = omicron[omicron['snr'] > 7.5]
+        n = len(loud)
+
+        return pd.DataFrame({
+            'gravityspy_id': [f"{ifo}_{i:08d}" for i in range(n)],
+            'ifo': ifo,
+            'event_time': (loud['tstart'] + loud['duration'] / 2).to_numpy(),
+            'start_time': loud['start_time'].to_numpy(),
+            'start_time_ns': loud['start_time_ns'].to_numpy(),
+            'duration': loud['duration'].to_numpy(),
+            'peak_frequency': loud['peak_frequency'].to_numpy(),
+            'snr': loud['snr'].to_numpy(),
+            'ml_label': rng.choice(GSPY_LABELS, size=n),
+            'ml_confidence': rng.uniform(0.5, 1.0, size=n),
+        })
+
+    def make_triggers(self, omicron: pd.DataFrame, ifo: str, rng: np.random.Generator) -> pd.DataFrame:
+        """
+        Return GstLAL triggers; `glitch_fraction` of them end during an Omicron glitch.
+        """
+        n = self.scale.n_triggers
+        n_glitch = int(n * self.scale.glitch_fraction)
+
+        glitch = omicron.iloc[rng.integers(0, len(omicron), size=n_glitch)]
+        tend = np.concatenate([
+            (glitch['tstart'] + rng.random(n_glitch) * glitch['duration']).to_numpy(),
+            self.start + rng.random(n - n_glitch) * self.scale.duration,
+        ])
+        on_glitch = np.arange(n) < n_glitch
+
+        snr = 4.0 + rng.exponential(2.0, size=n) + on_glitch * rng.exponential(6.0, size=n)
+        chisq = rng.gamma(4.0, 0.25, size=n) * (1.0 + on_glitch * rng.exponential(2.0, size=n))
+
+        triggers = pd.DataFrame({
+            'ifo': ifo,
+            'end_time': np.floor(tend).astype(np.int64),
+            'end_time_ns': np.round((tend % 1) * 1e9).astype(np.int64),
+            'template_duration': rng.lognormal(mean=0.5, sigma=0.8, size=n),
+            'mass1': rng.uniform(1.0, 50.0, size=n),
+            'mass2': rng.uniform(1.0, 20.0, size=n),
+            'snr': snr,
+            'chisq': chisq,
+        })
+
+        return triggers.iloc[np.argsort(tend, kind='stable')]
+
+    def _write_gstlal(self, triggers: pd.DataFrame, gstlal_dir: Path) -> List[str]:
+        # T050017 names let segment runs skip files without reading them
+        tend = triggers['end_time'].to_numpy()
+        file_duration = self.scale.file_duration
+        file_index = ((tend - self.start) // file_duration).astype(np.int64)
+        observatories = ''.join(self.ifos)
+        paths = []
+
+        for index, df in triggers.groupby(file_index, sort=True):
+            file_start = int(self.start + index * file_duration)
+            path = gstlal_dir / f"{observatories}-SYNTHETIC_TRIGGERS-{file_start}-{int(file_duration)}.csv"
+            df.to_csv(path, index=False)
+            paths.append(str(path))
+
+        return paths
+
+    @staticmethod
+    def _write_duckdb(omicron: pd.DataFrame, path: str) -> None:
+        import duckdb
+
+        if os.path.exists(path):
+            os.remove(path)
+
+        con = duckdb.connect(path)
+        con.register('omicron_df', omicron)
+        con.execute("CREATE TABLE omicron AS SELECT * FROM omicron_df")
+        con.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic GstLAL, Omicron and Gravity Spy dataset")
+    parser.add_argument('output_dir', type=str)
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--ifos', nargs='+', default=['H1', 'L1'])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    SyntheticDataset(args.output_dir, SCALES[args.scale], ifos=args.ifos, seed=args.seed).generate()
+
+if __name__ == '__main__':
+    main()
@@ -6,14 +6,15 @@ import argparse
 
 from dataclasses import dataclass
 from typing import Optional, Iterable, Tuple
+from pathlib import Path
 import pandas as pd
 import logging
 
-from gwpy.table import GravitySpyTable
-
 from pinch.utils.chunk_parse import ChunkParse
+from pinch.utils.segments import SegmentList
+from pinch.utils import instrumentation
 
-logger = logging.getLoger(__name__)
+logger = logging.getLogger(__name__)
 
 # authentication for gspy database
 def _as_time_range_from_df(
@@ -45,7 +46,9 @@ class GravitySpyHandler:
 
     This class interfaces with the Gravity Spy database using GWPy's GravitySpyTable
     and provides methods to fetch glitch events, compute derived time intervals,
-    and return the results as a pandas DataFrame.
+    and return the results as a pandas DataFrame. When `source` is given, the same
+    selection is applied to a local export of the glitch table (CSV, Parquet or
+    DuckDB) instead, so runs work offline and can be benchmarked reproducibly.
 
     Attributes:
         ifo (str): Interferometer identifier (e.g., 'H1', 'L1').
@@ -53,11 +56,16 @@ class GravitySpyHandler:
         end (int or float): GPS end time of the query.
         ml_label (str, optional): Glitch class to filter by (e.g., 'Koi_Fish').
         confidence (float): Minimum confidence threshold for returned events.
+        segments (SegmentList, optional): Segments restricting the query window and results.
+        source (str, optional): Local glitch table queried instead of the Gravity Spy database.
         glitches (pd.DataFrame or None): DataFrame of queried glitch data.
 
     Methods:
         fetch_gravity_spy_events():
-            Fetch glitch events from the Gravity Spy database.
+            Fetch glitch events from the Gravity Spy database or the local source.
+
+        read_local_glitches():
+            Select glitch events from the local source.
 
         construct_gspy_start_end():
             Add `tstart` and `tend` columns to the DataFrame based on start_time and duration.
@@ -74,13 +82,25 @@ class GravitySpyHandler:
     omicron_df: Optional[pd.DataFrame] = None
     ml_label: Optional[str] = None
     confidence: float = 0.9
-   
+    segments: Optional[SegmentList] = None
+    source: Optional[str | Path] = None
+
     def __post_init__(self) -> None:
         if self.t_start >= self.t_end:
             msg = "t_start must be < t_end"
             logger.error(msg)
             raise ValueError(msg)
 
+        if self.segments is not None:
+            window = self.segments.clip_window(self.t_start, self.t_end)
+
+            if window is None:
+                msg = "Gravity Spy query window lies entirely outside of segments"
+                logger.error(msg)
+                raise ValueError(msg)
+
+            self.t_start, self.t_end = window
+
         if not (0.0 <= self.confidence <= 1):
             msg = "confidence must be between 0 and 1"
             logger.error(msg)
@@ -96,6 +116,8 @@ class GravitySpyHandler:
             ml_label: Optional[str] = None,
             confidence: float =  0.9,
             omicron_df: Optional[pd.DataFrame] = None,
+            segments: Optional[SegmentList] = None,
+            source: Optional[str | Path] = None,
         ) -> 'GravitySpyHandler':
             t0 = float(t_start)
             t1 = float(t_end)
@@ -106,7 +128,8 @@ class GravitySpyHandler:
 
             return cls(
                     ifo=ifo, t_start=t0, t_end=t1,
-                    ml_label=ml_label, confidence=confidence, omicron_df=omicron_df)
+                    ml_label=ml_label, confidence=confidence, omicron_df=omicron_df,
+                    segments=segments, source=source)
 
     @classmethod
     def from_omicron_df(
@@ -117,17 +140,21 @@ class GravitySpyHandler:
             *,
             ml_label: Optional[str] = None,
             confidence: float = 0.9,
+            segments: Optional[SegmentList] = None,
+            source: Optional[str | Path] = None,
         ) -> 'GravitySpyHandler':
             time_col = "tstart" if "tstart" in omicron_df.columns else "time"
             t0, t1 = _as_time_range_from_df(omicron_df, time_col, margin=margin)
             return cls.from_time_range(
                     ifo=ifo, t_start=t0, t_end=t1,
-                    ml_label=ml_label, confidence=confidence, omicron_df=omicron_df)
+                    ml_label=ml_label, confidence=confidence, omicron_df=omicron_df,
+                    segments=segments, source=source)
 
     def fetch_gravity_spy_events(self) -> pd.DataFrame:
         """
-        Query the Gravity Spy database for glitches within the specified time range
-        and optional class and confidence criteria.
+        Query the Gravity Spy database, or the local source if one is set, for
+        glitches within the specified time range and optional class and
+        confidence criteria.
 
         Returns:
             pd.DataFrame: A DataFrame of glitch events matching the query.
@@ -135,32 +162,39 @@ class GravitySpyHandler:
         Raises:
             ValueError: If no glitch events are returned.
         """
-        if not self.ml_label:
-            glitches = GravitySpyTable.fetch(
-                    "gravityspy",
-                    "glitches_v2d0",
-                    selection=(
-                        f"ifo='{self.ifo}' && "
-                        f"event_time > {self.start} && "
-                        f"event_time < {self.end} && "
-                        f"ml_confidence >={self.confidence}",
-                    ),
-                )
+        if self.source is not None:
+            glitches = self.read_local_glitches()
 
         else:
-            glitches = GravitySpyTable.fetch(
-                    "gravityspy",
-                    "glitches_v2d0",
-                    selection=(
-                        f"ifo='{self.ifo}' && "
-                        f"event_time > {self.start} && "
-                        f"event_time < {self.end} && "
-                        f"ml_label={self.ml_label} && "
-                        f"ml_confidence >={self.confidence}",
-                    ),
-                )
-
-        glitches = glitches.to_pandas()
+            # gwpy (and astropy behind it) takes seconds to import, so only live queries load it
+            from gwpy.table import GravitySpyTable
+
+            if not self.ml_label:
+                glitches = GravitySpyTable.fetch(
+                        "gravityspy",
+                        "glitches_v2d0",
+                        selection=(
+                            f"ifo='{self.ifo}' && "
+                            f"event_time > {self.t_start} && "
+                            f"event_time < {self.t_end} && "
+                            f"ml_confidence >={self.confidence}",
+                        ),
+                    )
+
+            else:
+                glitches = GravitySpyTable.fetch(
+                        "gravityspy",
+                        "glitches_v2d0",
+                        selection=(
+                            f"ifo='{self.ifo}' && "
+                            f"event_time > {self.t_start} && "
+                            f"event_time < {self.t_end} && "
+                            f"ml_label={self.ml_label} && "
+                            f"ml_confidence >={self.confidence}",
+                        ),
+                    )
+
+            glitches = glitches.to_pandas()
 
         if glitches.empty:
             msg = "No glitches retured for gspy query"
@@ -171,6 +205,66 @@ class GravitySpyHandler:
 
         return self.glitches
 
+    def read_local_glitches(self) -> pd.DataFrame:
+        """
+        Select glitches from a local export of the Gravity Spy glitch table.
+
+        The export needs the `ifo`, `event_time` and `ml_confidence` columns
+        (and `ml_label` for a class selection); the selection matches the live
+        database query. A DuckDB source is queried from its first table.
+
+        Returns:
+            pd.DataFrame: Glitch events matching the query.
+        """
+        source = str(self.source)
+
+        if source.endswith('.duckdb'):
+            import duckdb
+
+            con = duckdb.connect(source, read_only=True)
+            table_name = con.execute("""
+                SELECT table_name
+                FROM information_schema.tables
+                WHERE table_schema = 'main'
+            """).fetchall()[0][0]
+
+            query = f"""
+                SELECT *
+                FROM {table_name}
+                WHERE ifo = ? AND event_time > ? AND event_time < ? AND ml_confidence >= ?
+                """
+            params = [self.ifo, self.t_start, self.t_end, self.confidence]
+
+            if self.ml_label:
+                query += " AND ml_label = ?"
+                params.append(self.ml_label)
+
+            glitches = con.execute(query, params).fetchdf()
+            con.close()
+
+            return glitches
+
+        if source.endswith('.parquet'):
+            glitches = pd.read_parquet(source)
+        elif source.endswith('.csv'):
+            glitches = pd.read_csv(source)
+        else:
+            msg = f"Unsupported Gravity Spy source {source}; expected .csv, .parquet or .duckdb"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        mask = (
+                (glitches['ifo'] == self.ifo)
+                & (glitches['event_time'] > self.t_start)
+                & (glitches['event_time'] < self.t_end)
+                & (glitches['ml_confidence'] >= self.confidence)
+            )
+
+        if self.ml_label:
+            mask &= glitches['ml_label'] == self.ml_label
+
+        return glitches[mask].reset_index(drop=True)
+
     def construct_gspy_start_end(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Compute `tstart` and `tend` columns for each glitch in the DataFrame.
@@ -225,12 +319,32 @@ class GravitySpyHandler:
 
         This combines fetching glitch data and computing additional timing fields.
         """
-        df = self.fetch_gravity_spy_events()
+        with instrumentation.stage('gspy.query') as rec:
+            df = self.fetch_gravity_spy_events()
+            rec.rows_out = len(df)
 
         df = self.construct_gspy_start_end(df)
-        
+
+        if self.segments is not None:
+            df = self.apply_segment_cut(df)
+
         return df
 
+    def apply_segment_cut(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Keep only glitches whose [tstart, tend] overlaps a segment.
+
+        Args:
+            df (pd.DataFrame): Glitches with `tstart` and `tend` columns.
+
+        Returns:
+            pd.DataFrame: Glitches overlapping the segment list.
+        """
+        mask = self.segments.intersects(df['tstart'].values, df['tend'].values)
+        self.glitches = df[mask].copy()
+
+        return self.glitches
+
     def return_gspy_events(self):
         """
         Return glitch events with computed `tstart` and `tend` fields.
@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 
 import os
-from typing import List, Tuple, Union
+from typing import List, Optional, Tuple, Union
 from pathlib import Path
 import pandas as pd
 import logging
 
+from pinch.utils.segments import SegmentList, file_coverage
+from pinch.utils import instrumentation
+
 logger = logging.getLogger(__name__)
 
 class GstlalHandler:
@@ -13,18 +16,24 @@ class GstlalHandler:
     A handler for reading and conditioning GstLAL pipeline trigger data.
 
     This class loads one or more GstLAL CSV files, filters for a specified IFO,
-    and computes derived start and end times for each trigger.
+    and computes derived start and end times for each trigger. When segment mode is
+    enabled, only triggers whose end time falls inside the supplied segment list are
+    kept, and files whose coverage lies entirely outside the segments are skipped.
 
     Attributes:
         trigger_path (str): Path to the directory containing GstLAL trigger CSV files.
         ifo (str): Interferometer name (e.g., 'H1', 'L1').
-        segment (bool): Currently unused. Reserved for segment-specific functionality.
+        segment (bool): Restrict triggers to the segments in `segment_file`.
+        segment_file (str, optional): Path to a segment list file, or a SegmentList.
+        segments (SegmentList or None): Loaded segments when segment mode is enabled.
         triggers (pd.DataFrame or None): DataFrame holding loaded and conditioned triggers.
 
     Methods:
         return_gstlal_file_list(): Return a list of all CSV files in the trigger path.
         read_gstlal_csv(csv_path): Read a single CSV file into the triggers attribute.
         read_all_gstlal_csv(): Load and concatenate all valid CSVs in the trigger directory.
+        file_outside_segments(csv_path): Whether a file's coverage misses every segment.
+        apply_segment_cut(df): Keep only triggers whose end time lies in a segment.
         construct_gstlal_start_end(): Compute `tstart` and `tend` columns for triggers.
         condition_gstlal_triggers(): Read, filter, and compute full timing for triggers.
         return_max_start_end(): Return the minimum tstart and maximum tend for the triggers.
@@ -33,26 +42,42 @@ class GstlalHandler:
             self,
             trigger_path: Union[str, Path],
             ifo: str,
-            segment: bool = False
+            segment: bool = False,
+            segment_file: Optional[Union[str, Path, SegmentList]] = None,
         ) -> None:
             self.triggers = None
             self.ifo = ifo
             self.segment = segment
             self.trigger_path = trigger_path
+            self.segment_file = segment_file
+            self.segments = None
+
+            if self.segment:
+                if self.segment_file is None:
+                    msg = "segment=True requires a segment_file"
+                    logger.error(msg)
+                    raise ValueError(msg)
+
+                if isinstance(self.segment_file, SegmentList):
+                    self.segments = self.segment_file
+                else:
+                    self.segments = SegmentList.from_file(self.segment_file)
 
     def return_gstlal_file_list(self) -> List[str]:
         """
-        Return a list of all file paths in the trigger directory.
+        Return a list of all file paths in the trigger directory, sorted by name.
+
+        Sorting fixes the trigger order, and with it `trigger_id`, across machines.
 
         Returns:
             list[str]: List of full paths to files under `self.trigger_path`.
         """
         return [
             os.path.join(self.trigger_path, f)
-            for f in os.listdir(self.trigger_path) if f.endswith('.csv')
+            for f in sorted(os.listdir(self.trigger_path)) if f.endswith('.csv')
         ]
 
-        def read_gstlal_csv(self, csv_path: Union[str, path]) -> None:
+    def read_gstlal_csv(self, csv_path: Union[str, Path]) -> None:
         """
         Read a single GstLAL trigger CSV file.
 
@@ -70,16 +95,72 @@ class GstlalHandler:
         """
         csv_list = self.return_gstlal_file_list()
         dfs = []
+        skipped = 0
+        bytes_read = 0
+
+        with instrumentation.stage('gstlal.read') as rec:
+            for file in csv_list:
+                if self.segments is not None and self.file_outside_segments(file):
+                    skipped += 1
+                    continue
 
-        for file in csv_list:
-            df = pd.read_csv(file)
+                df = pd.read_csv(file)
+                bytes_read += os.path.getsize(file)
 
-            if len(df):
-                dfs.append(df)
+                if self.segments is not None:
+                    df = self.apply_segment_cut(df)
+
+                if len(df):
+                    dfs.append(df)
+
+            rec.bytes_read = bytes_read
+            rec.rows_out = sum(len(df) for df in dfs)
+
+        if skipped:
+            logger.info(f"Skipped {skipped} / {len(csv_list)} files outside of segments")
+
+        if not dfs:
+            msg = f"No GstLAL triggers found in {self.trigger_path}"
+            logger.error(msg)
+            raise RuntimeError(msg)
 
         self.triggers = pd.concat(dfs, ignore_index=True)
         self.triggers = self.triggers[self.triggers['ifo'] == self.ifo].copy()
 
+    def file_outside_segments(self, csv_path: Union[str, Path]) -> bool:
+        """
+        Check whether a trigger file's coverage lies entirely outside the segments.
+
+        Coverage is taken from T050017-style file names. Files without a
+        parseable name are never skipped and are filtered row by row instead.
+
+        Args:
+            csv_path (str): Path to a GstLAL CSV file.
+
+        Returns:
+            bool: True if the file can be skipped without reading it.
+        """
+        coverage = file_coverage(csv_path)
+
+        if coverage is None:
+            return False
+
+        return not self.segments.overlaps_range(*coverage)
+
+    def apply_segment_cut(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Keep only triggers whose end time falls inside the segment list.
+
+        Args:
+            df (pd.DataFrame): Raw GstLAL triggers with `end_time` and `end_time_ns`.
+
+        Returns:
+            pd.DataFrame: Triggers inside the segments.
+        """
+        tend = df['end_time'].values + 1e-9 * df['end_time_ns'].values
+
+        return df[self.segments.contains(tend)]
+
     def construct_gstlal_start_end(self) -> None:
         """
         Compute `tstart` and `tend` columns for each trigger.
@@ -99,22 +180,14 @@ class GstlalHandler:
         """
         Load and condition all GstLAL triggers.
 
-        This includes loading CSVs, filtering by IFO, and calculating timing columns.
+        This includes loading CSVs, filtering by IFO and, in segment mode,
+        by segment membership, and calculating timing columns.
 
         Returns:
             pd.DataFrame: A DataFrame of conditioned GstLAL triggers.
-
-        Raises:
-            RuntimeError: If segment-based conditioning is requested (not supported).
         """
-        if not self.segment:
-            self.read_all_gstlal_csv()
-            self.construct_gstlal_start_end()
-
-        else:
-            msg = "segment=True not supported yet"
-            logger.error(msg)
-            raise RuntimeError(msg)
+        self.read_all_gstlal_csv()
+        self.construct_gstlal_start_end()
 
         return self.triggers
 
@@ -6,7 +6,9 @@ from pathlib import Path
 import logging
 import argparse
 import pandas as pd
-import duckdb
+
+from pinch.utils.segments import SegmentList
+from pinch.utils import instrumentation
 
 logger = logging.getLogger(__name__)
 
@@ -15,29 +17,37 @@ class OmicronHandler:
     A handler class for loading, filtering, and conditioning Omicron trigger data.
 
     This class reads an Omicron trigger CSV file, applies a signal-to-noise ratio (SNR)
-    cut, and computes start and end times for each trigger.
+    cut, and computes start and end times for each trigger. If a segment list is
+    supplied, the DuckDB query window is clipped to the segments and only triggers
+    overlapping a segment are kept.
 
     Attributes:
         omics (pd.DataFrame): DataFrame containing Omicron triggers.
+        segments (SegmentList or None): Optional segments restricting the triggers.
 
     Methods:
         read_omicron_csv(csv_path): Load Omicron triggers from CSV.
         apply_omicron_snr_cut(omicron_snr_cut): Filter triggers by SNR.
         construct_omicron_start_end(): Add `tstart` and `tend` columns.
+        apply_segment_cut(): Drop triggers that do not overlap any segment.
         condition_omicron(): Apply all processing steps and return the result.
     """
     def __init__(
             self,
             path: Union[str, Path],
             start: Optional[int | float] = None,
-            end: Optional[int | float] = None
+            end: Optional[int | float] = None,
+            segments: Optional[SegmentList] = None,
         ) -> None:
-            self.path = path
-            self.start = start
-            self.end = end
+        self.path = str(path)
+        self.start = start
+        self.end = end
+        self.segments = segments
 
         if self.path.endswith('.csv'):
-            self.omics = self.read_omicron_csv(self.path)
+            with instrumentation.stage('omicron.read') as rec:
+                self.omics = self.read_omicron_csv(self.path)
+                rec.rows_out = len(self.omics)
 
         elif self.path.endswith('.duckdb'):
             if (not self.start) or (not self.end):
@@ -45,7 +55,19 @@ class OmicronHandler:
                 logger.error(msg)
                 raise AttributeError(msg)
 
-            self.omics = self.query_duckdb()
+            if self.segments is not None:
+                window = self.segments.clip_window(self.start, self.end)
+
+                if window is None:
+                    msg = "Omicron query window lies entirely outside of segments"
+                    logger.error(msg)
+                    raise ValueError(msg)
+
+                self.start, self.end = window
+
+            with instrumentation.stage('omicron.query') as rec:
+                self.omics = self.query_duckdb()
+                rec.rows_out = len(self.omics)
 
     def read_omicron_csv(self, csv_path: Union[str, Path]) -> pd.DataFrame:
         """
@@ -60,6 +82,8 @@ class OmicronHandler:
         return pd.read_csv(csv_path)
 
     def query_duckdb(self) -> pd.DataFrame:
+        # imported here so CSV runs never load duckdb
+        import duckdb
 
         con = duckdb.connect(self.path)
 
@@ -114,9 +138,17 @@ class OmicronHandler:
                     self.omics['tstart'] + self.omics['duration']
                 )
 
+    def apply_segment_cut(self) -> None:
+        """
+        Keep only Omicron triggers whose [tstart, tend] overlaps a segment.
+        """
+        mask = self.segments.intersects(self.omics['tstart'].values, self.omics['tend'].values)
+        self.omics = self.omics[mask].copy()
+
     def condition_omicron(self) -> pd.DataFrame:
         """
-        Apply SNR cut and compute start/end times for Omicron triggers.
+        Apply SNR cut, compute start/end times and, if segments were supplied,
+        drop triggers outside of them.
 
         Returns:
             pd.DataFrame: Filtered and augmented Omicron triggers.
@@ -124,6 +156,9 @@ class OmicronHandler:
         self.apply_omicron_snr_cut()
         self.construct_omicron_start_end()
 
+        if self.segments is not None:
+            self.apply_segment_cut()
+
         return self.omics
 
 
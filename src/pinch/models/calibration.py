@@ -0,0 +1,78 @@
+#! /usr/bin/env/python3
+
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreCalibration:
+    """
+    A compressed empirical CDF of clean-trigger SVM scores.
+
+    The clean set is scored once and summarized by its score quantiles at a
+    fixed set of CDF levels: evenly spaced levels for the bulk, plus
+    log-spaced levels approaching 1 so the upper tail, where glitch-like
+    triggers fall, keeps resolution down to p ~ 1 / n_samples. A trigger's
+    p-value is the fraction of clean triggers scoring at least as high,
+    interpolated from the table, so the per-trigger cost is one binary search.
+
+    Attributes:
+        levels (np.ndarray): Increasing CDF levels in [0, 1].
+        quantiles (np.ndarray): Clean scores at each level.
+        n_samples (int): Number of clean triggers summarized.
+
+    Methods:
+        fit(scores, n_quantiles): Build the table from clean scores.
+        pvalue(scores): Return calibrated p-values for scores.
+    """
+    def __init__(self, levels: np.ndarray, quantiles: np.ndarray, n_samples: int) -> None:
+        self.levels = np.asarray(levels, dtype=np.float64)
+        self.quantiles = np.asarray(quantiles, dtype=np.float64)
+        self.n_samples = int(n_samples)
+
+    @classmethod
+    def fit(cls, scores: np.ndarray, n_quantiles: int = 1000) -> 'ScoreCalibration':
+        """
+        Summarize clean-trigger scores by their quantiles.
+
+        Args:
+            scores (np.ndarray): `svm_score` of every clean trigger.
+            n_quantiles (int): Number of evenly spaced CDF levels.
+
+        Returns:
+            ScoreCalibration: The quantile table.
+
+        Raises:
+            ValueError: If `scores` is empty.
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+
+        if not len(scores):
+            msg = "Cannot calibrate on an empty set of scores"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        n_tail = max(int(np.ceil(np.log10(len(scores)))), 1)
+        tail = 1.0 - np.logspace(-2, -n_tail, 20 * (n_tail - 2) + 1) if n_tail > 2 else np.empty(0)
+
+        levels = np.unique(np.concatenate([np.linspace(0.0, 1.0, n_quantiles + 1), tail]))
+        quantiles = np.quantile(scores, levels)
+
+        return cls(levels, quantiles, len(scores))
+
+    def pvalue(self, scores: np.ndarray) -> np.ndarray:
+        """
+        Return the fraction of clean triggers scoring at least as high.
+
+        Scores beyond the largest clean score get the floor 1 / (n_samples + 1).
+
+        Args:
+            scores (np.ndarray): `svm_score` values.
+
+        Returns:
+            np.ndarray: P-values in [1 / (n_samples + 1), 1].
+        """
+        cdf = np.interp(scores, self.quantiles, self.levels, left=0.0, right=1.0)
+
+        return np.maximum(1.0 - cdf, 1.0 / (self.n_samples + 1))
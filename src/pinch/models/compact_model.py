@@ -0,0 +1,231 @@
+#! /usr/bin/env/python3
+
+import numpy as np
+import logging
+
+from typing import Dict, List, Optional, Union
+from pathlib import Path
+
+from pinch.models.score_grid import ScoreGrid
+from pinch.models.calibration import ScoreCalibration
+
+logger = logging.getLogger(__name__)
+
+# bump whenever the set or meaning of stored arrays changes
+FORMAT_VERSION = 2
+
+_GRID_FIELDS = ['lower', 'upper', 'resolution', 'refine_factor', 'coarse', 'cell_map', 'fine', 'max_error']
+
+
+class CompactScaler:
+    """
+    A NumPy-only stand-in for a fitted StandardScaler.
+
+    Attributes:
+        mean_ (np.ndarray): Per-feature mean.
+        scale_ (np.ndarray): Per-feature standard deviation.
+    """
+    def __init__(self, mean: np.ndarray, scale: np.ndarray) -> None:
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+
+    def transform(self, features: np.ndarray) -> np.ndarray:
+        """
+        Standardize features exactly as StandardScaler.transform does.
+
+        Args:
+            features (np.ndarray): Unscaled (n, d) features.
+
+        Returns:
+            np.ndarray: Scaled features.
+        """
+        return (np.asarray(features, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class CompactRBFModel:
+    """
+    A NumPy-only RBF kernel expansion with the OneClassSVM decision function.
+
+    decision(x) = sum_i dual_coef[i] * exp(-gamma * ||x - sv_i||^2) + intercept
+
+    Kernel terms are accumulated sequentially over support vectors, with squared
+    distances summed feature by feature, which mirrors the order of operations
+    in libsvm's dense predictor. Scores agree with scikit-learn to within a few
+    ulps; exact bit equality additionally depends on NumPy's `exp` matching the
+    platform libm used by libsvm.
+
+    Attributes:
+        support_vectors (np.ndarray): (m, d) support vectors in scaled space.
+        dual_coef (np.ndarray): (m,) expansion weights.
+        intercept (float): Constant offset.
+        gamma (float): RBF kernel width parameter.
+    """
+    def __init__(
+            self,
+            support_vectors: np.ndarray,
+            dual_coef: np.ndarray,
+            intercept: float,
+            gamma: float,
+        ) -> None:
+
+        self.support_vectors = np.ascontiguousarray(support_vectors, dtype=np.float64)
+        self.dual_coef = np.asarray(dual_coef, dtype=np.float64).ravel()
+        self.intercept = float(intercept)
+        self.gamma = float(gamma)
+
+    @classmethod
+    def from_sklearn(cls, model) -> 'CompactRBFModel':
+        """
+        Extract the kernel expansion from a fitted RBF OneClassSVM.
+
+        Args:
+            model (OneClassSVM): Fitted model with kernel='rbf'.
+
+        Returns:
+            CompactRBFModel: The equivalent NumPy model.
+
+        Raises:
+            ValueError: If the model is not an RBF OneClassSVM.
+        """
+        if getattr(model, 'kernel', None) != 'rbf' or not hasattr(model, 'support_vectors_'):
+            msg = f"Compact format only supports RBF OneClassSVM models, got {type(model).__name__}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        return cls(
+                support_vectors=model.support_vectors_,
+                dual_coef=model.dual_coef_[0],
+                intercept=model.intercept_[0],
+                gamma=model._gamma,
+            )
+
+    def decision_function(self, scaled: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the decision function on scaled features.
+
+        Args:
+            scaled (np.ndarray): (n, d) scaled features.
+
+        Returns:
+            np.ndarray: Decision values; negative values are outliers.
+        """
+        scaled = np.asarray(scaled, dtype=np.float64)
+        total = np.zeros(len(scaled), dtype=np.float64)
+        sqdist = np.empty(len(scaled), dtype=np.float64)
+        diff = np.empty(len(scaled), dtype=np.float64)
+
+        for sv, coef in zip(self.support_vectors, self.dual_coef):
+            sqdist.fill(0.0)
+
+            for dim in range(scaled.shape[1]):
+                np.subtract(scaled[:, dim], sv[dim], out=diff)
+                sqdist += diff * diff
+
+            total += coef * np.exp(-self.gamma * sqdist)
+
+        return total + self.intercept
+
+
+def save_compact(
+        path: Union[str, Path],
+        model: CompactRBFModel,
+        scaler: CompactScaler,
+        cutoff_params: List[str],
+        score_grid: Optional[ScoreGrid] = None,
+        calibration: Optional[ScoreCalibration] = None,
+    ) -> None:
+    """
+    Write a model to the versioned, pickle-free `.npz` format.
+
+    Args:
+        path (str): Output `.npz` path.
+        model (CompactRBFModel): Kernel expansion to store.
+        scaler (CompactScaler or StandardScaler): Fitted scaler (uses `mean_`/`scale_`).
+        cutoff_params (list[str]): Feature names in model order.
+        score_grid (ScoreGrid, optional): Precomputed score grid to store alongside.
+        calibration (ScoreCalibration, optional): Clean-score quantile table to store alongside.
+    """
+    arrays = {
+        'format_version': np.array(FORMAT_VERSION),
+        'support_vectors': model.support_vectors,
+        'dual_coef': model.dual_coef,
+        'intercept': np.array(model.intercept),
+        'gamma': np.array(model.gamma),
+        'scaler_mean': np.asarray(scaler.mean_, dtype=np.float64),
+        'scaler_scale': np.asarray(scaler.scale_, dtype=np.float64),
+        'cutoff_params': np.array(cutoff_params, dtype=str),
+    }
+
+    if score_grid is not None:
+        for field in _GRID_FIELDS:
+            value = getattr(score_grid, field)
+            arrays[f"grid_{field}"] = np.array(np.nan if value is None else value)
+
+    if calibration is not None:
+        arrays['calibration_levels'] = calibration.levels
+        arrays['calibration_quantiles'] = calibration.quantiles
+        arrays['calibration_n_samples'] = np.array(calibration.n_samples)
+
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+
+
+def load_compact(path: Union[str, Path]) -> Dict[str, object]:
+    """
+    Read a model written by `save_compact`.
+
+    Args:
+        path (str): Path to the `.npz` file.
+
+    Returns:
+        dict: `model`, `scaler`, `cutoff_params`, `score_grid` and `calibration` (or None).
+
+    Raises:
+        ValueError: If the file was written by a newer format version.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        version = int(data['format_version'])
+
+        if version > FORMAT_VERSION:
+            msg = f"Compact model format version {version} is newer than supported version {FORMAT_VERSION}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        score_grid = None
+
+        if 'grid_coarse' in data.files:
+            grid = {field: data[f"grid_{field}"] for field in _GRID_FIELDS}
+            max_error = float(grid['max_error'])
+
+            score_grid = ScoreGrid(
+                    lower=grid['lower'],
+                    upper=grid['upper'],
+                    resolution=int(grid['resolution']),
+                    refine_factor=int(grid['refine_factor']),
+                    coarse=grid['coarse'],
+                    cell_map=grid['cell_map'],
+                    fine=grid['fine'],
+                    max_error=None if np.isnan(max_error) else max_error,
+                )
+
+        calibration = None
+
+        if 'calibration_levels' in data.files:
+            calibration = ScoreCalibration(
+                    data['calibration_levels'],
+                    data['calibration_quantiles'],
+                    int(data['calibration_n_samples']),
+                )
+
+        return {
+            'model': CompactRBFModel(
+                support_vectors=data['support_vectors'],
+                dual_coef=data['dual_coef'],
+                intercept=float(data['intercept']),
+                gamma=float(data['gamma']),
+            ),
+            'scaler': CompactScaler(data['scaler_mean'], data['scaler_scale']),
+            'cutoff_params': data['cutoff_params'].tolist(),
+            'score_grid': score_grid,
+            'calibration': calibration,
+        }
@@ -0,0 +1,206 @@
+#! /usr/bin/env/python3
+
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+import pandas as pd
+
+from typing import Dict, List, Sequence, Union
+from pathlib import Path
+import logging
+
+from pinch.models.one_class_svm import SVMClassifier
+from pinch.models.features import build_feature_matrix
+
+logger = logging.getLogger(__name__)
+
+AGGREGATES = {
+    'min': np.min,
+    'mean': np.mean,
+    'max': np.max,
+    'median': np.median,
+    'std': np.std,
+}
+
+# per-process copy of the ensemble, installed once by the pool initializer
+_ENSEMBLE_STATE = {}
+
+
+def _init_ensemble_worker(models: List[SVMClassifier], columns: List[np.ndarray]) -> None:
+    _ENSEMBLE_STATE['models'] = models
+    _ENSEMBLE_STATE['columns'] = columns
+
+
+def _score_ensemble_block(block: np.ndarray) -> np.ndarray:
+    return _score_models(_ENSEMBLE_STATE['models'], _ENSEMBLE_STATE['columns'], block)
+
+
+def _score_models(models: List[SVMClassifier], columns: List[np.ndarray], block: np.ndarray) -> np.ndarray:
+    scores = np.empty((len(block), len(models)), dtype=np.float64)
+
+    for k, (model, cols) in enumerate(zip(models, columns)):
+        scores[:, k] = model.score_features(block[:, cols])
+
+    return scores
+
+
+class EnsembleScorer:
+    """
+    Score triggers against several trained SVM models in one pass.
+
+    The feature matrix is built once over the union of every model's
+    `cutoff_params`. Triggers are then scored in blocks of
+    `score_block_size` rows: each block is scaled and scored by every model
+    in turn while it is hot in cache, so the only per-model cost is the
+    scaling and the kernel evaluation itself. With `n_jobs > 1`, blocks are
+    spread over a process pool whose workers receive the models once.
+
+    Output columns are `svm_score_<name>` for each model plus
+    `svm_score_<aggregate>` for each requested aggregate.
+
+    Attributes:
+        models (dict[str, SVMClassifier]): Models keyed by name.
+        aggregates (list[str]): Aggregates over models, from min, mean, max, median, std.
+        score_block_size (int): Rows scored per block.
+        n_jobs (int): Worker processes; 1 scores in-process.
+        feature_columns (list[str]): Union of the models' `cutoff_params`.
+
+    Methods:
+        from_paths(paths, ...): Load models from saved files.
+        score(df): Return the (n, K) matrix of scores.
+        evaluate(df): Return triggers with per-model and aggregate score columns.
+    """
+    def __init__(
+            self,
+            models: Dict[str, SVMClassifier],
+            aggregates: Sequence[str] = ('min', 'mean', 'max'),
+            score_block_size: int = 100000,
+            n_jobs: int = 1,
+        ) -> None:
+
+        unknown = [agg for agg in aggregates if agg not in AGGREGATES]
+
+        if unknown:
+            msg = f"Unsupported ensemble aggregates: {unknown}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        if not models:
+            msg = "Ensemble needs at least one model"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        clashes = [name for name in models if name in AGGREGATES]
+
+        if clashes:
+            msg = f"Ensemble model names clash with aggregate columns: {clashes}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.models = dict(models)
+        self.aggregates = list(aggregates)
+        self.score_block_size = score_block_size
+        self.n_jobs = n_jobs
+
+        self.feature_columns = []
+
+        for model in self.models.values():
+            self.feature_columns += [c for c in model.cutoff_params if c not in self.feature_columns]
+
+        self._columns = [
+            np.array([self.feature_columns.index(c) for c in model.cutoff_params])
+            for model in self.models.values()
+        ]
+
+    @classmethod
+    def from_paths(
+            cls,
+            paths: Dict[str, Union[str, Path]],
+            aggregates: Sequence[str] = ('min', 'mean', 'max'),
+            n_jobs: int = 1,
+        ) -> 'EnsembleScorer':
+        """
+        Load an ensemble of saved single models.
+
+        Args:
+            paths (dict[str, str]): Model file (pickle or `.npz`) keyed by name.
+            aggregates (sequence[str]): Aggregate columns to add.
+            n_jobs (int): Worker processes used to score.
+
+        Returns:
+            EnsembleScorer: The loaded ensemble.
+        """
+        models = {name: SVMClassifier.load_model(path) for name, path in paths.items()}
+
+        return cls(models, aggregates=aggregates, n_jobs=n_jobs)
+
+    def score(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Score every trigger with every model.
+
+        Args:
+            df (pd.DataFrame): Triggers to score.
+
+        Returns:
+            np.ndarray: (n, K) scores, one column per model in `models` order.
+        """
+        features = build_feature_matrix(df, self.feature_columns)
+        models = list(self.models.values())
+
+        n_rows = len(features)
+        scores = np.empty((n_rows, len(models)), dtype=np.float64)
+        bounds = [
+            (start, min(start + self.score_block_size, n_rows))
+            for start in range(0, n_rows, self.score_block_size)
+        ]
+
+        if self.n_jobs == 1 or len(bounds) <= 1:
+            for start, stop in bounds:
+                scores[start:stop] = _score_models(models, self._columns, features[start:stop])
+
+            return scores
+
+        with ProcessPoolExecutor(
+                max_workers=self.n_jobs,
+                initializer=_init_ensemble_worker,
+                initargs=(models, self._columns)) as pool:
+
+            pending = {}
+
+            for start, stop in bounds:
+                pending[pool.submit(_score_ensemble_block, features[start:stop])] = (start, stop)
+
+                if len(pending) < 2 * self.n_jobs:
+                    continue
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    block_start, block_stop = pending.pop(future)
+                    scores[block_start:block_stop] = future.result()
+
+            for future, (block_start, block_stop) in pending.items():
+                scores[block_start:block_stop] = future.result()
+
+        return scores
+
+    def evaluate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score triggers with every model and add aggregate columns.
+
+        Args:
+            df (pd.DataFrame): Triggers to score.
+
+        Returns:
+            pd.DataFrame: Shallow copy of the input with `svm_score_<name>` and
+            `svm_score_<aggregate>` columns.
+        """
+        scores = self.score(df)
+        scored = df.copy(deep=False)
+
+        for k, name in enumerate(self.models):
+            scored[f"svm_score_{name}"] = scores[:, k]
+
+        for agg in self.aggregates:
+            scored[f"svm_score_{agg}"] = AGGREGATES[agg](scores, axis=1)
+
+        return scored
@@ -0,0 +1,101 @@
+#! /usr/bin/env/python3
+
+import numpy as np
+import pandas as pd
+import logging
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# name -> (input columns, vectorized expression over their float64 arrays)
+FEATURES: Dict[str, Tuple[Tuple[str, ...], Callable[..., np.ndarray]]] = {}
+
+
+def register_feature(name: str, inputs: Sequence[str]) -> Callable:
+    """
+    Register a derived SVM feature.
+
+    The decorated function receives one float64 array per input column, in
+    order, and returns the feature as an array of the same length.
+
+    Example:
+        @register_feature('chisqBysnrsq', ('chisq', 'snr'))
+        def chisq_by_snrsq(chisq, snr):
+            return chisq / (snr * snr)
+
+    Args:
+        name (str): Feature name usable in `cutoff_params`.
+        inputs (sequence[str]): Trigger columns the expression reads.
+
+    Returns:
+        callable: Decorator registering the expression.
+    """
+    def decorator(expression: Callable[..., np.ndarray]) -> Callable[..., np.ndarray]:
+        FEATURES[name] = (tuple(inputs), expression)
+        return expression
+
+    return decorator
+
+
+@register_feature('chisqBysnrsq', ('chisq', 'snr'))
+def _chisq_by_snrsq(chisq: np.ndarray, snr: np.ndarray) -> np.ndarray:
+    return chisq / (snr * snr)
+
+
+def compute_feature(df: pd.DataFrame, name: str) -> np.ndarray:
+    """
+    Return a single feature as a float64 array.
+
+    Columns already present on `df` are used as is; otherwise the registered
+    expression is evaluated on the input columns.
+
+    Args:
+        df (pd.DataFrame): Triggers.
+        name (str): Column or registered feature name.
+
+    Returns:
+        np.ndarray: Feature values.
+
+    Raises:
+        ValueError: If `name` is neither a column nor a registered feature.
+    """
+    if name in df.columns:
+        return df[name].to_numpy(dtype=np.float64)
+
+    if name not in FEATURES:
+        msg = f"Unsupported param for training param: {name}"
+        logger.error(msg)
+        raise ValueError(msg)
+
+    inputs, expression = FEATURES[name]
+
+    return expression(*(df[column].to_numpy(dtype=np.float64) for column in inputs))
+
+
+def build_feature_matrix(
+        df: pd.DataFrame,
+        columns: List[str],
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+    """
+    Write the given features of every trigger into one float64 matrix.
+
+    Each column is filled straight from the DataFrame's arrays, without
+    adding columns to `df` or creating intermediate Series.
+
+    Args:
+        df (pd.DataFrame): Triggers.
+        columns (list[str]): Raw or registered feature names, in matrix order.
+        out (np.ndarray, optional): Preallocated (len(df), len(columns)) float64 matrix.
+
+    Returns:
+        np.ndarray: C-contiguous (n, d) feature matrix.
+    """
+    if out is None:
+        out = np.empty((len(df), len(columns)), dtype=np.float64)
+
+    for j, name in enumerate(columns):
+        out[:, j] = compute_feature(df, name)
+
+    return out
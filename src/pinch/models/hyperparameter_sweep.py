@@ -0,0 +1,167 @@
+#! /usr/bin/env/python3
+
+from __future__ import annotations
+
+import time
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from typing import TYPE_CHECKING, Dict, Sequence, Tuple, Union
+import logging
+
+if TYPE_CHECKING:
+    from sklearn.svm import OneClassSVM
+
+logger = logging.getLogger(__name__)
+
+# read-only scaled matrices, set once per worker process by the pool initializer
+_SWEEP_STATE = {}
+
+
+def _init_sweep_worker(train: np.ndarray, clean_holdout: np.ndarray, dirty_holdout: np.ndarray) -> None:
+    _SWEEP_STATE['train'] = train
+    _SWEEP_STATE['clean'] = clean_holdout
+    _SWEEP_STATE['dirty'] = dirty_holdout
+
+
+def _rank_auc(clean_scores: np.ndarray, dirty_scores: np.ndarray) -> float:
+    """
+    Probability that a dirty trigger scores above a clean one (Mann-Whitney U / n_c n_d).
+    """
+    ranks = pd.Series(np.concatenate([clean_scores, dirty_scores])).rank().to_numpy()
+    n_clean, n_dirty = len(clean_scores), len(dirty_scores)
+    u = ranks[n_clean:].sum() - n_dirty * (n_dirty + 1) / 2
+
+    return float(u / (n_clean * n_dirty))
+
+
+def _fit_config(nu: float, gamma: Union[str, float]) -> Tuple[Dict[str, object], OneClassSVM]:
+    from sklearn.svm import OneClassSVM
+
+    start = time.perf_counter()
+    model = OneClassSVM(kernel='rbf', nu=nu, gamma=gamma).fit(_SWEEP_STATE['train'])
+    fit_time = time.perf_counter() - start
+
+    clean_scores = -model.decision_function(_SWEEP_STATE['clean'])
+    dirty_scores = -model.decision_function(_SWEEP_STATE['dirty'])
+
+    result = {
+        'nu': nu,
+        'gamma': gamma,
+        'n_support_vectors': len(model.support_vectors_),
+        'clean_outlier_fraction': float(np.mean(clean_scores > 0)),
+        'dirty_outlier_fraction': float(np.mean(dirty_scores > 0)),
+        'auc': _rank_auc(clean_scores, dirty_scores),
+        'fit_time': fit_time,
+    }
+
+    return result, model
+
+
+class HyperparameterSweep:
+    """
+    A grid search over the OneClassSVM `nu` and `gamma` hyperparameters.
+
+    The caller scales the clean training sample and the held-out clean and
+    dirty triggers once. Those matrices are handed to each worker a single time
+    through the pool initializer and reused read-only by every fit, so only the
+    two hyperparameters travel with each task. Every configuration is scored
+    on the held-out sets and ranked by the AUC of dirty against clean triggers,
+    i.e. how well the model separates glitch-overlapping triggers from clean ones.
+
+    Attributes:
+        nu_grid (list[float]): Values of `nu` to try.
+        gamma_grid (list[str or float]): Values of `gamma` to try.
+        n_jobs (int): Worker processes; each fits one configuration at a time.
+        results (pd.DataFrame or None): One row per configuration, best first.
+        best_model (OneClassSVM or None): Fitted model of the best configuration.
+
+    Methods:
+        run(train, clean_holdout, dirty_holdout): Fit and score every configuration.
+        best_params(): Return the `nu` and `gamma` of the best configuration.
+    """
+    def __init__(
+            self,
+            nu_grid: Sequence[float],
+            gamma_grid: Sequence[Union[str, float]] = ('scale',),
+            n_jobs: int = 1,
+        ) -> None:
+
+        if not len(nu_grid) or not len(gamma_grid):
+            msg = "Hyperparameter sweep needs at least one value of nu and gamma"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.nu_grid = list(nu_grid)
+        self.gamma_grid = list(gamma_grid)
+        self.n_jobs = n_jobs
+
+        self.results = None
+        self.best_model = None
+
+    def run(
+            self,
+            train: np.ndarray,
+            clean_holdout: np.ndarray,
+            dirty_holdout: np.ndarray,
+        ) -> pd.DataFrame:
+        """
+        Fit and score every (nu, gamma) configuration.
+
+        Args:
+            train (np.ndarray): Scaled clean training features.
+            clean_holdout (np.ndarray): Scaled held-out clean features.
+            dirty_holdout (np.ndarray): Scaled dirty features.
+
+        Returns:
+            pd.DataFrame: Per-configuration metrics sorted by descending `auc`.
+        """
+        configs = list(itertools.product(self.nu_grid, self.gamma_grid))
+        state = (train, clean_holdout, dirty_holdout)
+
+        logger.info(f"Sweeping {len(configs)} configurations on {len(train)} training triggers with {self.n_jobs} workers")
+
+        if self.n_jobs == 1:
+            _init_sweep_worker(*state)
+            fitted = [_fit_config(nu, gamma) for nu, gamma in configs]
+            _SWEEP_STATE.clear()
+        else:
+            with ProcessPoolExecutor(
+                    max_workers=min(self.n_jobs, len(configs)),
+                    initializer=_init_sweep_worker,
+                    initargs=state,
+                ) as pool:
+                futures = [pool.submit(_fit_config, nu, gamma) for nu, gamma in configs]
+                fitted = [future.result() for future in futures]
+
+        results = pd.DataFrame([result for result, _ in fitted])
+        order = np.argsort(-results['auc'].to_numpy(), kind='stable')
+
+        self.results = results.iloc[order].reset_index(drop=True)
+        self.best_model = fitted[order[0]][1]
+
+        best = self.results.iloc[0]
+        logger.info(f"Best configuration: nu={best['nu']}, gamma={best['gamma']}, auc={best['auc']:.4f}")
+
+        return self.results
+
+    def best_params(self) -> Dict[str, object]:
+        """
+        Return the hyperparameters of the best configuration.
+
+        Returns:
+            dict: `nu` and `gamma`.
+
+        Raises:
+            RuntimeError: If the sweep has not been run.
+        """
+        if self.results is None:
+            msg = "Hyperparameter sweep has not been run"
+            logger.error(msg)
+            raise RuntimeError(msg)
+
+        best = self.results.iloc[0]
+
+        return {'nu': best['nu'], 'gamma': best['gamma']}
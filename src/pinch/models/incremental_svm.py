@@ -0,0 +1,254 @@
+#! /usr/bin/env/python3
+
+import time
+import numpy as np
+import pandas as pd
+
+from typing import List, Optional, Tuple, Union
+from pathlib import Path
+import logging
+
+from pinch.models.one_class_svm import SVMClassifier
+from pinch.models.features import build_feature_matrix
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalSVMClassifier:
+    """
+    A one-class SVM kept current on a stream of clean triggers.
+
+    New clean triggers are written into a fixed-size ring buffer (the
+    reservoir) holding the most recent `reservoir_size` triggers. The
+    per-feature mean and variance of the reservoir are maintained
+    incrementally from running sums as rows enter and leave, so each update
+    costs O(batch) regardless of run length.
+
+    The drift statistic compares the reservoir to the data the model was last
+    fit on, in units of the model's scaler:
+
+        drift = max_j |mean_j - ref_mean_j| / ref_std_j + |log(std_j / ref_std_j)|
+
+    Only when it reaches `drift_threshold` is the model updated. The scaler
+    is first set from the reservoir's running mean and variance, so it is
+    never refit from scratch; then exact models are refit on a sample of the
+    reservoir, and approx models are warm-updated with `partial_fit` over the
+    reservoir on the new scaling, keeping the kernel feature map. Either way
+    the p-value calibration is rebuilt on the reservoir. Every decision is
+    logged and kept in `history`.
+
+    Attributes:
+        classifier (SVMClassifier): The wrapped model used for scoring.
+        reservoir_size (int): Capacity of the ring buffer.
+        n_samples (int): Rows sampled from the reservoir for an exact refit.
+        drift_threshold (float): Drift at which the model is updated.
+        min_fit_size (int): Reservoir rows required before the first fit.
+        n_seen (int): Clean triggers received so far.
+        history (list[dict]): One record per `update` call.
+
+    Methods:
+        update(clean_df): Add clean triggers and update the model if drift warrants it.
+        drift(): Return the current drift statistic.
+        evaluate(df): Score triggers with the current model.
+        save_model(path): Save the current model.
+        return_history(): Return the logged decisions as a DataFrame.
+    """
+    def __init__(
+            self,
+            cutoff_params: Optional[List[str]] = None,
+            reservoir_size: int = 100000,
+            n_samples: int = 10000,
+            drift_threshold: float = 0.1,
+            min_fit_size: int = 1000,
+            model_type: str = 'exact',
+            nu: float = 0.01,
+            gamma: Union[str, float] = 'scale',
+            random_state: Optional[int] = None,
+        ) -> None:
+
+        self.classifier = SVMClassifier(
+                cutoff_params=cutoff_params,
+                model_type=model_type,
+                nu=nu,
+                gamma=gamma,
+                random_state=random_state,
+            )
+        self.reservoir_size = reservoir_size
+        self.n_samples = n_samples
+        self.drift_threshold = drift_threshold
+        self.min_fit_size = min_fit_size
+        self.n_seen = 0
+        self.history = []
+
+        n_features = len(self.classifier.cutoff_params)
+
+        self._reservoir = np.empty((reservoir_size, n_features), dtype=np.float64)
+        self._occupied = np.zeros(reservoir_size, dtype=bool)
+        self._head = 0
+        self._sum = np.zeros(n_features)
+        self._sumsq = np.zeros(n_features)
+
+        self._ref_mean = None
+        self._ref_std = None
+
+    @property
+    def n_reservoir(self) -> int:
+        return min(self.n_seen, self.reservoir_size)
+
+    def _insert(self, rows: np.ndarray) -> None:
+        rows = rows[-self.reservoir_size:]
+        idx = (self._head + np.arange(len(rows))) % self.reservoir_size
+
+        evicted = self._reservoir[idx[self._occupied[idx]]]
+        self._sum += rows.sum(axis=0) - evicted.sum(axis=0)
+        self._sumsq += (rows * rows).sum(axis=0) - (evicted * evicted).sum(axis=0)
+
+        self._reservoir[idx] = rows
+        self._occupied[idx] = True
+        self._head = (self._head + len(rows)) % self.reservoir_size
+
+    def _moments(self) -> Tuple[np.ndarray, np.ndarray]:
+        n = self.n_reservoir
+        mean = self._sum / n
+        var = np.maximum(self._sumsq / n - mean * mean, 1e-300)
+
+        return mean, np.sqrt(var)
+
+    def _contents(self) -> np.ndarray:
+        return self._reservoir[self._occupied] if self.n_reservoir < self.reservoir_size else self._reservoir
+
+    def drift(self) -> float:
+        """
+        Return the drift of the reservoir from the data of the last fit.
+
+        Returns:
+            float: Drift statistic; infinite if the model has not been fit.
+        """
+        if self._ref_mean is None:
+            return np.inf
+
+        mean, std = self._moments()
+
+        return float(np.max(np.abs(mean - self._ref_mean) / self._ref_std + np.abs(np.log(std / self._ref_std))))
+
+    def update(self, clean_df: pd.DataFrame) -> str:
+        """
+        Add clean triggers to the reservoir and update the model if needed.
+
+        Args:
+            clean_df (pd.DataFrame): New clean triggers.
+
+        Returns:
+            str: The action taken: 'wait', 'skip', 'fit', 'refit' or 'warm_update'.
+        """
+        start = time.perf_counter()
+
+        self._insert(build_feature_matrix(clean_df, self.classifier.cutoff_params))
+        self.n_seen += len(clean_df)
+
+        drift = self.drift()
+
+        if self.classifier.model is None:
+            action = 'fit' if self.n_reservoir >= self.min_fit_size else 'wait'
+        elif drift < self.drift_threshold:
+            action = 'skip'
+        elif self.classifier.model_type == 'approx':
+            action = 'warm_update'
+        else:
+            action = 'refit'
+
+        if action in ('fit', 'refit'):
+            self._refit()
+        elif action == 'warm_update':
+            self._warm_update()
+
+        record = {
+            'n_rows': len(clean_df),
+            'n_seen': self.n_seen,
+            'n_reservoir': self.n_reservoir,
+            'drift': drift,
+            'action': action,
+            'seconds': time.perf_counter() - start,
+        }
+        self.history.append(record)
+
+        logger.info(
+                f"Incremental update: {record['n_rows']} new triggers, drift {drift:.3g} "
+                f"(threshold {self.drift_threshold:g}) -> {action} in {record['seconds']:.2f} s"
+            )
+
+        return action
+
+    def _set_reference(self) -> None:
+        # resum exactly so rounding in the running sums never accumulates across fits
+        contents = self._contents()
+        self._sum = contents.sum(axis=0)
+        self._sumsq = (contents * contents).sum(axis=0)
+
+        self._ref_mean, self._ref_std = self._moments()
+
+    def _update_scaler(self) -> None:
+        # the running moments are the reservoir's mean and variance, i.e. what fitting a scaler would compute
+        scaler = self.classifier.scaler
+        mean, std = self._moments()
+
+        scaler.mean_ = mean
+        scaler.var_ = std * std
+        scaler.scale_ = np.where(std < 10 * np.finfo(np.float64).eps, 1.0, std)
+        scaler.n_samples_seen_ = self.n_reservoir
+        scaler.n_features_in_ = len(mean)
+
+    def _refit(self) -> None:
+        contents = pd.DataFrame(self._contents(), columns=self.classifier.cutoff_params)
+
+        self._set_reference()
+        self._update_scaler()
+        self.classifier.train_model(contents, n_samples=self.n_samples, fit_scaler=False)
+
+    def _warm_update(self) -> None:
+        contents = self._contents()
+
+        self._set_reference()
+        self._update_scaler()
+
+        feature_map = self.classifier.model.named_steps['feature_map']
+        ocsvm = self.classifier.model.named_steps['ocsvm']
+
+        order = np.random.default_rng(self.classifier.random_state).permutation(len(contents))
+        batch_size = self.classifier.batch_size
+
+        for block in range(0, len(contents), batch_size):
+            batch = contents[order[block:block + batch_size]]
+            ocsvm.partial_fit(feature_map.transform(self.classifier.scaler.transform(batch)))
+
+        self.classifier._calibrate_features(contents)
+
+    def evaluate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score triggers with the current model.
+
+        Args:
+            df (pd.DataFrame): DataFrame to score.
+
+        Returns:
+            pd.DataFrame: Shallow copy of the input with `svm_score` (and `svm_pvalue`).
+        """
+        return self.classifier.evaluate(df)
+
+    def save_model(self, path: str | Path) -> None:
+        """
+        Save the current model; the reservoir is not saved.
+
+        Args:
+            path (str): Path to save the model file.
+        """
+        self.classifier.save_model(path)
+
+    def return_history(self) -> pd.DataFrame:
+        """
+        Return the logged update decisions.
+
+        Returns:
+            pd.DataFrame: One row per `update` call.
+        """
+        return pd.DataFrame(self.history)
@@ -0,0 +1,160 @@
+#! /usr/bin/env/python3
+
+import os
+import json
+import hashlib
+import numpy as np
+
+from typing import Callable, Dict, Optional, TypeVar, Union
+from pathlib import Path
+import logging
+
+logger = logging.getLogger(__name__)
+
+# bump when the fingerprint recipe changes so stale entries are never matched
+CACHE_VERSION = 3
+
+T = TypeVar('T')
+
+
+class ModelCache:
+    """
+    A content-addressed directory of trained models.
+
+    Each entry is keyed by a SHA-256 fingerprint of the clean training
+    features together with the training parameters (`cutoff_params`,
+    hyperparameters, sampling seed, ...), so a model is reused only when it
+    would be retrained from identical inputs. Reading an entry refreshes its
+    modification time, and after every insert the least recently used entries
+    are removed until the directory fits within `max_bytes`.
+
+    Attributes:
+        cache_dir (Path): Directory holding the cached model files.
+        max_bytes (int or None): Size cap of the directory; None disables eviction.
+        suffix (str): File extension of cached models.
+
+    Methods:
+        fingerprint(features, params): Return the cache key of a training set.
+        path(key): Return the file path of a key.
+        get(key, load_fn): Load a cached model, or return None on a miss.
+        put(key, save_fn): Store a model and evict old entries.
+        evict(keep): Remove least recently used entries beyond `max_bytes`.
+    """
+    def __init__(
+            self,
+            cache_dir: Union[str, Path],
+            max_bytes: Optional[int] = None,
+            suffix: str = '.pkl',
+        ) -> None:
+
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def fingerprint(features: np.ndarray, params: Dict[str, object]) -> str:
+        """
+        Hash a training feature matrix and the training parameters.
+
+        The shape and raw values of the matrix are hashed, so any change to
+        the clean set (rows, order or values) produces a different key.
+
+        Args:
+            features (np.ndarray): (n, d) float64 training features.
+            params (dict): JSON-serializable training parameters, including
+                the feature names in column order.
+
+        Returns:
+            str: Hex digest.
+        """
+        features = np.ascontiguousarray(features, dtype=np.float64)
+
+        digest = hashlib.sha256()
+        digest.update(json.dumps({'version': CACHE_VERSION, **params}, sort_keys=True, default=str).encode())
+        digest.update(str(features.shape).encode())
+        digest.update(features.tobytes())
+
+        return digest.hexdigest()
+
+    def path(self, key: str) -> Path:
+        """
+        Return the file path of a cache key.
+        """
+        return self.cache_dir / f"{key}{self.suffix}"
+
+    def get(self, key: str, load_fn: Callable[[Path], T]) -> Optional[T]:
+        """
+        Load a cached model.
+
+        Args:
+            key (str): Cache key from `fingerprint`.
+            load_fn (callable): Loads a model from a path.
+
+        Returns:
+            The loaded model, or None if the key is not cached.
+        """
+        path = self.path(key)
+
+        if not path.exists():
+            logger.info(f"Model cache miss: {key[:12]}")
+            return None
+
+        logger.info(f"Model cache hit: {key[:12]} ({path})")
+        os.utime(path)
+
+        return load_fn(path)
+
+    def put(self, key: str, save_fn: Callable[[Path], None]) -> Path:
+        """
+        Store a model under `key` and evict old entries.
+
+        The model is written to a temporary file and renamed into place, so
+        concurrent readers never see a partially written entry.
+
+        Args:
+            key (str): Cache key from `fingerprint`.
+            save_fn (callable): Writes the model to a path.
+
+        Returns:
+            Path: Path of the cached model.
+        """
+        path = self.path(key)
+        tmp_path = self.cache_dir / f".{key}.{os.getpid()}.tmp{self.suffix}"
+
+        save_fn(tmp_path)
+        os.replace(tmp_path, path)
+
+        logger.info(f"Cached model {key[:12]} ({path.stat().st_size / 1e6:.1f} MB)")
+        self.evict(keep=path)
+
+        return path
+
+    def evict(self, keep: Optional[Path] = None) -> None:
+        """
+        Remove least recently used entries until the cache fits within `max_bytes`.
+
+        Args:
+            keep (Path, optional): Entry that must not be removed, e.g. the one just written.
+        """
+        if self.max_bytes is None:
+            return
+
+        entries = sorted(
+                (p.stat().st_mtime, p.stat().st_size, p)
+                for p in self.cache_dir.glob(f"*{self.suffix}")
+                if not p.name.startswith('.')
+            )
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+
+            if keep is not None and path == keep:
+                continue
+
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.info(f"Evicted cached model {path.name}")
@@ -1,38 +1,103 @@
 #! /usr/bin/env/python3
+from __future__ import annotations
 
 import os
 import pickle as pkl
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
 import pandas as pd
 
-from typing import Optional, List, Union
+from typing import Optional, List, Union, TYPE_CHECKING
 from pathlib import Path
 import logging
 
-from sklearn.svm import OneClassSVM
-from sklearn.preprocessing import StandardScaler
+from pinch.models.score_grid import ScoreGrid
+from pinch.models.calibration import ScoreCalibration
+from pinch.models.compact_model import CompactRBFModel, save_compact, load_compact
+from pinch.models.features import build_feature_matrix, compute_feature
+
+# scikit-learn is only needed to train; it is imported where used so that
+# scoring with a compact .npz model never loads it
+if TYPE_CHECKING:
+    from sklearn.svm import OneClassSVM
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.kernel_approximation import Nystroem, RBFSampler
 
 logger = logging.getLogger(__name__)
 
+# per-process copy of the scaler and model, installed once by the pool initializer
+_WORKER_STATE = {}
+
+
+def _init_scoring_worker(scaler: StandardScaler, model: OneClassSVM) -> None:
+    _WORKER_STATE['scaler'] = scaler
+    _WORKER_STATE['model'] = model
+
+
+def _score_block(block: np.ndarray) -> np.ndarray:
+    return -_WORKER_STATE['model'].decision_function(_WORKER_STATE['scaler'].transform(block))
+
+
+def parse_gamma(value: str) -> Union[str, float]:
+    """
+    Parse an RBF `gamma` given on the command line: 'scale', 'auto' or a positive float.
+    """
+    if value in ('scale', 'auto'):
+        return value
+
+    return float(value)
+
 
 class SVMClassifier:
     """
     A one-class SVM classifier with preprocessing and feature engineering.
 
     This class supports training and evaluating a one-class SVM using features derived
-    from pipeline triggers. It also handles saving/loading models with their scalers.
+    from pipeline triggers. It also handles saving/loading models with their scalers,
+    either as a pickle or, for exact RBF models, as a versioned pickle-free `.npz`
+    file that is scored with NumPy alone.
+
+    Two training modes are available:
+        - "exact": an RBF OneClassSVM fit on a random sample of the clean set.
+        - "approx": an RBF kernel approximation (Nystroem or random Fourier
+          features) followed by a linear SGDOneClassSVM, trained in mini-batches
+          over the entire clean set with an incrementally fit scaler.
 
     Attributes:
         cutoff_params (list[str]): Parameters used as SVM inputs.
-        model (OneClassSVM): Trained scikit-learn OneClassSVM model.
+        model (OneClassSVM or Pipeline): Trained model; a Pipeline of feature map
+            and SGDOneClassSVM in approx mode.
         scaler (StandardScaler): Scaler used to normalize feature data.
+        model_type (str): Training mode, "exact" or "approx".
+        nu (float): Upper bound on the fraction of training outliers.
+        gamma (str or float): RBF kernel width; "scale" uses 1 / (n_features * X.var()).
+        kernel_approximation (str): "nystroem" or "rff" in approx mode.
+        n_components (int): Dimension of the approximate feature map.
+        batch_size (int): Rows per mini-batch in approx mode.
+        n_epochs (int): Passes over the clean set in approx mode.
+        random_state (int or None): Seed for sampling and the approximate model.
+        score_block_size (int): Rows scored per block in `evaluate`.
+        n_jobs (int): Worker processes used by `evaluate`; 1 scores in-process.
+        score_grid (ScoreGrid or None): Optional precomputed score lookup for 2-D feature spaces.
+        calibration (ScoreCalibration or None): Quantile table of clean-set scores used for p-values.
+        n_quantiles (int): Evenly spaced CDF levels in the calibration table.
 
     Methods:
-        compute_training_params(df, param): Compute derived training features.
+        compute_training_params(df, param): Compute a derived training feature.
         apply_feature_engineering(df): Add engineered features to DataFrame if missing.
+        feature_matrix(df): Build the (n, d) float64 matrix of `cutoff_params`.
+        score(df): Return the `svm_score` of every row as an array.
         train_model(training_df, n_samples): Train the one-class SVM.
+        train_model_approx(training_df): Train the approximate model on all rows.
         evaluate(df): Score a new DataFrame using the trained SVM.
+        score_features(features): Score a raw feature matrix block by block.
+        build_score_grid(training_df): Precompute a 2-D score lookup grid for the trained model.
+        check_score_grid(df): Compare grid scores against exact scoring.
+        calibrate(clean_df): Store the clean-set score distribution for p-values.
+        compress_model(training_df, ratio): Replace the model with a reduced set of support vectors.
         save_model(path): Save model and scaler to a file.
         load_model(path, cutoff_params): Load model and scaler from file.
+        from_payload(payload, cutoff_params): Build an instance from an unpickled artifact.
         train_from_data(train_df, cutoff_params, n_samples): Train model and return instance.
     """
     def __init__(
@@ -40,38 +105,71 @@ class SVMClassifier:
             cutoff_params: Optional[List[str]] = None,
             model: Optional[OneClassSVM] = None,
             scaler: Optional[StandardScaler] = None,
+            model_type: str = 'exact',
+            nu: float = 0.01,
+            gamma: Union[str, float] = 'scale',
+            kernel_approximation: str = 'nystroem',
+            n_components: int = 500,
+            batch_size: int = 50000,
+            n_epochs: int = 5,
+            random_state: Optional[int] = None,
+            score_block_size: int = 100000,
+            n_jobs: int = 1,
+            score_grid: Optional[ScoreGrid] = None,
+            calibration: Optional[ScoreCalibration] = None,
+            n_quantiles: int = 1000,
             ) -> None:
 
             self.cutoff_params = cutoff_params or ['snr', 'chisqBysnrsq']
             self.model = model
-            self.scaler = scaler or StandardScaler()
-
-    def compute_training_params(self, df: pd.DataFrame, param: str) -> pd.Series:
+            self.scaler = scaler
+
+            if self.scaler is None:
+                from sklearn.preprocessing import StandardScaler
+                self.scaler = StandardScaler()
+            self.model_type = model_type
+            self.nu = nu
+            self.gamma = gamma
+            self.kernel_approximation = kernel_approximation
+            self.n_components = n_components
+            self.batch_size = batch_size
+            self.n_epochs = n_epochs
+            self.random_state = random_state
+            self.score_block_size = score_block_size
+            self.n_jobs = n_jobs
+            self.score_grid = score_grid
+            self.calibration = calibration
+            self.n_quantiles = n_quantiles
+
+            if self.model_type not in ('exact', 'approx'):
+                msg = f"Unsupported model_type: {self.model_type}"
+                logger.error(msg)
+                raise ValueError(msg)
+
+    def compute_training_params(self, df: pd.DataFrame, param: str) -> np.ndarray:
         """
         Compute a derived parameter for feature engineering.
 
         Args:
             df (pd.DataFrame): Input DataFrame.
-            param (str): Parameter to compute. Currently supports 'chisqBysnrsq'.
+            param (str): Parameter to compute, any feature registered in
+                `pinch.models.features` (e.g. 'chisqBysnrsq').
 
         Returns:
-            pd.Series: The computed parameter series.
+            np.ndarray: The computed parameter values.
 
         Raises:
             ValueError: If the parameter is not supported.
         """
-        if param == 'chisqBysnrsq':
-            return df['chisq'] / df['snr']**2
-
-        msg = f"Unsupported param for training param: {param}"
-        logger.error(msg)
-        raise ValueError(msg)
+        return compute_feature(df, param)
 
     def apply_feature_engineering(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Ensure required features are present in the DataFrame.
 
-        If any features in `self.cutoff_params` are missing, they are computed.
+        If any features in `self.cutoff_params` are missing, they are computed
+        and added to `df` in place. Training and scoring do not need this; they
+        build the feature matrix directly with `feature_matrix`.
 
         Args:
             df (pd.DataFrame): Input DataFrame.
@@ -85,36 +183,160 @@ class SVMClassifier:
 
         return df
 
-    def train_model(self, training_df: pd.DataFrame, n_samples: int = 10000) -> None:
+    def feature_matrix(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Build the float64 matrix of `cutoff_params` without modifying `df`.
+
+        Args:
+            df (pd.DataFrame): Triggers.
+
+        Returns:
+            np.ndarray: (n, d) feature matrix in `cutoff_params` order.
+        """
+        return build_feature_matrix(df, self.cutoff_params)
+
+    def train_model(self, training_df: pd.DataFrame, n_samples: int = 10000, fit_scaler: bool = True) -> None:
         """
         Train a one-class SVM model on a sample of the training data.
 
+        In approx mode the whole training set is used and `n_samples` is ignored.
+
         Args:
             training_df (pd.DataFrame): DataFrame containing training examples.
             n_samples (int): Number of samples to randomly select for training.
+            fit_scaler (bool): Fit the scaler on the training data; if False the
+                already fitted scaler is used as is.
         """
-        training_df = self.apply_feature_engineering(training_df)
+        if self.model_type == 'approx':
+            self.train_model_approx(training_df, fit_scaler=fit_scaler)
+            return
+
+        from sklearn.svm import OneClassSVM
+
+        features = self.feature_matrix(training_df)
+
+        # same draw as DataFrame.sample(n, random_state=seed)
+        rows = np.random.RandomState(self.random_state).choice(
+                len(features),
+                size=min(n_samples, len(features)),
+                replace=False,
+            )
+
+        if fit_scaler:
+            self.scaler.fit(features[rows])
+
+        scaled_clean = self.scaler.transform(features[rows])
+
+        self.model = OneClassSVM(kernel="rbf", nu=self.nu, gamma=self.gamma).fit(scaled_clean)
+        self._calibrate_features(features)
+
+    def _make_feature_map(self) -> Union[Nystroem, RBFSampler]:
+        from sklearn.kernel_approximation import Nystroem, RBFSampler
+
+        # on standardized features gamma='scale' reduces to 1 / n_features
+        gamma = 1.0 / len(self.cutoff_params) if self.gamma == 'scale' else self.gamma
+
+        if self.kernel_approximation == 'nystroem':
+            return Nystroem(kernel='rbf', gamma=gamma, n_components=self.n_components, random_state=self.random_state)
+
+        if self.kernel_approximation == 'rff':
+            return RBFSampler(gamma=gamma, n_components=self.n_components, random_state=self.random_state)
+
+        msg = f"Unsupported kernel_approximation: {self.kernel_approximation}"
+        logger.error(msg)
+        raise ValueError(msg)
+
+    def train_model_approx(self, training_df: pd.DataFrame, fit_scaler: bool = True) -> None:
+        """
+        Train an approximate RBF one-class SVM on every training row.
+
+        The scaler is fit incrementally with `partial_fit`, the kernel feature map
+        is fit on a random subset of the scaled data, and an SGDOneClassSVM is
+        trained with `partial_fit` over shuffled mini-batches for `n_epochs`.
+
+        Args:
+            training_df (pd.DataFrame): DataFrame containing training examples.
+            fit_scaler (bool): Fit the scaler on the training data; if False the
+                already fitted scaler is used as is.
+        """
+        from sklearn.linear_model import SGDOneClassSVM
+        from sklearn.pipeline import Pipeline
+
+        features = self.feature_matrix(training_df)
+        n_rows = len(features)
+        rng = np.random.default_rng(self.random_state)
 
-        if n_samples < len(training_df):
-            sampled = training_df[self.cutoff_params].sample(n=n_samples)
+        if fit_scaler:
+            for start in range(0, n_rows, self.batch_size):
+                self.scaler.partial_fit(features[start:start + self.batch_size])
 
-        else:
-            sampled = training_df[self.cutoff_params].sample(n=n_samples, replace=True)
+        landmark_idx = rng.choice(n_rows, size=min(n_rows, 10 * self.n_components), replace=False)
+        feature_map = self._make_feature_map().fit(self.scaler.transform(features[landmark_idx]))
 
-        scaled_clean = self.scaler.fit_transform(sampled)
+        ocsvm = SGDOneClassSVM(nu=self.nu, random_state=self.random_state)
 
-        #FIXME make nu an argument
-        self.model = OneClassSVM(kernel="rbf", nu=0.01).fit(scaled_clean)
+        for epoch in range(self.n_epochs):
+            order = rng.permutation(n_rows)
+
+            for start in range(0, n_rows, self.batch_size):
+                batch = features[order[start:start + self.batch_size]]
+                ocsvm.partial_fit(feature_map.transform(self.scaler.transform(batch)))
+
+            logger.info(f"Approximate SVM epoch {epoch + 1} / {self.n_epochs} done")
+
+        self.model = Pipeline([('feature_map', feature_map), ('ocsvm', ocsvm)])
+        self._calibrate_features(features)
 
     def evaluate(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Evaluate input data using the trained model.
 
+        The input is not modified: the result is a shallow copy that shares
+        the input's column data and adds only the new score column.
+
+        Args:
+            df (pd.DataFrame): DataFrame to score.
+
+        Returns:
+            pd.DataFrame: Input columns plus a new `svm_score` column, and an
+            `svm_pvalue` column if the model is calibrated.
+
+        Raises:
+            RuntimeError: If model or scaler is not initialized.
+        """
+        scored = df.copy(deep=False)
+        scored['svm_score'] = self.score(df)
+
+        if self.calibration is not None:
+            scored['svm_pvalue'] = self.calibration.pvalue(scored['svm_score'].to_numpy())
+
+        return scored
+
+    def calibrate(self, clean_df: pd.DataFrame) -> None:
+        """
+        Score every clean trigger and store the quantile table of their scores.
+
+        `evaluate` then adds `svm_pvalue`, the fraction of clean triggers that
+        score at least as high as each trigger.
+
+        Args:
+            clean_df (pd.DataFrame): Clean triggers, typically the full training set.
+        """
+        self._calibrate_features(self.feature_matrix(clean_df))
+
+    def _calibrate_features(self, features: np.ndarray) -> None:
+        self.calibration = ScoreCalibration.fit(self.score_features(features), n_quantiles=self.n_quantiles)
+        logger.info(f"Calibrated p-values on {len(features)} clean triggers")
+
+    def score(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Score every row of a DataFrame.
+
         Args:
             df (pd.DataFrame): DataFrame to score.
 
         Returns:
-            pd.DataFrame: Copy of input DataFrame with new `svm_score` column.
+            np.ndarray: `svm_score` per row, aligned with `df`.
 
         Raises:
             RuntimeError: If model or scaler is not initialized.
@@ -124,30 +346,319 @@ class SVMClassifier:
             logger.error(msg)
             raise RuntimeError(msg)
 
-        df = self.apply_feature_engineering(df)
-        data = self.scaler.transform(
-                df[self.cutoff_params].values
+        return self.score_features(self.feature_matrix(df))
+
+    def score_features(self, features: np.ndarray) -> np.ndarray:
+        """
+        Scale and score a raw feature matrix in fixed-size blocks.
+
+        Blocks of `score_block_size` rows are scored one at a time, which bounds
+        the kernel workspace held in memory. With `n_jobs > 1` the blocks are
+        spread over a process pool; each worker receives one read-only copy of
+        the scaler and model at start-up, at most two blocks per worker are in
+        flight, and results are written into a preallocated output array.
+
+        Args:
+            features (np.ndarray): Unscaled features ordered as `cutoff_params`.
+
+        Returns:
+            np.ndarray: `svm_score` per row (negated decision function).
+        """
+        if self.score_grid is not None:
+            return self._score_features_grid(features)
+
+        n_rows = len(features)
+        scores = np.empty(n_rows, dtype=np.float64)
+        bounds = [
+            (start, min(start + self.score_block_size, n_rows))
+            for start in range(0, n_rows, self.score_block_size)
+        ]
+
+        if self.n_jobs == 1 or len(bounds) <= 1:
+            for start, stop in bounds:
+                scores[start:stop] = -self.model.decision_function(
+                        self.scaler.transform(features[start:stop])
+                    )
+
+            return scores
+
+        with ProcessPoolExecutor(
+                max_workers=self.n_jobs,
+                initializer=_init_scoring_worker,
+                initargs=(self.scaler, self.model)) as pool:
+
+            pending = {}
+            queued = iter(bounds)
+
+            for start, stop in queued:
+                pending[pool.submit(_score_block, features[start:stop])] = (start, stop)
+
+                if len(pending) < 2 * self.n_jobs:
+                    continue
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    block_start, block_stop = pending.pop(future)
+                    scores[block_start:block_stop] = future.result()
+
+            for future, (block_start, block_stop) in pending.items():
+                scores[block_start:block_stop] = future.result()
+
+        return scores
+
+    def _exact_scaled_scores(self, scaled: np.ndarray) -> np.ndarray:
+        return -self.model.decision_function(scaled)
+
+    def _score_features_grid(self, features: np.ndarray) -> np.ndarray:
+        """
+        Score features by interpolating the precomputed grid.
+
+        Triggers outside the grid bounds fall back to exact scoring.
+        """
+        scores = np.empty(len(features), dtype=np.float64)
+        n_outside = 0
+
+        for start in range(0, len(features), self.score_block_size):
+            scaled = self.scaler.transform(features[start:start + self.score_block_size])
+            inside = self.score_grid.inside(scaled)
+
+            block = np.empty(len(scaled), dtype=np.float64)
+            block[inside] = self.score_grid.lookup(scaled[inside])
+
+            if not inside.all():
+                block[~inside] = self._exact_scaled_scores(scaled[~inside])
+                n_outside += int((~inside).sum())
+
+            scores[start:start + len(block)] = block
+
+        if n_outside:
+            logger.info(f"Score grid: {n_outside} / {len(features)} triggers outside grid, scored exactly")
+
+        return scores
+
+    def build_score_grid(
+            self,
+            training_df: pd.DataFrame,
+            resolution: int = 256,
+            refine_factor: int = 8,
+            tolerance: float = 1e-3,
+            margin: float = 0.5,
+        ) -> float:
+        """
+        Precompute a score lookup grid over the scaled feature space.
+
+        The grid spans the scaled training data expanded by `margin` times its
+        range on each side, is refined near the decision boundary, and is
+        validated against exact scoring on random points and the training data.
+        Only available for two `cutoff_params`.
+
+        Args:
+            training_df (pd.DataFrame): Clean triggers used to set the grid bounds.
+            resolution (int): Coarse cells per dimension.
+            refine_factor (int): Fine cells per coarse cell edge.
+            tolerance (float): Centre interpolation error that triggers refinement.
+            margin (float): Fraction of the data range added beyond each bound.
+
+        Returns:
+            float: Worst-case absolute score error bound from validation.
+
+        Raises:
+            ValueError: If the feature space is not two-dimensional.
+        """
+        if len(self.cutoff_params) != 2:
+            msg = f"Score grid requires exactly two cutoff_params, got {self.cutoff_params}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        scaled = self.scaler.transform(self.feature_matrix(training_df))
+
+        lower = scaled.min(axis=0)
+        upper = scaled.max(axis=0)
+        span = upper - lower
+
+        self.score_grid = ScoreGrid.build(
+                self._exact_scaled_scores,
+                lower - margin * span,
+                upper + margin * span,
+                resolution=resolution,
+                refine_factor=refine_factor,
+                tolerance=tolerance,
             )
 
-        scores = -self.model.decision_function(data)
-        df = df.copy()
-        df.loc[:, 'svm_score'] = scores
+        rng = np.random.default_rng(self.random_state)
+        sample = scaled[rng.choice(len(scaled), size=min(len(scaled), 100000), replace=False)]
+        max_error = self.score_grid.validate(self._exact_scaled_scores, points=sample, seed=self.random_state)
 
-        return df
+        logger.info(f"Score grid worst-case absolute error: {max_error:.3g}")
+
+        return max_error
+
+    def check_score_grid(self, df: pd.DataFrame) -> float:
+        """
+        Compare grid-interpolated scores against exact scores on given triggers.
+
+        Logs a warning if the observed error exceeds the grid's reported bound.
+
+        Args:
+            df (pd.DataFrame): Triggers to check.
+
+        Returns:
+            float: Maximum absolute difference between grid and exact scores.
+        """
+        features = self.feature_matrix(df)
+        scaled = self.scaler.transform(features)
+
+        error = float(np.max(np.abs(self._score_features_grid(features) - self._exact_scaled_scores(scaled))))
+
+        if self.score_grid.max_error is not None and error > self.score_grid.max_error:
+            logger.warning(f"Score grid error {error:.3g} exceeds reported bound {self.score_grid.max_error:.3g}")
+
+        return error
+
+    def compress_model(
+            self,
+            training_df: pd.DataFrame,
+            ratio: float = 0.1,
+            n_vectors: Optional[int] = None,
+            n_fit: int = 20000,
+            holdout_fraction: float = 0.25,
+            ridge: float = 1e-8,
+        ) -> dict:
+        """
+        Replace the exact RBF model with a reduced-set approximation.
+
+        The support vectors are clustered with k-means, weighted by the size of
+        their dual coefficients, and the cluster centres become the reduced
+        support vectors. Their weights are refit by ridge least squares so the
+        reduced expansion matches the exact decision function on a sample of
+        training triggers plus uniform points around them. The intercept is kept
+        fixed, so scores far from the training data are unchanged.
+
+        Score error and rank agreement are measured on held-out training
+        triggers that were not used for the refit. The reduced model is a
+        CompactRBFModel and is saved in place of the original by `save_model`.
+        Any existing score grid is dropped because it was built for the old model.
+
+        Args:
+            training_df (pd.DataFrame): Clean triggers used for the refit and hold-out.
+            ratio (float): Fraction of support vectors to keep if `n_vectors` is not given.
+            n_vectors (int, optional): Number of reduced support vectors.
+            n_fit (int): Number of sampled points used for the refit and hold-out.
+            holdout_fraction (float): Fraction of sampled triggers held out for the report.
+            ridge (float): Ridge regularization of the weight refit.
+
+        Returns:
+            dict: Support vector counts and hold-out `max_abs_error`,
+            `mean_abs_error` and `rank_correlation`.
+
+        Raises:
+            ValueError: If the model is not an exact RBF model.
+        """
+        from sklearn.cluster import KMeans
+
+        exact = self.model if isinstance(self.model, CompactRBFModel) else CompactRBFModel.from_sklearn(self.model)
+        n_support = len(exact.support_vectors)
+        n_target = n_vectors or max(1, int(round(ratio * n_support)))
+
+        if n_target >= n_support:
+            logger.info(f"Model has {n_support} support vectors, no compression needed")
+            return {'n_support_vectors': n_support, 'n_reduced': n_support}
+
+        rng = np.random.default_rng(self.random_state)
+        scaled = self.scaler.transform(self.feature_matrix(training_df))
+        scaled = scaled[rng.permutation(len(scaled))[:n_fit]]
+
+        n_holdout = int(holdout_fraction * len(scaled))
+        holdout, fit_data = scaled[:n_holdout], scaled[n_holdout:]
+
+        lower, upper = scaled.min(axis=0), scaled.max(axis=0)
+        span = upper - lower
+        uniform = rng.uniform(lower - 0.5 * span, upper + 0.5 * span, size=(len(fit_data), scaled.shape[1]))
+        fit_points = np.vstack([fit_data, uniform, exact.support_vectors])
+
+        kmeans = KMeans(n_clusters=n_target, n_init=3, random_state=self.random_state)
+        kmeans.fit(exact.support_vectors, sample_weight=np.abs(exact.dual_coef))
+        centres = kmeans.cluster_centers_
+
+        design = CompactRBFModel(centres, np.zeros(n_target), 0.0, exact.gamma)
+        kernel = np.column_stack([
+            np.exp(-exact.gamma * np.sum((fit_points - centre) ** 2, axis=1))
+            for centre in centres
+        ])
+        target = exact.decision_function(fit_points) - exact.intercept
+
+        gram = kernel.T @ kernel + ridge * np.eye(n_target)
+        design.dual_coef = np.linalg.solve(gram, kernel.T @ target)
+        design.intercept = exact.intercept
+
+        exact_scores = -exact.decision_function(holdout)
+        reduced_scores = -design.decision_function(holdout)
+        error = np.abs(exact_scores - reduced_scores)
+
+        report = {
+            'n_support_vectors': n_support,
+            'n_reduced': n_target,
+            'max_abs_error': float(error.max()) if len(error) else 0.0,
+            'mean_abs_error': float(error.mean()) if len(error) else 0.0,
+            'rank_correlation': float(np.corrcoef(
+                pd.Series(exact_scores).rank().values,
+                pd.Series(reduced_scores).rank().values)[0, 1]) if len(error) > 1 else 1.0,
+        }
+
+        logger.info(f"Support vector reduction: {report}")
+
+        self.model = design
+
+        if self.score_grid is not None:
+            logger.info("Dropping score grid built for the uncompressed model")
+            self.score_grid = None
+
+        if self.calibration is not None:
+            self.calibrate(training_df)
+
+        return report
 
     def save_model(self, path: str | Path) -> None:
         """
-        Save the trained model and scaler to disk using pickle.
+        Save the trained model and scaler to disk.
+
+        Paths ending in `.npz` use the pickle-free compact format, which stores
+        the support vectors, dual coefficients, intercept, gamma, scaler
+        statistics, `cutoff_params` and any score grid; only exact RBF models
+        can be written this way. Any other path is written with pickle.
 
         Args:
             path (str): Path to save the model file.
         """
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        if str(path).endswith('.npz'):
+            model = self.model
+
+            if not isinstance(model, CompactRBFModel):
+                model = CompactRBFModel.from_sklearn(model)
+
+            save_compact(
+                    path,
+                    model,
+                    self.scaler,
+                    self.cutoff_params,
+                    score_grid=self.score_grid,
+                    calibration=self.calibration,
+                )
+            return
 
         with open(path, 'wb') as f:
             pkl.dump({
                 'model': self.model,
-                'scaler': self.scaler},
+                'scaler': self.scaler,
+                'cutoff_params': self.cutoff_params,
+                'model_type': self.model_type,
+                'nu': self.nu,
+                'gamma': self.gamma,
+                'score_grid': self.score_grid,
+                'calibration': self.calibration},
                 f
             )
 
@@ -159,30 +670,85 @@ class SVMClassifier:
         ) -> 'SVMClassifier':
 
         """
-        Load a model and scaler from a pickle file.
+        Load a model and scaler from a pickle or compact `.npz` file.
+
+        Compact models are loaded as NumPy-only scaler and model objects, so
+        scoring them does not import scikit-learn.
 
         Args:
-            path (str): Path to the pickle file.
+            path (str): Path to the pickle or `.npz` file.
             cutoff_params (list[str], optional): Parameters used during training.
+                Defaults to the parameters stored with the model.
 
         Returns:
             SVMClassifier: An instance with loaded model and scaler.
         """
+        if str(path).endswith('.npz'):
+            payload = load_compact(path)
+
+            return cls(
+                    cutoff_params=cutoff_params or payload['cutoff_params'],
+                    model=payload['model'],
+                    scaler=payload['scaler'],
+                    score_grid=payload['score_grid'],
+                    calibration=payload['calibration'],
+                )
+
         with open(path, 'rb') as f:
             payload = pkl.load(f)
 
+        return cls.from_payload(payload, cutoff_params=cutoff_params, path=path)
+
+    @classmethod
+    def from_payload(
+            cls,
+            payload: dict,
+            cutoff_params: Optional[List[str]] = None,
+            path: Optional[str | Path] = None,
+        ) -> 'SVMClassifier':
+        """
+        Build an instance from an unpickled model artifact.
+
+        Args:
+            payload (dict): Contents of a pickle written by `save_model`.
+            cutoff_params (list[str], optional): Parameters used during training.
+            path (str, optional): File the payload came from, for error messages.
+
+        Returns:
+            SVMClassifier: An instance with loaded model and scaler.
+
+        Raises:
+            ValueError: If the payload is a partitioned model.
+        """
+        if 'bin_param' in payload:
+            msg = (
+                f"{path or 'Model artifact'} is a partitioned model on {payload['bin_param']}; "
+                f"load it with PartitionedSVMClassifier.load_model or load_svm_model"
+            )
+            logger.error(msg)
+            raise ValueError(msg)
+
         return cls(
-                cutoff_params=cutoff_params,
+                cutoff_params=cutoff_params or payload.get('cutoff_params'),
                 model=payload['model'],
                 scaler=payload['scaler'],
+                model_type=payload.get('model_type', 'exact'),
+                nu=payload.get('nu', 0.01),
+                gamma=payload.get('gamma', 'scale'),
+                score_grid=payload.get('score_grid'),
+                calibration=payload.get('calibration'),
             )
 
     @classmethod
     def train_from_data(
             cls,
             train_df: pd.DataFrame,
-            cutoff_params: Optional[List[str]],
-            n_samples: int = 10000
+            cutoff_params: Optional[List[str]] = None,
+            n_samples: int = 10000,
+            model_type: str = 'exact',
+            nu: float = 0.01,
+            gamma: Union[str, float] = 'scale',
+            random_state: Optional[int] = None,
         ) -> 'SVMClassifier':
 
         """
@@ -192,10 +758,20 @@ class SVMClassifier:
             train_df (pd.DataFrame): DataFrame to train on.
             cutoff_params (list[str], optional): Parameters to train with.
             n_samples (int): Number of rows to sample from the training data.
+            model_type (str): "exact" or "approx" training mode.
+            nu (float): Upper bound on the fraction of training outliers.
+            gamma (str or float): RBF kernel width.
+            random_state (int, optional): Seed for sampling and the approx-mode feature map.
 
         Returns:
             SVMClassifier: A trained classifier instance.
         """
-        instance = cls(cutoff_params=cutoff_params)
+        instance = cls(
+                cutoff_params=cutoff_params,
+                model_type=model_type,
+                nu=nu,
+                gamma=gamma,
+                random_state=random_state,
+            )
         instance.train_model(train_df, n_samples=n_samples)
         return instance
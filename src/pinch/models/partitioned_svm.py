@@ -0,0 +1,330 @@
+#! /usr/bin/env/python3
+
+import os
+import pickle as pkl
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from typing import Optional, List, Sequence, Union
+from pathlib import Path
+import logging
+
+from pinch.models.one_class_svm import SVMClassifier
+from pinch.models.features import build_feature_matrix
+
+logger = logging.getLogger(__name__)
+
+
+def load_svm_model(
+        path: str | Path,
+        cutoff_params: Optional[List[str]] = None,
+    ) -> Union[SVMClassifier, 'PartitionedSVMClassifier']:
+    """
+    Load a single or partitioned model, whichever the file holds.
+
+    Partitioned pickles are recognized by their stored `bin_param`, so
+    scoring with them needs no partition options.
+
+    Args:
+        path (str): Path to the pickle or compact `.npz` file.
+        cutoff_params (list[str], optional): Parameters of a single model;
+            defaults to the parameters stored with it.
+
+    Returns:
+        SVMClassifier or PartitionedSVMClassifier: The loaded model.
+    """
+    if str(path).endswith('.npz'):
+        return SVMClassifier.load_model(path, cutoff_params=cutoff_params)
+
+    with open(path, 'rb') as f:
+        payload = pkl.load(f)
+
+    if 'bin_param' in payload:
+        return PartitionedSVMClassifier.from_payload(payload)
+
+    return SVMClassifier.from_payload(payload, cutoff_params=cutoff_params, path=path)
+
+
+def _train_partition(
+        features: pd.DataFrame,
+        cutoff_params: List[str],
+        n_samples: int,
+        model_type: str,
+        random_state: Optional[int],
+    ) -> SVMClassifier:
+    classifier = SVMClassifier(cutoff_params=cutoff_params, model_type=model_type, random_state=random_state)
+    classifier.train_model(features, n_samples=n_samples)
+
+    return classifier
+
+
+class PartitionedSVMClassifier:
+    """
+    A set of one-class SVMs, one per bin of a template parameter.
+
+    Triggers are binned by `bin_param` (e.g. `template_duration`) using quantile
+    edges of the training data, or explicit `bin_edges`. One SVMClassifier is
+    trained per bin in a process pool, and each trigger is scored by its bin's
+    model after a vectorized `np.searchsorted` bin lookup. Bins with fewer than
+    `min_bin_size` training triggers are scored by a global fallback model.
+
+    Attributes:
+        bin_param (str): Template parameter used to partition triggers.
+        n_bins (int): Number of quantile bins if `bin_edges` is not given.
+        bin_edges (np.ndarray or None): Bin edges of `bin_param`.
+        cutoff_params (list[str]): Parameters used as SVM inputs.
+        model_type (str): Training mode of the per-bin models.
+        n_jobs (int): Worker processes used for training and scoring.
+        min_bin_size (int): Minimum training triggers for a bin to get its own model.
+        random_state (int or None): Seed passed to each per-bin model.
+        models (list[SVMClassifier or None]): Per-bin models; None uses the fallback.
+        fallback (SVMClassifier or None): Global model for under-populated bins.
+
+    Methods:
+        assign_bins(df): Return the bin index of every trigger.
+        train_model(training_df, n_samples): Train one model per bin.
+        evaluate(df): Score triggers with their bin's model.
+        save_model(path): Save all bins as a single artifact.
+        load_model(path): Load a saved bin set.
+        from_payload(payload): Build an instance from an unpickled artifact.
+        train_from_data(train_df, ...): Train and return an instance.
+    """
+    def __init__(
+            self,
+            bin_param: str = 'template_duration',
+            n_bins: int = 4,
+            bin_edges: Optional[Sequence[float]] = None,
+            cutoff_params: Optional[List[str]] = None,
+            model_type: str = 'exact',
+            n_jobs: int = 1,
+            min_bin_size: int = 1000,
+            random_state: Optional[int] = None,
+        ) -> None:
+
+        self.bin_param = bin_param
+        self.n_bins = n_bins
+        self.bin_edges = None if bin_edges is None else np.asarray(bin_edges, dtype=np.float64)
+        self.cutoff_params = cutoff_params or ['snr', 'chisqBysnrsq']
+        self.model_type = model_type
+        self.n_jobs = n_jobs
+        self.min_bin_size = min_bin_size
+        self.random_state = random_state
+
+        self.models = []
+        self.fallback = None
+
+    def assign_bins(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Return the bin index of every trigger.
+
+        Values beyond the outer edges are assigned to the first or last bin.
+
+        Args:
+            df (pd.DataFrame): Triggers with a `bin_param` column.
+
+        Returns:
+            np.ndarray: Integer bin index per row.
+        """
+        values = df[self.bin_param].to_numpy(dtype=np.float64)
+        bins = np.searchsorted(self.bin_edges, values, side='right') - 1
+
+        return np.clip(bins, 0, len(self.bin_edges) - 2)
+
+    def train_model(self, training_df: pd.DataFrame, n_samples: int = 10000) -> None:
+        """
+        Train one SVMClassifier per bin across a process pool.
+
+        Args:
+            training_df (pd.DataFrame): Clean training triggers.
+            n_samples (int): Rows sampled per bin in exact mode.
+
+        Raises:
+            ValueError: If `bin_param` yields fewer than two bin edges.
+        """
+        bin_edges = self.bin_edges
+
+        if bin_edges is None:
+            quantiles = np.linspace(0, 1, self.n_bins + 1)
+            bin_edges = np.unique(np.quantile(training_df[self.bin_param].to_numpy(dtype=np.float64), quantiles))
+
+        if len(bin_edges) < 2:
+            msg = (
+                f"Cannot partition on {self.bin_param}: it has a single value in the training set; "
+                f"train without a partition parameter instead"
+            )
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.bin_edges = bin_edges
+        bins = self.assign_bins(training_df)
+        features = pd.DataFrame(build_feature_matrix(training_df, self.cutoff_params), columns=self.cutoff_params)
+        n_partitions = len(self.bin_edges) - 1
+
+        tasks = {}
+
+        for b in range(n_partitions):
+            mask = bins == b
+
+            if mask.sum() >= self.min_bin_size:
+                tasks[b] = features[mask]
+            else:
+                logger.info(f"Bin {b} has {mask.sum()} triggers, using fallback model")
+
+        if len(tasks) < n_partitions:
+            tasks['fallback'] = features
+
+        args = (self.cutoff_params, n_samples, self.model_type, self.random_state)
+
+        if self.n_jobs == 1:
+            trained = {key: _train_partition(part, *args) for key, part in tasks.items()}
+        else:
+            with ProcessPoolExecutor(max_workers=self.n_jobs) as pool:
+                futures = {key: pool.submit(_train_partition, part, *args) for key, part in tasks.items()}
+                trained = {key: future.result() for key, future in futures.items()}
+
+        self.fallback = trained.get('fallback')
+        self.models = [trained.get(b) for b in range(n_partitions)]
+
+        logger.info(f"Trained {len(tasks)} models over {n_partitions} bins of {self.bin_param}")
+
+    def evaluate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score triggers with the model of their bin.
+
+        Args:
+            df (pd.DataFrame): DataFrame to score.
+
+        Returns:
+            pd.DataFrame: Shallow copy of the input with `svm_score` and `svm_bin`
+            columns, and `svm_pvalue` against each bin's clean scores if calibrated.
+
+        Raises:
+            RuntimeError: If no models have been trained or loaded.
+        """
+        if not self.models:
+            msg = "Partitioned models must be trained or loaded before evaluation"
+            logger.error(msg)
+            raise RuntimeError(msg)
+
+        features = build_feature_matrix(df, self.cutoff_params)
+        bins = self.assign_bins(df)
+
+        scores = np.empty(len(df), dtype=np.float64)
+        pvalues = np.full(len(df), np.nan)
+
+        for b in np.unique(bins):
+            rows = np.flatnonzero(bins == b)
+            model = self.models[b] or self.fallback
+            model.n_jobs = self.n_jobs
+            scores[rows] = model.score_features(features[rows])
+
+            if model.calibration is not None:
+                pvalues[rows] = model.calibration.pvalue(scores[rows])
+
+        scored = df.copy(deep=False)
+        scored['svm_score'] = scores
+        scored['svm_bin'] = bins
+
+        if not np.isnan(pvalues).all():
+            scored['svm_pvalue'] = pvalues
+
+        return scored
+
+    def save_model(self, path: str | Path) -> None:
+        """
+        Save the bin edges and every per-bin model as one pickle artifact.
+
+        Args:
+            path (str): Path to save the model file.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        with open(path, 'wb') as f:
+            pkl.dump({
+                'bin_param': self.bin_param,
+                'bin_edges': self.bin_edges,
+                'cutoff_params': self.cutoff_params,
+                'model_type': self.model_type,
+                'models': self.models,
+                'fallback': self.fallback},
+                f
+            )
+
+    @classmethod
+    def load_model(cls, path: str | Path) -> 'PartitionedSVMClassifier':
+        """
+        Load a partitioned model artifact.
+
+        Args:
+            path (str): Path to the pickle file.
+
+        Returns:
+            PartitionedSVMClassifier: An instance with loaded bins and models.
+        """
+        with open(path, 'rb') as f:
+            payload = pkl.load(f)
+
+        return cls.from_payload(payload)
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> 'PartitionedSVMClassifier':
+        """
+        Build an instance from an unpickled partitioned model artifact.
+
+        Args:
+            payload (dict): Contents of a pickle written by `save_model`.
+
+        Returns:
+            PartitionedSVMClassifier: An instance with loaded bins and models.
+        """
+        instance = cls(
+                bin_param=payload['bin_param'],
+                bin_edges=payload['bin_edges'],
+                cutoff_params=payload['cutoff_params'],
+                model_type=payload['model_type'],
+            )
+        instance.models = payload['models']
+        instance.fallback = payload['fallback']
+
+        return instance
+
+    @classmethod
+    def train_from_data(
+            cls,
+            train_df: pd.DataFrame,
+            bin_param: str = 'template_duration',
+            n_bins: int = 4,
+            cutoff_params: Optional[List[str]] = None,
+            n_samples: int = 10000,
+            model_type: str = 'exact',
+            n_jobs: int = 1,
+            random_state: Optional[int] = None,
+        ) -> 'PartitionedSVMClassifier':
+        """
+        Train a partitioned model from a given DataFrame and return the instance.
+
+        Args:
+            train_df (pd.DataFrame): DataFrame to train on.
+            bin_param (str): Template parameter to partition on.
+            n_bins (int): Number of quantile bins.
+            cutoff_params (list[str], optional): Parameters to train with.
+            n_samples (int): Number of rows to sample per bin.
+            model_type (str): "exact" or "approx" training mode.
+            n_jobs (int): Worker processes used for training.
+            random_state (int, optional): Seed passed to each per-bin model.
+
+        Returns:
+            PartitionedSVMClassifier: A trained instance.
+        """
+        instance = cls(
+                bin_param=bin_param,
+                n_bins=n_bins,
+                cutoff_params=cutoff_params,
+                model_type=model_type,
+                n_jobs=n_jobs,
+                random_state=random_state,
+            )
+        instance.train_model(train_df, n_samples=n_samples)
+
+        return instance
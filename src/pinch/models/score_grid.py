@@ -0,0 +1,235 @@
+#! /usr/bin/env/python3
+
+import numpy as np
+import logging
+
+from typing import Callable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _bilinear(
+        v00: np.ndarray,
+        v10: np.ndarray,
+        v01: np.ndarray,
+        v11: np.ndarray,
+        fx: np.ndarray,
+        fy: np.ndarray,
+    ) -> np.ndarray:
+    return (
+            (1 - fx) * (1 - fy) * v00
+            + fx * (1 - fy) * v10
+            + (1 - fx) * fy * v01
+            + fx * fy * v11
+        )
+
+
+class ScoreGrid:
+    """
+    A precomputed lookup table of SVM scores over a 2-D scaled feature space.
+
+    The model is evaluated once on a uniform coarse grid. Cells where the
+    decision boundary (score = 0) crosses, or where bilinear interpolation at
+    the cell centre misses the exact score by more than `tolerance`, are
+    refined with a finer subgrid. Scoring is then a vectorized bilinear
+    interpolation, O(1) per trigger regardless of the number of support vectors.
+    Points outside the grid bounds are reported so callers can score them exactly.
+
+    Attributes:
+        lower (np.ndarray): Lower bounds of the grid in scaled feature space.
+        upper (np.ndarray): Upper bounds of the grid in scaled feature space.
+        resolution (int): Number of coarse cells per dimension.
+        refine_factor (int): Number of fine cells per coarse cell edge in refined cells.
+        coarse (np.ndarray): Scores at the (resolution + 1)^2 coarse nodes.
+        cell_map (np.ndarray): Index into `fine` for refined cells, -1 otherwise.
+        fine (np.ndarray): Scores at the fine nodes of each refined cell.
+        max_error (float or None): Worst-case absolute error bound from validation.
+
+    Methods:
+        build(score_fn, lower, upper, ...): Evaluate a model and construct the grid.
+        inside(points): Mask of points within the grid bounds.
+        lookup(points): Interpolated scores for points inside the bounds.
+        validate(score_fn, points): Measure the worst-case error against exact scores.
+    """
+    def __init__(
+            self,
+            lower: np.ndarray,
+            upper: np.ndarray,
+            resolution: int,
+            refine_factor: int,
+            coarse: np.ndarray,
+            cell_map: np.ndarray,
+            fine: np.ndarray,
+            max_error: Optional[float] = None,
+        ) -> None:
+
+        self.lower = lower
+        self.upper = upper
+        self.resolution = resolution
+        self.refine_factor = refine_factor
+        self.coarse = coarse
+        self.cell_map = cell_map
+        self.fine = fine
+        self.max_error = max_error
+
+    @staticmethod
+    def _nodes(lower: np.ndarray, upper: np.ndarray, resolution: int) -> Tuple[np.ndarray, np.ndarray]:
+        xs = np.linspace(lower[0], upper[0], resolution + 1)
+        ys = np.linspace(lower[1], upper[1], resolution + 1)
+
+        return xs, ys
+
+    @classmethod
+    def build(
+            cls,
+            score_fn: Callable[[np.ndarray], np.ndarray],
+            lower: Sequence[float],
+            upper: Sequence[float],
+            resolution: int = 256,
+            refine_factor: int = 8,
+            tolerance: float = 1e-3,
+        ) -> 'ScoreGrid':
+        """
+        Evaluate `score_fn` on a coarse grid and refine it near the decision boundary.
+
+        Args:
+            score_fn (callable): Maps an (n, 2) array of scaled features to scores.
+            lower (sequence[float]): Lower grid bounds in scaled feature space.
+            upper (sequence[float]): Upper grid bounds in scaled feature space.
+            resolution (int): Coarse cells per dimension.
+            refine_factor (int): Fine cells per coarse cell edge.
+            tolerance (float): Centre interpolation error that triggers refinement.
+
+        Returns:
+            ScoreGrid: The constructed grid.
+        """
+        lower = np.asarray(lower, dtype=np.float64)
+        upper = np.asarray(upper, dtype=np.float64)
+
+        xs, ys = cls._nodes(lower, upper, resolution)
+        gx, gy = np.meshgrid(xs, ys, indexing='ij')
+        coarse = score_fn(np.column_stack([gx.ravel(), gy.ravel()])).reshape(gx.shape)
+
+        corners = np.stack([coarse[:-1, :-1], coarse[1:, :-1], coarse[:-1, 1:], coarse[1:, 1:]])
+        crosses = (corners.min(axis=0) <= 0) & (corners.max(axis=0) >= 0)
+
+        cx = 0.5 * (xs[:-1] + xs[1:])
+        cy = 0.5 * (ys[:-1] + ys[1:])
+        gcx, gcy = np.meshgrid(cx, cy, indexing='ij')
+        centre_exact = score_fn(np.column_stack([gcx.ravel(), gcy.ravel()])).reshape(gcx.shape)
+        centre_error = np.abs(corners.mean(axis=0) - centre_exact)
+
+        refine = crosses | (centre_error > tolerance)
+        refined_cells = np.argwhere(refine)
+
+        cell_map = np.full((resolution, resolution), -1, dtype=np.int64)
+        cell_map[refine] = np.arange(len(refined_cells))
+
+        offsets = np.linspace(0, 1, refine_factor + 1)
+        dx = xs[1] - xs[0]
+        dy = ys[1] - ys[0]
+
+        fx = xs[refined_cells[:, 0], None, None] + dx * offsets[None, :, None]
+        fy = ys[refined_cells[:, 1], None, None] + dy * offsets[None, None, :]
+        fx, fy = np.broadcast_arrays(fx, fy)
+
+        if len(refined_cells):
+            fine = score_fn(np.column_stack([fx.ravel(), fy.ravel()])).reshape(fx.shape)
+        else:
+            fine = np.empty((0, refine_factor + 1, refine_factor + 1), dtype=np.float64)
+
+        logger.info(
+                f"Score grid: {resolution}x{resolution} cells, "
+                f"{len(refined_cells)} refined by {refine_factor}x"
+            )
+
+        return cls(lower, upper, resolution, refine_factor, coarse, cell_map, fine)
+
+    def inside(self, points: np.ndarray) -> np.ndarray:
+        """
+        Return a mask of points that fall within the grid bounds.
+
+        Args:
+            points (np.ndarray): (n, 2) scaled features.
+
+        Returns:
+            np.ndarray: Boolean mask.
+        """
+        return np.all((points >= self.lower) & (points <= self.upper), axis=1)
+
+    def lookup(self, points: np.ndarray) -> np.ndarray:
+        """
+        Interpolate scores for points inside the grid bounds.
+
+        Args:
+            points (np.ndarray): (n, 2) scaled features, all inside the bounds.
+
+        Returns:
+            np.ndarray: Interpolated scores.
+        """
+        u = (points - self.lower) / (self.upper - self.lower) * self.resolution
+        cell = np.clip(np.floor(u).astype(np.int64), 0, self.resolution - 1)
+        frac = u - cell
+
+        i, j = cell[:, 0], cell[:, 1]
+        c = self.coarse
+        scores = _bilinear(c[i, j], c[i + 1, j], c[i, j + 1], c[i + 1, j + 1], frac[:, 0], frac[:, 1])
+
+        k = self.cell_map[i, j]
+        refined = k >= 0
+
+        if refined.any():
+            fu = frac[refined] * self.refine_factor
+            fcell = np.clip(np.floor(fu).astype(np.int64), 0, self.refine_factor - 1)
+            ffrac = fu - fcell
+
+            f = self.fine
+            kk = k[refined]
+            fi, fj = fcell[:, 0], fcell[:, 1]
+
+            scores[refined] = _bilinear(
+                    f[kk, fi, fj],
+                    f[kk, fi + 1, fj],
+                    f[kk, fi, fj + 1],
+                    f[kk, fi + 1, fj + 1],
+                    ffrac[:, 0],
+                    ffrac[:, 1],
+                )
+
+        return scores
+
+    def validate(
+            self,
+            score_fn: Callable[[np.ndarray], np.ndarray],
+            points: Optional[np.ndarray] = None,
+            n_random: int = 20000,
+            seed: Optional[int] = None,
+            safety_factor: float = 2.0,
+        ) -> float:
+        """
+        Estimate a worst-case interpolation error bound against exact scoring.
+
+        Errors are measured on `n_random` uniform points within the bounds plus
+        any supplied `points` that fall inside them. Since the true maximum can
+        lie between validation points, the largest observed error is inflated
+        by `safety_factor`. The bound is stored in `max_error` and returned.
+
+        Args:
+            score_fn (callable): Exact scorer on scaled features.
+            points (np.ndarray, optional): Additional (n, 2) scaled points, e.g. real triggers.
+            n_random (int): Number of uniform random validation points.
+            seed (int, optional): Seed for the random points.
+            safety_factor (float): Multiplier applied to the largest observed error.
+
+        Returns:
+            float: Error bound.
+        """
+        rng = np.random.default_rng(seed)
+        check = rng.uniform(self.lower, self.upper, size=(n_random, 2))
+
+        if points is not None:
+            check = np.vstack([check, points[self.inside(points)]])
+
+        self.max_error = safety_factor * float(np.max(np.abs(self.lookup(check) - score_fn(check))))
+
+        return self.max_error
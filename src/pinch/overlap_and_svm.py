@@ -1,52 +1,189 @@
 #!/usr/bin/env python3
 
+import os
+import importlib.util
 import argparse
 import logging
+from typing import Dict, Optional
+from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from pinch.pipelines.overlap_pipeline import OverlapPipeline
-from pinch.pipelines.svm_pipeline import SVMPipeline
+from pinch.pipelines.svm_pipeline import SVMPipeline, ifo_model_path
+from pinch.models.one_class_svm import parse_gamma
+from pinch.models.model_cache import ModelCache
+from pinch.utils.checkpoint import StageCache
+from pinch.utils import instrumentation
+from pinch.utils.trigger_io import TIO
+from pinch.utils.duckdb_sink import DuckDBSink
+from pinch.utils.segments import SegmentList
 
 logger = logging.getLogger(__name__)
 
-def parse_args():
-    parser = argparse.ArgumentParser(description="Run glitch overlap pipeline and then train/score an SVM on the results")
+# arguments that change the trained model or the scores, hashed into the scoring checkpoint key
+SCORING_ARGS = (
+    'cutoff_params', 'model_type', 'nu', 'gamma', 'sweep_nu', 'sweep_gamma', 'score_grid',
+    'compress_svs', 'partition_param', 'n_partitions', 'random_state', 'score_only',
+)
+
+def build_parser(description: str = "Run glitch overlap pipeline and then train/score an SVM on the results") -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
 
     parser.add_argument('--ifos', required=True, nargs='+', help='IFOs to analyze')
     parser.add_argument('--pipeline-triggers', required=True, help='Path to pipeline trigger CSVs')
     parser.add_argument('--output-dir', required=True, help='Path to write output CSVs')
 
     parser.add_argument('--gspy', action='store_true', help='Enable Gravity Spy overlap')
+    parser.add_argument(
+            '--gspy-source',
+            help='Local Gravity Spy glitch table (CSV, Parquet or DuckDB) queried instead of the live database')
     parser.add_argument('--omicron', action='store_true', help='Enable Omicron overlap')
     parser.add_argument(
             '--omicron-paths',
             type=str,
             help='Comma-separated list of IFO:path_to_omicron_csv pairs; e.g., H1:path/H1.csv,L1:/path/L1.csv')
+    parser.add_argument(
+            '--segment-file',
+            help='Segment list file (CSV with start/end columns, or text); only triggers and glitches inside the segments are analyzed')
+    parser.add_argument(
+            '--cluster-window',
+            type=float,
+            help='Keep only the loudest trigger per time window of this many seconds before overlap')
+    parser.add_argument(
+            '--cluster-bin-param',
+            help='Template parameter to bin on when clustering, e.g. template_duration')
+    parser.add_argument(
+            '--cluster-n-bins',
+            type=int,
+            default=10,
+            help='Number of quantile bins of --cluster-bin-param')
+    parser.add_argument(
+            '--paddings',
+            type=float,
+            nargs='+',
+            help='Glitch paddings in seconds to annotate in one sweep, e.g. 0 0.5 1 2; adds per-padding dirty_pad<p> columns')
+    parser.add_argument(
+            '--timeslide-file',
+            help='CSV with one column of time-slide offsets per IFO (one row per slide); writes per-slide overlap counts')
+    parser.add_argument(
+            '--context-windows',
+            type=float,
+            nargs='+',
+            help='Half-widths in seconds for glitch-density context features (counts, max Omicron SNR, nearest Gravity Spy class)')
+    parser.add_argument(
+            '--cutoff-params',
+            nargs='+',
+            help='Feature columns for the SVM (default: snr chisqBysnrsq); context feature columns may be used')
 
     parser.add_argument('--save-model', action='store_true', help='Save the trained SVM model')
-    parser.add_argument('--model-path', default='trained_svm.pkl', help='Path to save/load the SVM model')
+    parser.add_argument(
+            '--model-path',
+            default='trained_svm.pkl',
+            help='Path to save/load the SVM models; each IFO uses <IFO>_<name> next to it, or the path with {ifo} '
+                 'replaced; a .npz path uses the pickle-free compact format')
+    parser.add_argument(
+            '--model-type',
+            choices=['exact', 'approx'],
+            default='exact',
+            help='exact: RBF OneClassSVM on a 10k sample; approx: kernel-approximated SGD one-class SVM on the full clean set')
+    parser.add_argument('--nu', type=float, default=0.01, help='OneClassSVM nu, the bound on the training outlier fraction')
+    parser.add_argument('--gamma', type=parse_gamma, default='scale', help="RBF kernel width: 'scale', 'auto' or a float")
+    parser.add_argument(
+            '--sweep-nu',
+            type=float,
+            nargs='+',
+            help='Train exact models over these nu values in parallel and keep the best; writes <ifo>_svm_sweep.csv')
+    parser.add_argument(
+            '--sweep-gamma',
+            type=parse_gamma,
+            nargs='+',
+            help='gamma values for --sweep-nu (default: scale)')
+    parser.add_argument(
+            '--score-grid',
+            action='store_true',
+            help='Precompute a 2-D score lookup grid after training and score triggers by interpolation')
+    parser.add_argument(
+            '--compress-svs',
+            type=float,
+            help='Reduce the trained model to this fraction of its support vectors, e.g. 0.1')
+    parser.add_argument(
+            '--partition-param',
+            help='Train one SVM per quantile bin of this template parameter, e.g. template_duration')
+    parser.add_argument('--n-partitions', type=int, default=4, help='Number of bins of --partition-param')
+    parser.add_argument('--n-jobs', type=int, default=1, help='Worker processes for SVM scoring')
+    parser.add_argument('--random-state', type=int, help='Seed for sampling the SVM training set')
+    parser.add_argument(
+            '--model-cache-dir',
+            help='Reuse models trained on identical clean features and parameters from this directory')
+    parser.add_argument(
+            '--model-cache-max-mb',
+            type=float,
+            default=1024,
+            help='Size cap of --model-cache-dir; least recently used models are evicted beyond it')
     parser.add_argument('--score-only', action='store_true', help='Skip training and only score dirty tiggers')
     parser.add_argument('--scored-output-path', required=True, help='Base path to write SVM-scored CSVs')
+    parser.add_argument(
+            '--output-format',
+            choices=['csv', 'parquet', 'arrow'],
+            default='csv',
+            help='File format of overlap and scored outputs; parquet/arrow keep overlap ids as list columns (needs pyarrow)')
+    parser.add_argument(
+            '--duckdb-path',
+            help='Also append clean, dirty and scored triggers to this DuckDB database, replacing any earlier rows of the same IFO and chunk (needs pyarrow, the parquet extra: pip install -e .[parquet])')
+    parser.add_argument(
+            '--chunk',
+            help='Chunk id of this run in --duckdb-path, required with it (batch_overlap_and_score sets it per job)')
+    parser.add_argument(
+            '--checkpoint-dir',
+            help='Checkpoint each stage (trigger and catalog loads, overlap, separation, scoring) here; writes checkpoint_status.csv')
+    parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Reuse checkpoints whose inputs and parameters are unchanged, and cache trained models with them '
+                 '(default --checkpoint-dir: <output-dir>/checkpoints)')
+    parser.add_argument(
+            '--metrics-dir',
+            help='Record wall/CPU time, peak RSS, rows and bytes read per stage; writes metrics.json and metrics.prom here')
+    parser.add_argument(
+            '--profile',
+            action='store_true',
+            help='Also capture a cProfile and tracemalloc snapshot per stage (slow; default --metrics-dir: <output-dir>/metrics)')
 
-    args = parser.parse_args()
+    return parser
 
+
+def check_args(parser: argparse.ArgumentParser, args: argparse.Namespace) -> argparse.Namespace:
     # argument cross-checks
     if args.omicron and not args.omicron_paths:
         parser.error("--omicron specified but no --omicron-paths provided")
     if args.omicron_paths and not args.omicron:
         parser.error("--omicron-paths provided without --omicron")
+    if args.gspy_source and not args.gspy:
+        parser.error("--gspy-source provided without --gspy")
+    # the sink writes Arrow tables; fail now rather than after the first IFO's overlap and SVM work
+    if args.duckdb_path and importlib.util.find_spec('pyarrow') is None:
+        parser.error("--duckdb-path requires pyarrow, the parquet extra: pip install -e .[parquet]")
 
     return args
 
 
-def main():
-    """
-    Entry point for the overlap pipeline CLI.
+def parse_args():
+    parser = build_parser()
+    args = check_args(parser, parser.parse_args())
 
-    Validates inputs, sets up per-IFO processing, and writes output CSVs.
+    # rows are replaced per (ifo, chunk), so a guessed id could overwrite another run's rows
+    if args.duckdb_path and args.chunk is None:
+        parser.error("--duckdb-path requires --chunk")
+
+    return args
+
+
+def parse_omicron_paths(args: argparse.Namespace) -> Dict[str, str]:
+    """
+    Return the Omicron trigger path of each IFO from `--omicron-paths`.
     """
-    args = parse_args()
     omicron_path_dict = {}
 
     if args.omicron and args.omicron_paths:
@@ -72,72 +209,283 @@ def main():
         logger.error(msg)
         raise ValueError(msg)
 
-    for ifo in args.ifos:
-        logger.info(f"Processing {ifo}...")
+    return omicron_path_dict
 
-        omicron_path = omicron_path_dict.get(ifo) if args.omicron else None
 
-        overlap = OverlapPipeline(
-                ifo=ifo,
-                pipeline_trigger_path=args.pipeline_triggers,
-                output_dir=args.output_dir,
-                gspy_enabled=args.gspy,
-                omicron_enabled=args.omicron,
-                omicron_path=omicron_path
-            )
+def load_timeslides(args: argparse.Namespace) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Return the time-slide offsets of each IFO from `--timeslide-file`, if given.
+    """
+    if not args.timeslide_file:
+        return None
 
-        overlap.run()
-        overlap.write_output()
+    return {
+        ifo: offsets.to_numpy(dtype=float)
+        for ifo, offsets in pd.read_csv(args.timeslide_file).items()
+    }
+
+
+def build_model_cache(args: argparse.Namespace) -> Optional[ModelCache]:
+    """
+    Return the model cache of `--model-cache-dir`, if given.
+    """
+    if args.model_cache_dir:
+        return ModelCache(args.model_cache_dir, max_bytes=int(args.model_cache_max_mb * 1e6))
+
+    if args.resume:
+        return ModelCache(Path(checkpoint_dir(args)) / 'models', max_bytes=int(args.model_cache_max_mb * 1e6))
+
+    return None
+
+
+def checkpoint_dir(args: argparse.Namespace) -> str:
+    """
+    Return the checkpoint directory of a run.
+    """
+    return args.checkpoint_dir or f"{args.output_dir}/checkpoints"
+
+
+def build_stage_cache(args: argparse.Namespace) -> Optional[StageCache]:
+    """
+    Return the stage checkpoints of `--checkpoint-dir` / `--resume`, if either is given.
+    """
+    if not (args.checkpoint_dir or args.resume):
+        return None
 
-        clean_df = overlap.separated_triggers.get("clean")
-        dirty_df = overlap.separated_triggers.get("dirty")
+    return StageCache(checkpoint_dir(args), resume=args.resume)
 
-        logger.info(f"len clean df: {len(clean_df)}")
 
-        svm = SVMPipeline(
-                clean_df=clean_df,
-                dirty_df=dirty_df,
-                output_path=args.scored_output_path
+def metrics_dir(args: argparse.Namespace) -> str:
+    """
+    Return the metrics directory of a run.
+    """
+    return args.metrics_dir or f"{args.output_dir}/metrics"
+
+
+def start_instrumentation(args: argparse.Namespace) -> Optional[instrumentation.Instrumentation]:
+    """
+    Enable stage metrics if `--metrics-dir` or `--profile` is given.
+    """
+    if not (args.metrics_dir or args.profile):
+        return None
+
+    return instrumentation.enable(profile=args.profile, profile_dir=f"{metrics_dir(args)}/profiles")
+
+
+def write_checkpoint_report(stage_cache: Optional[StageCache], path: str | Path) -> None:
+    """
+    Write and log which stages were restored from checkpoints in this run.
+    """
+    if stage_cache is None:
+        return
+
+    report = stage_cache.return_report()
+    os.makedirs(os.path.dirname(str(path)) or '.', exist_ok=True)
+    report.to_csv(path, index=False)
+
+    summary = report.groupby('status')['seconds'].agg(['count', 'sum'])
+    logger.info(f"Checkpoint status ({path}):\n{summary.to_string()}")
+
+
+def run_ifo(
+        args: argparse.Namespace,
+        ifo: str,
+        omicron_path: Optional[str] = None,
+        timeslides: Optional[Dict[str, np.ndarray]] = None,
+        model_cache: Optional[ModelCache] = None,
+        segments: Optional[SegmentList] = None,
+        sink: Optional[DuckDBSink] = None,
+        chunk: Optional[str] = None,
+        stage_cache: Optional[StageCache] = None,
+    ) -> Dict[str, int]:
+    """
+    Run the overlap pipeline and the SVM for one IFO and write its outputs.
+
+    Args:
+        args (Namespace): Parsed command-line arguments.
+        ifo (str): Interferometer to process.
+        omicron_path (str, optional): Omicron triggers of this IFO.
+        timeslides (dict, optional): Time-slide offsets per IFO.
+        model_cache (ModelCache, optional): Cache of trained models.
+        segments (SegmentList, optional): Segments to use instead of `--segment-file`.
+        sink (DuckDBSink, optional): DuckDB sink to append the results to.
+        chunk (str, optional): Chunk id of the results in `sink`.
+        stage_cache (StageCache, optional): Checkpoints of completed stages.
+
+    Returns:
+        dict: Number of clean, dirty and scored triggers.
+    """
+    logger.info(f"Processing {ifo}...")
+    instrumentation.set_labels(ifo=ifo)
+
+    overlap = OverlapPipeline(
+            ifo=ifo,
+            pipeline_trigger_path=args.pipeline_triggers,
+            output_dir=args.output_dir,
+            gspy_enabled=args.gspy,
+            omicron_enabled=args.omicron,
+            omicron_path=omicron_path,
+            gspy_source=args.gspy_source,
+            segment_file=segments if segments is not None else args.segment_file,
+            cluster_window=args.cluster_window,
+            cluster_bin_param=args.cluster_bin_param,
+            cluster_n_bins=args.cluster_n_bins,
+            paddings=args.paddings,
+            timeslides=timeslides,
+            context_windows=args.context_windows,
+            output_format=args.output_format,
+            stage_cache=stage_cache,
+        )
+
+    overlap.run()
+
+    with instrumentation.stage('write_output'):
+        overlap.write_output()
+
+    clean_df = overlap.separated_triggers.get("clean")
+    dirty_df = overlap.separated_triggers.get("dirty")
+
+    logger.info(f"len clean df: {len(clean_df)}")
+
+    model_path = ifo_model_path(args.model_path, ifo)
+
+    svm = SVMPipeline(
+            clean_df=clean_df,
+            dirty_df=dirty_df,
+            output_path=args.scored_output_path,
+            model_path=model_path,
+            cutoff_params=args.cutoff_params,
+            model_type=args.model_type,
+            nu=args.nu,
+            gamma=args.gamma,
+            n_jobs=args.n_jobs,
+            score_grid=args.score_grid,
+            compress_ratio=args.compress_svs,
+            partition_param=args.partition_param,
+            n_partitions=args.n_partitions,
+            random_state=args.random_state,
+            model_cache=model_cache,
+            output_format=args.output_format,
+        )
+
+    def score():
+        sweep_results = None
+
+        if args.sweep_nu and not args.score_only:
+            sweep_results = svm.sweep(args.sweep_nu, args.sweep_gamma, save_model=args.save_model)
+
+        elif not args.score_only:
+            svm.train(save_model=args.save_model)
+
+        return {'scored': svm.evaluate(), 'sweep': sweep_results}
+
+    # a model to be saved must actually be trained unless a previous run left it in place
+    if stage_cache is None or (args.save_model and not os.path.exists(model_path)):
+        frames = score()
+    else:
+        key = stage_cache.key(
+                'scoring',
+                {'ifo': ifo, **{name: getattr(args, name) for name in SCORING_ARGS}},
+                upstream=[overlap.stage_keys.get('separation')],
+                files=[model_path] if args.score_only else [],
             )
+        frames = stage_cache.fetch('scoring', key, score, ifo=ifo)
+
+    scored_df = frames['scored']
+
+    if frames['sweep'] is not None:
+        frames['sweep'].to_csv(f"{args.scored_output_path}/{ifo}_svm_sweep.csv", index=False)
+
+    counts = {'clean': len(clean_df), 'dirty': len(dirty_df), 'scored': len(scored_df)}
 
-        if not args.score_only:
-            svm.train()
+    if sink is not None:
+        with instrumentation.stage('duckdb_sink', rows_in=len(clean_df) + len(dirty_df) + len(scored_df)):
+            sink.write_chunk(ifo, chunk, {'clean': clean_df, 'dirty': dirty_df, 'scored': scored_df})
 
-        scored_df = svm.evaluate()
+    if args.output_format == 'csv':
+        scored_df = _scrub_csv_output(scored_df)
 
-        # FIXME this is hack-y
-        # figure out why non-numeric values being added to svm_score
-        # and why there are unnamed columns
-        # and maybe refactor trigger_group_id and omic_id
+        if scored_df is None:
+            return counts  # Skip overwriting this file
 
-        # drop columns problematic for duckdb
-        for column in ['trigger_group_id', 'omic_id']:
-            if column in scored_df.columns:
-                scored_df = scored_df.drop(columns=[column])
+    with instrumentation.stage('write_scored', rows_in=len(scored_df)):
+        output_path = TIO.write(scored_df, f"{args.scored_output_path}/{ifo}_scored_output", fmt=args.output_format)
+    logger.info(f"Saved output to {output_path}")
 
-        # check for weird svm scores that had non numeric characters
-        if 'svm_score' in scored_df.columns:
-            svm_numeric = pd.to_numeric(scored_df['svm_score'], errors='coerce')
-            non_numeric_mask = svm_numeric.isna() & scored_df['svm_score'].notna()
-            num_non_numeric = non_numeric_mask.sum()
+    return counts
 
-            if num_non_numeric > 0:
-                logger.debug(f"Found {num_non_numeric} non-numeric svm_score entries.")
 
-                if num_non_numeric < 10:
-                    scored_df = scored_df[~non_numeric_mask]
-                    logger.debug(f"Dropped {num_non_numeric} rows with non-numeric svm_score.")
-                else:
-                    logger.debug("Too many non-numeric svm_score entries (>10); file left unchanged.")
-                    continue  # Skip overwriting this file
+def main():
+    """
+    Entry point for the overlap pipeline CLI.
 
-        # drop unnamed columns
-        scored_df = scored_df.loc[:, ~scored_df.columns.str.startswith("Unnamed")]
+    Validates inputs, sets up per-IFO processing, and writes output CSVs.
+    """
+    args = parse_args()
+    omicron_path_dict = parse_omicron_paths(args)
+    recorder = start_instrumentation(args)
 
-        output_path = f"{args.scored_output_path}/{ifo}_scored_output.csv"
-        logger.info(f"Saving output to {output_path}")
-        scored_df.to_csv(f"{output_path}", index=False)
+    timeslides = load_timeslides(args)
+    model_cache = build_model_cache(args)
+    stage_cache = build_stage_cache(args)
+    sink = DuckDBSink(args.duckdb_path) if args.duckdb_path else None
 
+    for ifo in args.ifos:
+        omicron_path = omicron_path_dict.get(ifo) if args.omicron else None
+
+        run_ifo(
+                args,
+                ifo,
+                omicron_path=omicron_path,
+                timeslides=timeslides,
+                model_cache=model_cache,
+                sink=sink,
+                chunk=args.chunk,
+                stage_cache=stage_cache,
+            )
+
+    write_checkpoint_report(stage_cache, f"{args.output_dir}/checkpoint_status.csv")
+    instrumentation.write_metrics(recorder, metrics_dir(args))
+
+
+def _scrub_csv_output(scored_df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Clean up scored triggers before a CSV export.
+
+    Only needed for CSV, where overlap id lists are stringified; Parquet and
+    Arrow outputs keep typed list columns and need none of this.
+
+    Returns:
+        pd.DataFrame or None: The scrubbed triggers, or None if the output should be skipped.
+    """
+    # FIXME this is hack-y
+    # figure out why non-numeric values being added to svm_score
+    # and why there are unnamed columns
+    # and maybe refactor trigger_group_id and omic_id
+
+    # drop columns problematic for duckdb
+    for column in ['trigger_group_id', 'omic_id']:
+        if column in scored_df.columns:
+            scored_df = scored_df.drop(columns=[column])
+
+    # check for weird svm scores that had non numeric characters
+    if 'svm_score' in scored_df.columns:
+        svm_numeric = pd.to_numeric(scored_df['svm_score'], errors='coerce')
+        non_numeric_mask = svm_numeric.isna() & scored_df['svm_score'].notna()
+        num_non_numeric = non_numeric_mask.sum()
+
+        if num_non_numeric > 0:
+            logger.debug(f"Found {num_non_numeric} non-numeric svm_score entries.")
+
+            if num_non_numeric < 10:
+                scored_df = scored_df[~non_numeric_mask]
+                logger.debug(f"Dropped {num_non_numeric} rows with non-numeric svm_score.")
+            else:
+                logger.debug("Too many non-numeric svm_score entries (>10); file left unchanged.")
+                return None
+
+    # drop unnamed columns
+    return scored_df.loc[:, ~scored_df.columns.str.startswith("Unnamed")]
 
 if __name__ == '__main__':
 
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+import logging
+
+from typing import Optional, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+# trigger columns copied into the provenance so every input trigger can also be found in the GstLAL files
+PROVENANCE_COLUMNS = ('end_time', 'end_time_ns')
+
+
+class ClusterEngine:
+    """
+    A class to reduce pipeline triggers to the loudest trigger per time window.
+
+    Triggers are assigned to fixed, non-overlapping time windows of width `window`
+    and, optionally, to template-bank bins of `bin_param`. Within each
+    (bin, window) cell only the trigger with the largest `rank_column` is kept.
+    The whole reduction is a single lexsort over the trigger arrays, so it scales
+    to tens of millions of triggers.
+
+    Every input trigger is labelled with the `cluster_id` of its cell, which lets
+    results computed on the reduced set be mapped back onto all triggers. The
+    provenance identifies triggers by `id_column`, which the overlap pipeline
+    writes in every output, and by their end time.
+
+    Attributes:
+        pipeline_triggers (pd.DataFrame): Full set of pipeline triggers.
+        window (float): Width in seconds of the clustering time windows.
+        rank_column (str): Column used to pick the loudest trigger in a cell.
+        time_column (str): Column holding the trigger time used for windowing.
+        id_column (str): Column identifying each trigger in the provenance; index labels if absent.
+        bin_param (str or None): Optional template parameter to bin on.
+        n_bins (int): Number of quantile bins if `bin_edges` is not given.
+        bin_edges (np.ndarray or None): Explicit bin edges for `bin_param`.
+        clustered_triggers (pd.DataFrame or None): Loudest trigger per cell.
+        provenance (pd.DataFrame or None): Map from each input trigger to its cluster.
+
+    Methods:
+        compute_bins(): Return the template-bin index of each trigger.
+        cluster(): Reduce triggers to one per (bin, window) cell.
+        return_clustered_triggers(): Return the reduced trigger DataFrame.
+        return_provenance(): Return the per-trigger cluster mapping.
+        expand(results, columns): Broadcast results on clusters back to all triggers.
+    """
+
+    def __init__(
+            self,
+            pipeline_triggers: pd.DataFrame,
+            window: float = 1.0,
+            rank_column: str = 'snr',
+            time_column: str = 'tend',
+            id_column: str = 'trigger_id',
+            bin_param: Optional[str] = None,
+            n_bins: int = 10,
+            bin_edges: Optional[Sequence[float]] = None,
+        ) -> None:
+
+        if window <= 0:
+            msg = f"Cluster window must be positive, got {window}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.pipeline_triggers = pipeline_triggers
+        self.window = window
+        self.rank_column = rank_column
+        self.time_column = time_column
+        self.id_column = id_column
+        self.bin_param = bin_param
+        self.n_bins = n_bins
+        self.bin_edges = None if bin_edges is None else np.asarray(bin_edges, dtype=np.float64)
+
+        self.clustered_triggers = None
+        self.provenance = None
+
+    def compute_bins(self) -> np.ndarray:
+        """
+        Return the template-bin index of each trigger.
+
+        Bins are taken from `bin_edges` if given, otherwise from quantiles of
+        `bin_param` so that each bin holds roughly the same number of triggers.
+        Values outside the edges are assigned to the nearest edge bin.
+
+        Returns:
+            np.ndarray: Integer bin index per trigger (all zero without `bin_param`).
+        """
+        if self.bin_param is None:
+            return np.zeros(len(self.pipeline_triggers), dtype=np.int64)
+
+        values = self.pipeline_triggers[self.bin_param].to_numpy(dtype=np.float64)
+
+        if self.bin_edges is None:
+            self.bin_edges = np.unique(np.quantile(values, np.linspace(0, 1, self.n_bins + 1)))
+
+        n_edges = len(self.bin_edges)
+
+        if n_edges < 2:
+            return np.zeros(len(values), dtype=np.int64)
+
+        bins = np.searchsorted(self.bin_edges, values, side='right') - 1
+
+        return np.clip(bins, 0, n_edges - 2)
+
+    def cluster(self) -> None:
+        """
+        Keep the loudest trigger in every (bin, time window) cell.
+
+        Adds `cluster_id` to the full trigger set, and `cluster_id` plus
+        `cluster_size` to the reduced set. The reduced set keeps the original
+        index labels of the surviving triggers.
+        """
+        n = len(self.pipeline_triggers)
+
+        times = self.pipeline_triggers[self.time_column].to_numpy(dtype=np.float64)
+        rank = self.pipeline_triggers[self.rank_column].to_numpy(dtype=np.float64)
+
+        windows = np.floor(times / self.window).astype(np.int64)
+        bins = self.compute_bins()
+
+        # sort by bin, then window, then descending rank: the first row of each
+        # (bin, window) run is the loudest trigger of that cell
+        order = np.lexsort((-rank, windows, bins))
+        sorted_windows = windows[order]
+        sorted_bins = bins[order]
+
+        new_cell = np.ones(n, dtype=bool)
+        new_cell[1:] = (sorted_windows[1:] != sorted_windows[:-1]) | (sorted_bins[1:] != sorted_bins[:-1])
+
+        sorted_ids = np.cumsum(new_cell) - 1
+        cluster_ids = np.empty(n, dtype=np.int64)
+        cluster_ids[order] = sorted_ids
+
+        representatives = order[new_cell]
+        sizes = np.diff(np.append(np.flatnonzero(new_cell), n))
+
+        self.pipeline_triggers['cluster_id'] = cluster_ids
+
+        self.clustered_triggers = self.pipeline_triggers.iloc[representatives].copy()
+        self.clustered_triggers['cluster_size'] = sizes
+
+        if self.id_column in self.pipeline_triggers.columns:
+            ids = self.pipeline_triggers[self.id_column].to_numpy()
+        else:
+            ids = self.pipeline_triggers.index.values
+
+        provenance = {self.id_column: ids}
+
+        for column in PROVENANCE_COLUMNS:
+            if column in self.pipeline_triggers.columns:
+                provenance[column] = self.pipeline_triggers[column].to_numpy()
+
+        provenance['cluster_id'] = cluster_ids
+        provenance['representative'] = ids[representatives][cluster_ids]
+
+        self.provenance = pd.DataFrame(provenance)
+
+        logger.info(
+                f"Clustered {n} triggers into {len(representatives)} "
+                f"({n / max(len(representatives), 1):.1f}x reduction)"
+            )
+
+    def return_clustered_triggers(self) -> pd.DataFrame:
+        """
+        Return the reduced trigger DataFrame.
+
+        Returns:
+            pd.DataFrame: The loudest trigger per cell with `cluster_id` and `cluster_size`.
+        """
+        return self.clustered_triggers
+
+    def return_provenance(self) -> pd.DataFrame:
+        """
+        Return the mapping from every input trigger to its cluster.
+
+        Returns:
+            pd.DataFrame: One row per input trigger, in input order: its `id_column`
+            value, `end_time` and `end_time_ns` when present, `cluster_id`, and the
+            `id_column` value of the cluster's `representative` trigger.
+        """
+        return self.provenance
+
+    def expand(self, results: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Broadcast results computed on clustered triggers back onto all triggers.
+
+        Args:
+            results (pd.DataFrame): Any DataFrame carrying a `cluster_id` column,
+                e.g. separated or scored clustered triggers.
+            columns (list[str], optional): Result columns to carry over. Defaults
+                to every column not already present on the input triggers.
+
+        Returns:
+            pd.DataFrame: All input triggers annotated with their cluster's results.
+        """
+        if columns is None:
+            columns = [c for c in results.columns if c not in self.pipeline_triggers.columns]
+
+        return self.pipeline_triggers.merge(
+                results[['cluster_id'] + columns],
+                on='cluster_id',
+                how='inner',
+            )
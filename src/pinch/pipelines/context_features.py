@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+import logging
+
+from typing import Optional, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def _reference_times(glitches: pd.DataFrame) -> np.ndarray:
+    """
+    Return a single reference time per glitch.
+
+    Uses the peak time when the catalog provides one (`event_time` for Gravity
+    Spy, `peak_time`/`peak_time_ns` for Omicron) and the interval midpoint otherwise.
+    """
+    if 'event_time' in glitches.columns:
+        return glitches['event_time'].to_numpy(dtype=np.float64)
+
+    if 'peak_time' in glitches.columns:
+        times = glitches['peak_time'].to_numpy(dtype=np.float64)
+
+        if 'peak_time_ns' in glitches.columns:
+            times = times + 1e-9 * glitches['peak_time_ns'].to_numpy(dtype=np.float64)
+
+        return times
+
+    return 0.5 * (
+            glitches['tstart'].to_numpy(dtype=np.float64)
+            + glitches['tend'].to_numpy(dtype=np.float64)
+        )
+
+
+def _range_max(values: np.ndarray, lo: np.ndarray, hi: np.ndarray, empty: float = 0.0) -> np.ndarray:
+    """
+    Return max(values[lo:hi]) for many half-open ranges at once.
+
+    Builds a sparse table of power-of-two range maxima in O(m log m), then
+    answers each query with two lookups. Empty ranges return `empty`.
+    """
+    out = np.full(lo.shape, empty, dtype=np.float64)
+    length = hi - lo
+    nonempty = length > 0
+
+    if not nonempty.any():
+        return out
+
+    table = [values.astype(np.float64)]
+    span = 1
+
+    while 2 * span <= len(values):
+        prev = table[-1]
+        table.append(np.maximum(prev[:-span], prev[span:]))
+        span *= 2
+
+    lo, hi, length = lo[nonempty], hi[nonempty], length[nonempty]
+    level = np.floor(np.log2(length)).astype(np.int64)
+
+    result = np.empty(len(lo), dtype=np.float64)
+
+    for k in np.unique(level):
+        sel = level == k
+        width = 1 << k
+        result[sel] = np.maximum(table[k][lo[sel]], table[k][hi[sel] - width])
+
+    out[nonempty] = result
+
+    return out
+
+
+class ContextFeatureEngine:
+    """
+    A class to describe the glitch environment around each pipeline trigger.
+
+    Complements the binary overlap annotation of `OverlapEngine` with
+    continuous features that can be fed to the SVM through `cutoff_params`:
+
+        - `omic_count_<N>s`: Omicron glitches with reference time within +-N s.
+        - `omic_max_snr_<N>s`: Maximum Omicron SNR within +-N s (0 if none).
+        - `gspy_count_<N>s`: Gravity Spy glitches within +-N s.
+        - `dt_nearest_<label>`: Time to the nearest Gravity Spy glitch of each
+          class, capped at `dt_cap`.
+
+    Every feature is computed from glitch times sorted once per catalog and
+    `np.searchsorted` over all trigger times, so cost is O((n + m) log m) for n
+    triggers and m glitches, independent of how glitchy the data are.
+
+    Attributes:
+        pipeline_triggers (pd.DataFrame): Triggers to annotate.
+        gspy_triggers (pd.DataFrame or None): Gravity Spy glitches.
+        omicron_triggers (pd.DataFrame or None): Omicron glitches.
+        windows (list[float]): Half-widths in seconds of the count windows.
+        dt_cap (float): Upper bound for nearest-glitch distances.
+        time_column (str): Trigger time column.
+        feature_columns (list[str]): Names of the columns added so far.
+
+    Methods:
+        add_omicron_features(): Add Omicron counts and maximum SNR per window.
+        add_gspy_features(): Add Gravity Spy counts per window and per-class distances.
+        compute(): Add all available features and return the triggers.
+        return_feature_columns(): Return the names of the added columns.
+    """
+
+    def __init__(
+            self,
+            pipeline_triggers: pd.DataFrame,
+            gspy_triggers: Optional[pd.DataFrame] = None,
+            omicron_triggers: Optional[pd.DataFrame] = None,
+            windows: Sequence[float] = (1.0,),
+            dt_cap: float = 3600.0,
+            time_column: str = 'tend',
+        ) -> None:
+
+        self.pipeline_triggers = pipeline_triggers
+        self.gspy_triggers = gspy_triggers
+        self.omicron_triggers = omicron_triggers
+        self.windows = list(windows)
+        self.dt_cap = dt_cap
+        self.time_column = time_column
+        self.feature_columns = []
+
+        self.times = self.pipeline_triggers[self.time_column].to_numpy(dtype=np.float64)
+
+    def _window_bounds(self, sorted_times: np.ndarray, half_width: float):
+        lo = np.searchsorted(sorted_times, self.times - half_width, side='left')
+        hi = np.searchsorted(sorted_times, self.times + half_width, side='right')
+
+        return lo, hi
+
+    def _add(self, column: str, values: np.ndarray) -> None:
+        self.pipeline_triggers[column] = values
+        self.feature_columns.append(column)
+
+    def add_omicron_features(self) -> None:
+        """
+        Add Omicron glitch counts and maximum SNR within each window.
+        """
+        ref = _reference_times(self.omicron_triggers)
+        order = np.argsort(ref, kind='stable')
+        sorted_times = ref[order]
+        sorted_snr = self.omicron_triggers['snr'].to_numpy(dtype=np.float64)[order]
+
+        for half_width in self.windows:
+            lo, hi = self._window_bounds(sorted_times, half_width)
+
+            self._add(f"omic_count_{half_width:g}s", hi - lo)
+            self._add(f"omic_max_snr_{half_width:g}s", _range_max(sorted_snr, lo, hi))
+
+    def add_gspy_features(self) -> None:
+        """
+        Add Gravity Spy glitch counts within each window and the distance to the
+        nearest glitch of each `ml_label` class.
+        """
+        ref = _reference_times(self.gspy_triggers)
+        sorted_times = np.sort(ref)
+
+        for half_width in self.windows:
+            lo, hi = self._window_bounds(sorted_times, half_width)
+            self._add(f"gspy_count_{half_width:g}s", hi - lo)
+
+        if 'ml_label' not in self.gspy_triggers.columns:
+            return
+
+        labels = self.gspy_triggers['ml_label'].to_numpy()
+
+        for label in np.unique(labels):
+            class_times = np.sort(ref[labels == label])
+            idx = np.searchsorted(class_times, self.times)
+
+            before = self.times - class_times[np.clip(idx - 1, 0, None)]
+            after = class_times[np.clip(idx, None, len(class_times) - 1)] - self.times
+
+            before[idx == 0] = np.inf
+            after[idx == len(class_times)] = np.inf
+
+            self._add(f"dt_nearest_{label}", np.minimum(np.minimum(before, after), self.dt_cap))
+
+    def compute(self) -> pd.DataFrame:
+        """
+        Add every feature supported by the available catalogs.
+
+        Returns:
+            pd.DataFrame: The pipeline triggers with context feature columns.
+        """
+        if self.omicron_triggers is not None and len(self.omicron_triggers):
+            self.add_omicron_features()
+
+        if self.gspy_triggers is not None and len(self.gspy_triggers):
+            self.add_gspy_features()
+
+        logger.info(f"Added context features: {self.feature_columns}")
+
+        return self.pipeline_triggers
+
+    def return_feature_columns(self) -> List[str]:
+        """
+        Return the names of the context feature columns added so far.
+
+        Returns:
+            list[str]: Column names usable as SVM `cutoff_params`.
+        """
+        return self.feature_columns
@@ -1,15 +1,127 @@
 #!/usr/bin/env python3
 
+import numpy as np
 import pandas as pd
 import logging
 
-from typing import Optional, Dict, List, Any, Union
+from typing import Optional, Dict, List, Any, Union, Sequence, Tuple
 
-from intervaltree import IntervalTree
 from collections import defaultdict
 
 logger = logging.getLogger(__name__)
 
+
+def _sorted_overlap_pairs(
+        trig_start: np.ndarray,
+        trig_end: np.ndarray,
+        glitch_start: np.ndarray,
+        glitch_end: np.ndarray,
+        max_pad: float = 0.0,
+        block_size: int = 1_000_000,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find every (trigger, glitch) pair that overlaps when glitches are padded by up to `max_pad`.
+
+    Glitches are sorted by start time once. For each trigger, the candidates
+    are the contiguous run of glitches starting in
+    (tstart - max_pad - longest glitch, tend + max_pad), found with two
+    `np.searchsorted` calls, and are then filtered exactly. Triggers are
+    processed in blocks of `block_size` to bound memory.
+
+    For every pair the returned `gap` is the smallest padding at which the pair
+    stops overlapping: a pair overlaps with padding p if and only if gap < p.
+    With p = 0 this matches the open-interval semantics of `IntervalTree.overlap`.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: (trigger positions, glitch
+        positions in the caller's order, gap), sorted by trigger position.
+    """
+    order = np.argsort(glitch_start, kind='stable')
+    gs = glitch_start[order]
+    ge = glitch_end[order]
+    max_dur = float(np.max(ge - gs)) if len(gs) else 0.0
+
+    trig_pos_blocks, glitch_pos_blocks, gap_blocks = [], [], []
+
+    for block_start in range(0, len(trig_start), block_size):
+        a = trig_start[block_start:block_start + block_size]
+        b = trig_end[block_start:block_start + block_size]
+
+        lo = np.searchsorted(gs, a - max_pad - max_dur, side='right')
+        hi = np.searchsorted(gs, b + max_pad, side='left')
+        counts = np.maximum(hi - lo, 0)
+
+        trig_pos = np.repeat(np.arange(len(a)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        glitch_pos = lo[trig_pos] + offsets
+
+        gap = np.maximum(gs[glitch_pos] - b[trig_pos], a[trig_pos] - ge[glitch_pos])
+        keep = gap < max_pad
+
+        trig_pos_blocks.append(trig_pos[keep] + block_start)
+        glitch_pos_blocks.append(order[glitch_pos[keep]])
+        gap_blocks.append(gap[keep])
+
+    if not trig_pos_blocks:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=np.float64)
+
+    return (
+            np.concatenate(trig_pos_blocks),
+            np.concatenate(glitch_pos_blocks),
+            np.concatenate(gap_blocks),
+        )
+
+
+def _group_ids(n: int, trig_pos: np.ndarray, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Collect ids into one list per trigger from pairs sorted by trigger position.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Object array of id lists and overlap counts.
+    """
+    counts = np.bincount(trig_pos, minlength=n)
+    lists = np.empty(n, dtype=object)
+    lists[:] = [[] for _ in range(n)]
+
+    hit = np.flatnonzero(counts)
+    split_ids = np.split(ids, np.cumsum(counts[hit])[:-1])
+
+    for pos, group in zip(hit, split_ids):
+        lists[pos] = group.tolist()
+
+    return lists, counts
+
+
+def _sorted_overlap_counts(
+        trig_start: np.ndarray,
+        trig_end: np.ndarray,
+        sorted_glitch_start: np.ndarray,
+        sorted_glitch_end: np.ndarray,
+    ) -> np.ndarray:
+    """
+    Count glitches overlapping each trigger interval without enumerating pairs.
+
+    A glitch misses [tstart, tend] if it starts at or after tend or ends at or
+    before tstart, and those two sets are disjoint, so the overlap count is
+    #(start < tend) - #(end <= tstart). Both terms are a single `np.searchsorted`
+    against independently sorted start and end arrays.
+
+    Returns:
+        np.ndarray: Overlap count per trigger, same shape as the inputs.
+    """
+    counts = (
+            np.searchsorted(sorted_glitch_start, trig_end, side='left')
+            - np.searchsorted(sorted_glitch_end, trig_start, side='right')
+        )
+
+    return np.maximum(counts, 0)
+
+
+def _padding_suffix(pad: float) -> str:
+    return f"_pad{pad:g}"
+
+
 class OverlapEngine:
     """
     A class to identify and annotate overlaps between pipeline triggers and glitch triggers.
@@ -30,6 +142,9 @@ class OverlapEngine:
     Methods:
         find_gspy_overlaps(): Use interval trees to find and annotate overlaps with Gravity Spy glitches.
         find_omicron_overlaps(): Use interval trees to find and annotate overlaps with Omicron glitches.
+        find_overlaps_multiwindow(paddings): Annotate overlaps for several glitch paddings in one sweep.
+        find_timeslide_overlaps(offsets): Count overlaps for every time slide in one vectorized pass.
+        return_timeslide_summary(): Per-slide dirty trigger counts.
         separate_triggers(): Categorize triggers into clean, dirty, and other.
         return_separated_triggers(): Return dictionary of clean, dirty, and other triggers.
         return_pipeline_triggers(): Return the full annotated pipeline trigger DataFrame.
@@ -41,9 +156,9 @@ class OverlapEngine:
             gspy_triggers: Optional[pd.DataFrame] = None,
             omicron_triggers: Optional[pd.DataFrame] = None
         ) -> None:
-            self.pipeline_triggers = pipeline_triggers
-            self.gspy_triggers = gspy_triggers
-            self.omicron_triggers = omicron_triggers
+        self.pipeline_triggers = pipeline_triggers
+        self.gspy_triggers = gspy_triggers
+        self.omicron_triggers = omicron_triggers
 
         for col in ['glitch_id', 'omic_id']:
             if col not in self.pipeline_triggers.columns:
@@ -95,6 +210,7 @@ class OverlapEngine:
 
         This replaces the older mask-based approach and supports multiple overlaps per trigger.
         """
+        from intervaltree import IntervalTree
 
         self.tree = IntervalTree()
 
@@ -121,6 +237,7 @@ class OverlapEngine:
 
         This replaces the older mask-based approach and supports multiple overlaps per trigger.
         """
+        from intervaltree import IntervalTree
 
         self.omicron_tree = IntervalTree()
 
@@ -185,6 +302,174 @@ class OverlapEngine:
 
             self.pipeline_triggers.loc[affected_indicies, 'omic_id'] = glitch_id
 
+    def find_overlaps_multiwindow(self, paddings: Sequence[float]) -> None:
+        """
+        Annotate overlaps for several glitch paddings in a single sweep.
+
+        Each glitch interval is widened to [tstart - pad, tend + pad] for every
+        padding. Candidate pairs are found once for the largest padding; the
+        smaller paddings are subsets selected by each pair's gap, so K paddings
+        cost about one overlap pass.
+
+        For each padding the following columns are added, suffixed `_pad<pad>`
+        (e.g. `dirty_pad0.5`): `glitch_id` and `omic_id` lists (for the enabled
+        catalogs), `num_glitch_overlaps`, `num_omic_overlaps` and `dirty`.
+
+        Args:
+            paddings (sequence[float]): Non-negative paddings in seconds.
+        """
+        paddings = sorted(set(float(p) for p in paddings))
+
+        if not paddings or paddings[0] < 0:
+            msg = f"Paddings must be a non-empty list of non-negative values, got {paddings}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        n = len(self.pipeline_triggers)
+        trig_start = self.pipeline_triggers['tstart'].to_numpy(dtype=np.float64)
+        trig_end = self.pipeline_triggers['tend'].to_numpy(dtype=np.float64)
+
+        catalogs = []
+
+        if self.gspy_triggers is not None:
+            catalogs.append(('glitch_id', 'num_glitch_overlaps', self.gspy_triggers, self.gspy_triggers['gravityspy_id'].to_numpy()))
+
+        if self.omicron_triggers is not None:
+            catalogs.append(('omic_id', 'num_omic_overlaps', self.omicron_triggers, self.omicron_triggers.index.to_numpy()))
+
+        dirty = {pad: np.zeros(n, dtype=bool) for pad in paddings}
+
+        for id_col, count_col, glitches, ids in catalogs:
+            trig_pos, glitch_pos, gap = _sorted_overlap_pairs(
+                    trig_start,
+                    trig_end,
+                    glitches['tstart'].to_numpy(dtype=np.float64),
+                    glitches['tend'].to_numpy(dtype=np.float64),
+                    max_pad=paddings[-1],
+                )
+
+            for pad in paddings:
+                keep = gap < pad
+                lists, counts = _group_ids(n, trig_pos[keep], ids[glitch_pos[keep]])
+
+                suffix = _padding_suffix(pad)
+                self.pipeline_triggers[id_col + suffix] = lists
+                self.pipeline_triggers[count_col + suffix] = counts
+                dirty[pad] |= counts > 0
+
+        for pad in paddings:
+            self.pipeline_triggers['dirty' + _padding_suffix(pad)] = dirty[pad]
+            logger.info(f"Padding {pad:g}s: {dirty[pad].sum()} / {n} triggers dirty")
+
+    def find_timeslide_overlaps(
+            self,
+            offsets: Sequence[float],
+            max_block_elements: int = 10_000_000,
+        ) -> pd.DataFrame:
+        """
+        Count glitch overlaps of every trigger under a set of time slides.
+
+        A slide with offset `o` compares the triggers against the glitch
+        catalogs shifted by +o seconds. Rather than copying the catalogs, the
+        trigger intervals are shifted by -o and overlap counts are taken with
+        `_sorted_overlap_counts` against start and end arrays sorted once per
+        catalog. Triggers x slides are evaluated as a broadcast 2-D block,
+        split into blocks of at most `max_block_elements` entries.
+
+        The result is sparse: only (trigger, slide) pairs with at least one
+        overlap are kept.
+
+        Args:
+            offsets (sequence[float]): Time-slide offsets in seconds for this IFO.
+            max_block_elements (int): Upper bound on triggers x slides per block.
+
+        Returns:
+            pd.DataFrame: Columns `trigger_id` (the triggers' `trigger_id` column), `slide`, `offset`,
+            `num_glitch_overlaps`, `num_omic_overlaps`.
+        """
+        offsets = np.asarray(offsets, dtype=np.float64)
+        n_slides = len(offsets)
+
+        trig_start = self.pipeline_triggers['tstart'].to_numpy(dtype=np.float64)
+        trig_end = self.pipeline_triggers['tend'].to_numpy(dtype=np.float64)
+        trigger_ids = self.pipeline_triggers['trigger_id'].to_numpy()
+
+        catalogs = {}
+
+        for count_col, glitches in (
+                ('num_glitch_overlaps', self.gspy_triggers),
+                ('num_omic_overlaps', self.omicron_triggers)):
+
+            if glitches is not None:
+                catalogs[count_col] = (
+                        np.sort(glitches['tstart'].to_numpy(dtype=np.float64)),
+                        np.sort(glitches['tend'].to_numpy(dtype=np.float64)),
+                    )
+
+        block_size = max(1, max_block_elements // max(n_slides, 1))
+        results = []
+
+        for block_start in range(0, len(trig_start), block_size):
+            a = trig_start[block_start:block_start + block_size, None] - offsets[None, :]
+            b = trig_end[block_start:block_start + block_size, None] - offsets[None, :]
+
+            counts = {
+                col: _sorted_overlap_counts(a, b, sorted_start, sorted_end)
+                for col, (sorted_start, sorted_end) in catalogs.items()
+            }
+
+            hit = np.zeros(a.shape, dtype=bool)
+
+            for c in counts.values():
+                hit |= c > 0
+
+            trig_pos, slide = np.nonzero(hit)
+
+            block = {
+                'trigger_id': trigger_ids[trig_pos + block_start],
+                'slide': slide,
+                'offset': offsets[slide],
+            }
+
+            for col in ('num_glitch_overlaps', 'num_omic_overlaps'):
+                block[col] = counts[col][trig_pos, slide] if col in counts else np.zeros(len(slide), dtype=np.int64)
+
+            results.append(pd.DataFrame(block))
+
+        if results:
+            self.timeslide_overlaps = pd.concat(results, ignore_index=True)
+        else:
+            self.timeslide_overlaps = pd.DataFrame(
+                    columns=['trigger_id', 'slide', 'offset', 'num_glitch_overlaps', 'num_omic_overlaps'])
+
+        self.timeslide_offsets = offsets
+
+        logger.info(
+                f"Time slides: {len(self.timeslide_overlaps)} dirty (trigger, slide) pairs "
+                f"across {n_slides} slides"
+            )
+
+        return self.timeslide_overlaps
+
+    def return_timeslide_summary(self) -> pd.DataFrame:
+        """
+        Summarize time-slide overlaps per slide.
+
+        Returns:
+            pd.DataFrame: One row per slide with `offset`, `num_dirty` and `frac_dirty`.
+        """
+        num_dirty = np.bincount(
+                self.timeslide_overlaps['slide'].to_numpy(dtype=np.int64),
+                minlength=len(self.timeslide_offsets),
+            )
+
+        return pd.DataFrame({
+            'slide': np.arange(len(self.timeslide_offsets)),
+            'offset': self.timeslide_offsets,
+            'num_dirty': num_dirty,
+            'frac_dirty': num_dirty / max(len(self.pipeline_triggers), 1),
+        })
+
     @staticmethod
     def ensure_list(x: Any) -> List[Any]:
 
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 
 import os
+import numpy as np
 import pandas as pd
 
-from typing import Optional, Dict, Union
+from typing import Callable, Optional, Dict, Union, Sequence
 from pathlib import Path
 
 from pinch.handlers.gspy_handler import GravitySpyHandler
@@ -11,6 +12,13 @@ from pinch.handlers.omicron_handler import OmicronHandler
 from pinch.handlers.gstlal_handler import GstlalHandler
 
 from pinch.pipelines.overlap_engine import OverlapEngine
+from pinch.pipelines.cluster_engine import ClusterEngine
+from pinch.pipelines.context_features import ContextFeatureEngine
+
+from pinch.utils.segments import SegmentList
+from pinch.utils.trigger_io import TIO
+from pinch.utils.checkpoint import StageCache
+from pinch.utils import instrumentation
 
 
 class OverlapPipeline:
@@ -23,15 +31,32 @@ class OverlapPipeline:
     Attributes:
         ifo (str): Interferometer (e.g., 'H1', 'L1').
         args (Namespace): Parsed command-line arguments.
-        pipeline_df (pd.DataFrame): DataFrame of pipeline triggers.
+        pipeline_df (pd.DataFrame): DataFrame of pipeline triggers, with a `trigger_id` row id written in every output.
         gspy_df (pd.DataFrame): DataFrame of Gravity Spy triggers.
         omic_df (pd.DataFrame): DataFrame of Omicron triggers.
+        gspy_source (str or None): Local Gravity Spy glitch table used instead of the live database.
+        segments (SegmentList or None): Optional segments restricting all trigger sets.
+        cluster_window (float or None): If set, keep only the loudest trigger per window before overlap.
+        cluster_engine (ClusterEngine or None): Clustering state, kept to expand results later.
+        paddings (sequence[float] or None): Extra glitch paddings to annotate in one multi-window sweep.
+        timeslides (dict or None): Time-slide offsets per IFO for background overlap counting.
+        timeslide_overlaps (pd.DataFrame or None): Sparse per (trigger, slide) overlap counts.
+        context_windows (sequence[float] or None): Half-widths for glitch-density context features.
+        context_columns (list[str]): Names of the context feature columns added to the triggers.
         separated_triggers (dict): Dictionary of DataFrames: clean, dirty, other.
+        output_format (str): 'csv', 'parquet' or 'arrow' for `write_output`.
+        overlap_df (pd.DataFrame or None): Pipeline triggers annotated with their overlaps.
+        stage_cache (StageCache or None): Checkpoints of completed stages.
+        stage_keys (dict[str, str]): Checkpoint key of each stage run.
 
     Methods:
         load_pipeline_triggers(): Load and process GstLAL triggers.
         load_gspy_triggers(): Query and prepare Gravity Spy triggers.
         load_omicron_triggers(): Load and condition Omicron triggers.
+        cluster_pipeline_triggers(): Reduce pipeline triggers to the loudest per window.
+        add_context_features(): Annotate triggers with glitch-density context features.
+        find_overlaps(): Annotate triggers with glitch overlaps and time-slide counts.
+        separate_triggers(): Split annotated triggers into clean, dirty and other.
         run(): Perform full overlap analysis.
         write_output(separated_triggers=None): Write categorized triggers to disk.
     """
@@ -43,6 +68,16 @@ class OverlapPipeline:
             gspy_enabled: bool = False,
             omicron_enabled: bool = False,
             omicron_path: Optional[str | Path] = None,
+            gspy_source: Optional[str | Path] = None,
+            segment_file: Optional[Union[str, Path, SegmentList]] = None,
+            cluster_window: Optional[float] = None,
+            cluster_bin_param: Optional[str] = None,
+            cluster_n_bins: int = 10,
+            paddings: Optional[Sequence[float]] = None,
+            timeslides: Optional[Dict[str, Sequence[float]]] = None,
+            context_windows: Optional[Sequence[float]] = None,
+            output_format: str = 'csv',
+            stage_cache: Optional[StageCache] = None,
     ) -> None:
 
         self.ifo = ifo
@@ -51,17 +86,45 @@ class OverlapPipeline:
         self.gspy_enabled = gspy_enabled
         self.omicron_enabled = omicron_enabled
         self.omicron_path = omicron_path
+        self.gspy_source = gspy_source
+        self.segment_file = segment_file
+        self.output_format = output_format
+
+        if isinstance(segment_file, SegmentList):
+            self.segments = segment_file
+        else:
+            self.segments = SegmentList.from_file(segment_file) if segment_file else None
+
+        self.cluster_window = cluster_window
+        self.cluster_bin_param = cluster_bin_param
+        self.cluster_n_bins = cluster_n_bins
+        self.cluster_engine = None
+        self.paddings = paddings
+        self.timeslides = timeslides
+        self.timeslide_overlaps = None
+        self.timeslide_summary = None
+        self.context_windows = context_windows
+        self.context_columns = []
+
+        self.stage_cache = stage_cache
+        self.stage_keys = {}
 
         self.pipeline_df = None
         self.gspy_df = None
         self.omic_df = None
+        self.overlap_df = None
         self.separated_triggers = {}
 
     def load_pipeline_triggers(self) -> None:
         """
         Load and condition GstLAL pipeline triggers using GstlalHandler.
         """
-        gstlal_handler = GstlalHandler(self.pipeline_trigger_path, self.ifo)
+        gstlal_handler = GstlalHandler(
+                self.pipeline_trigger_path,
+                self.ifo,
+                segment=self.segments is not None,
+                segment_file=self.segments,
+            )
         self.pipeline_df = gstlal_handler.condition_gstlal_triggers()
 
     def load_gspy_triggers(self) -> None:
@@ -72,6 +135,8 @@ class OverlapPipeline:
                 self.ifo,
                 omicron_df=self.omic_df,
                 margin=10.0,
+                segments=self.segments,
+                source=self.gspy_source,
             )
 
         #gspy_handler.start = min(self.pipeline_df['tstart']) - 10
@@ -86,22 +151,52 @@ class OverlapPipeline:
         start = min(self.pipeline_df['tstart']) - 10
         end = max(self.pipeline_df['tstart']) + 10
 
-        omic_handler = OmicronHandler(self.omicron_path, start=start, end=end)
+        omic_handler = OmicronHandler(
+                self.omicron_path,
+                start=start,
+                end=end,
+                segments=self.segments,
+            )
 
         self.omic_df = omic_handler.condition_omicron()
 
-    def run(self) -> None:
+    def cluster_pipeline_triggers(self) -> None:
         """
-        Execute the pipeline: load data, perform overlap analysis, and separate triggers.
+        Replace pipeline triggers with the loudest trigger per clustering cell.
+
+        The full trigger set and its cluster mapping stay available on
+        `cluster_engine` so that results can be expanded again.
         """
-        self.load_pipeline_triggers()
+        self.cluster_engine = ClusterEngine(
+                self.pipeline_df,
+                window=self.cluster_window,
+                bin_param=self.cluster_bin_param,
+                n_bins=self.cluster_n_bins,
+            )
 
-        if self.omicron_enabled:
-            self.load_omicron_triggers()
+        self.cluster_engine.cluster()
+        self.pipeline_df = self.cluster_engine.return_clustered_triggers()
 
-        if self.gspy_enabled:
-            self.load_gspy_triggers()
+    def add_context_features(self) -> None:
+        """
+        Add glitch counts, maximum Omicron SNR and nearest Gravity Spy class
+        distances around each pipeline trigger.
+        """
+        context = ContextFeatureEngine(
+                self.pipeline_df,
+                gspy_triggers=self.gspy_df,
+                omicron_triggers=self.omic_df,
+                windows=self.context_windows,
+            )
+
+        self.pipeline_df = context.compute()
+        self.context_columns = context.return_feature_columns()
 
+    def find_overlaps(self) -> None:
+        """
+        Annotate pipeline triggers with their glitch overlaps and, if
+        configured, count overlaps in time slides.
+        """
         engine = OverlapEngine(
                 self.pipeline_df,
                 gspy_triggers=self.gspy_df,
@@ -109,18 +204,150 @@ class OverlapPipeline:
             )
 
         if self.gspy_df is not None:
-            engine.find_gspy_overlaps_tree()
+            with instrumentation.stage('overlap.gspy', rows_in=len(self.gspy_df)):
+                engine.find_gspy_overlaps_tree()
 
         if self.omic_df is not None:
-            engine.find_omicron_overlaps_tree()
+            with instrumentation.stage('overlap.omicron', rows_in=len(self.omic_df)):
+                engine.find_omicron_overlaps_tree()
+
+        if self.paddings:
+            with instrumentation.stage('overlap.multiwindow'):
+                engine.find_overlaps_multiwindow(self.paddings)
+
+        if self.timeslides and self.ifo in self.timeslides:
+            with instrumentation.stage('overlap.timeslides') as rec:
+                self.timeslide_overlaps = engine.find_timeslide_overlaps(self.timeslides[self.ifo])
+                self.timeslide_summary = engine.return_timeslide_summary()
+                rec.rows_out = len(self.timeslide_overlaps)
+
+        self.overlap_df = engine.return_pipeline_triggers()
+
+    def separate_triggers(self) -> None:
+        """
+        Split the overlap-annotated triggers into clean, dirty and other.
+        """
+        engine = OverlapEngine(
+                self.overlap_df,
+                gspy_triggers=self.gspy_df,
+                omicron_triggers=self.omic_df,
+            )
 
         engine.separate_triggers()
 
         self.separated_triggers = engine.return_separated_triggers()
 
+    def _run_stage(
+            self,
+            stage: str,
+            compute: Callable[[], Dict[str, Optional[pd.DataFrame]]],
+            params: Dict[str, object],
+            upstream: Sequence[Optional[str]] = (),
+            files: Sequence[Optional[str | Path]] = (),
+            rows_in: Optional[int] = None,
+        ) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Run a stage, or restore its output from `stage_cache`, and record its key and metrics.
+        """
+        with instrumentation.stage(stage, rows_in=rows_in, ifo=self.ifo) as rec:
+            if self.stage_cache is None:
+                frames = compute()
+            else:
+                key = self.stage_cache.key(stage, {'ifo': self.ifo, **params}, upstream=upstream, files=files)
+                self.stage_keys[stage] = key
+                frames = self.stage_cache.fetch(stage, key, compute, ifo=self.ifo)
+
+            rec.rows_out = sum(len(df) for df in frames.values() if df is not None)
+
+        return frames
+
+    def run(self) -> None:
+        """
+        Execute the pipeline: load data, perform overlap analysis, and separate triggers.
+
+        With a `stage_cache`, trigger loading, catalog loading, overlap
+        finding and separation are each restored from a checkpoint when
+        their inputs and parameters are unchanged.
+        """
+        def load_triggers():
+            self.load_pipeline_triggers()
+            return {'pipeline_df': self.pipeline_df}
+
+        def load_omicron():
+            self.load_omicron_triggers()
+            return {'omic_df': self.omic_df}
+
+        def load_gspy():
+            self.load_gspy_triggers()
+            return {'gspy_df': self.gspy_df}
+
+        def overlaps():
+            self.find_overlaps()
+            return {
+                'overlap_df': self.overlap_df,
+                'timeslide_overlaps': self.timeslide_overlaps,
+                'timeslide_summary': self.timeslide_summary,
+            }
+
+        def separate():
+            self.separate_triggers()
+            return self.separated_triggers
+
+        segments = {'segments': self.segments}
+
+        self.pipeline_df = self._run_stage(
+                'triggers', load_triggers, segments, files=[self.pipeline_trigger_path])['pipeline_df']
+
+        # in-memory index labels never reach the outputs; this id does, so per-trigger
+        # tables such as time-slide overlaps can be joined back to the written triggers
+        self.pipeline_df['trigger_id'] = np.arange(len(self.pipeline_df), dtype=np.int64)
+
+        if self.omicron_enabled:
+            self.omic_df = self._run_stage(
+                    'omicron', load_omicron, segments,
+                    upstream=[self.stage_keys.get('triggers')], files=[self.omicron_path])['omic_df']
+
+        if self.gspy_enabled:
+            self.gspy_df = self._run_stage(
+                    'gspy', load_gspy, segments,
+                    upstream=[self.stage_keys.get('omicron')], files=[self.gspy_source])['gspy_df']
+
+        if self.cluster_window:
+            with instrumentation.stage('cluster', rows_in=len(self.pipeline_df), ifo=self.ifo) as rec:
+                self.cluster_pipeline_triggers()
+                rec.rows_out = len(self.pipeline_df)
+
+        if self.context_windows:
+            with instrumentation.stage('context', rows_in=len(self.pipeline_df), ifo=self.ifo) as rec:
+                self.add_context_features()
+                rec.rows_out = len(self.pipeline_df)
+
+        upstream = [self.stage_keys.get(stage) for stage in ('triggers', 'omicron', 'gspy')]
+        frames = self._run_stage(
+                'overlap',
+                overlaps,
+                {
+                    'cluster': [self.cluster_window, self.cluster_bin_param, self.cluster_n_bins],
+                    'context_windows': self.context_windows,
+                    'paddings': self.paddings,
+                    'timeslides': self.timeslides.get(self.ifo) if self.timeslides else None,
+                },
+                upstream=upstream,
+                rows_in=len(self.pipeline_df),
+            )
+
+        self.overlap_df = frames['overlap_df']
+        self.timeslide_overlaps = frames['timeslide_overlaps']
+        self.timeslide_summary = frames['timeslide_summary']
+
+        self.separated_triggers = self._run_stage(
+                'separation', separate, {}, upstream=[self.stage_keys.get('overlap')], rows_in=len(self.overlap_df))
+
     def write_output(self, separated_triggers: Optional[Dict[str, pd.DataFrame]] = None) -> None:
         """
-        Write separated trigger DataFrames (clean/dirty/other) to CSV files.
+        Write separated trigger DataFrames (clean/dirty/other) in `output_format`.
+
+        Parquet and Arrow outputs keep overlap id lists as list columns.
 
         Args:
             separated_triggers (dict, optional): Optional dictionary of categorized triggers.
@@ -131,7 +358,26 @@ class OverlapPipeline:
             separated_triggers = self.separated_triggers
 
         for key, df in separated_triggers.items():
-            df.to_csv(
-                    f"{self.output_dir}/{self.ifo}_{key}.csv",
-                    index=False,
+            TIO.write(df, f"{self.output_dir}/{self.ifo}_{key}", fmt=self.output_format)
+
+        if self.timeslide_overlaps is not None:
+            TIO.write(
+                    self.timeslide_overlaps,
+                    f"{self.output_dir}/{self.ifo}_timeslide_overlaps",
+                    fmt=self.output_format,
+                    sort_column=None,
+                )
+            TIO.write(
+                    self.timeslide_summary,
+                    f"{self.output_dir}/{self.ifo}_timeslide_summary",
+                    fmt=self.output_format,
+                    sort_column=None,
+                )
+
+        if self.cluster_engine is not None:
+            TIO.write(
+                    self.cluster_engine.return_provenance(),
+                    f"{self.output_dir}/{self.ifo}_cluster_provenance",
+                    fmt=self.output_format,
+                    sort_column=None,
                 )
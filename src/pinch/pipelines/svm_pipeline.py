@@ -1,16 +1,49 @@
 #!/usr/bin/env python3
 
 import os
+import numpy as np
 import pandas as pd
 
-from typing import Optional, Union
+from typing import Optional, Union, List
 from pathlib import Path
 import logging
 
 from pinch.models.one_class_svm import SVMClassifier
+from pinch.models.partitioned_svm import PartitionedSVMClassifier, load_svm_model
+from pinch.models.incremental_svm import IncrementalSVMClassifier
+from pinch.models.hyperparameter_sweep import HyperparameterSweep
+from pinch.models.model_cache import ModelCache
+from pinch.models.features import build_feature_matrix
+from pinch.utils.trigger_io import TIO, BatchWriter
+from pinch.utils import instrumentation
 
 logger = logging.getLogger(__name__)
 
+# placeholder substituted with the IFO in per-IFO model paths
+IFO_PLACEHOLDER = '{ifo}'
+
+
+def ifo_model_path(model_path: str | Path, ifo: str) -> str:
+    """
+    Return the model path of one IFO, so IFOs trained in one run never share a model file.
+
+    `{ifo}` in the path is replaced with the IFO; otherwise the IFO is
+    prefixed to the file name, e.g. `models/H1_trained_svm.pkl`.
+
+    Args:
+        model_path (str): Model path given on the command line.
+        ifo (str): Interferometer the model belongs to.
+
+    Returns:
+        str: Model path of `ifo`.
+    """
+    model_path = str(model_path)
+
+    if IFO_PLACEHOLDER in model_path:
+        return model_path.replace(IFO_PLACEHOLDER, ifo)
+
+    return os.path.join(os.path.dirname(model_path), f"{ifo}_{os.path.basename(model_path)}")
+
 
 class SVMPipeline:
     """
@@ -21,10 +54,31 @@ class SVMPipeline:
         - "score": Apply a trained model to dirty triggers.
         - "train_and_score": Train a model and immediately apply it.
 
+    For online runs, `update` feeds clean triggers batch by batch to an
+    `IncrementalSVMClassifier` instead of training once with `train`.
+
     Attributes:
-        trainer (SVMClassifier or None): The trained SVM model.
+        trainer (SVMClassifier, PartitionedSVMClassifier, EnsembleScorer or None): The trained SVM model(s).
         clean_df (pd.DataFrame or None): Clean glitch triggers for training.
         dirty_df (pd.DataFrame or None): Dirty glitch triggers for scoring.
+        cutoff_params (list[str] or None): Feature columns used by the SVM; defaults to the classifier's.
+        model_type (str): "exact" RBF OneClassSVM on a sample, or "approx" kernel-approximated SGD model on all rows.
+        nu (float): OneClassSVM `nu`, the upper bound on the fraction of training outliers.
+        gamma (str or float): RBF kernel width.
+        n_jobs (int): Worker processes used to score dirty triggers.
+        score_grid (bool): Precompute a 2-D score lookup grid after training and score by interpolation.
+        compress_ratio (float or None): If set, reduce the support vectors to this fraction after training.
+        compression_report (dict or None): Hold-out error report of the support vector reduction.
+        partition_param (str or None): If set, train one model per quantile bin of this template parameter.
+        n_partitions (int): Number of bins of `partition_param`.
+        random_state (int or None): Seed for training-set sampling.
+        model_cache (ModelCache or None): Cache of trained models keyed by training inputs.
+        sweep_results (pd.DataFrame or None): Per-configuration metrics of the last `sweep`.
+        output_format (str): 'csv', 'parquet' or 'arrow' for scored output.
+        ifo (str or None): Interferometer of the triggers; scored output is then `<ifo>_scored_df`.
+        reservoir_size (int): Recent clean triggers kept by the incremental model.
+        drift_threshold (float): Drift at which the incremental model is updated.
+        incremental_model (IncrementalSVMClassifier or None): Online model fed by `update`.
         scored_df (pd.DataFrame or None): Scored triggers after evaluation.
     """
     def __init__(
@@ -34,18 +88,53 @@ class SVMPipeline:
             trainer: Optional[SVMClassifier] = None,
             model_path: Optional[str | Path] = None,
             output_path: Optional[str | Path] = None,
+            cutoff_params: Optional[List[str]] = None,
+            model_type: str = 'exact',
+            nu: float = 0.01,
+            gamma: Union[str, float] = 'scale',
+            n_jobs: int = 1,
+            score_grid: bool = False,
+            compress_ratio: Optional[float] = None,
+            partition_param: Optional[str] = None,
+            n_partitions: int = 4,
+            random_state: Optional[int] = None,
+            model_cache: Optional[ModelCache] = None,
+            output_format: str = 'csv',
+            ifo: Optional[str] = None,
+            reservoir_size: int = 100000,
+            drift_threshold: float = 0.1,
     ) -> None:
         self.clean_df = clean_df
         self.dirty_df = dirty_df
+        self.cutoff_params = cutoff_params
+        self.model_type = model_type
+        self.nu = nu
+        self.gamma = gamma
+        self.n_jobs = n_jobs
+        self.score_grid = score_grid
+        self.compress_ratio = compress_ratio
+        self.compression_report = None
+        self.partition_param = partition_param
+        self.n_partitions = n_partitions
+        self.random_state = random_state
+        self.model_cache = model_cache
+        self.sweep_results = None
         self.trainer = trainer
         self.model_path = model_path
         self.output_path = output_path
+        self.output_format = output_format
+        self.ifo = ifo
+        self.reservoir_size = reservoir_size
+        self.drift_threshold = drift_threshold
+        self.incremental_model = None
         self.scored_df = None
 
     def train(self, save_model: bool = False) -> None:
         """
         Train a one-class SVM model on clean data.
 
+        If a model cache is set and holds a model trained on the same clean
+        features with the same parameters, that model is loaded instead.
         Optionally saves the trained model to a file.
         """
         if self.clean_df is None:
@@ -53,7 +142,17 @@ class SVMPipeline:
             logger.error(msg)
             raise ValueError(msg)
 
-        self.trainer = SVMClassifier.train_from_data(self.clean_df)
+        with instrumentation.stage('svm.train', rows_in=len(self.clean_df)):
+            if self.model_cache is None:
+                self._train_model()
+
+            else:
+                cache_key = self._cache_key()
+                self.trainer = self.model_cache.get(cache_key, self._load_model)
+
+                if self.trainer is None:
+                    self._train_model()
+                    self.model_cache.put(cache_key, self.trainer.save_model)
 
         if save_model:
             if not self.model_path:
@@ -61,9 +160,190 @@ class SVMPipeline:
                 logger.error(msg)
                 raise ValueError(msg)
 
-            os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
             self.trainer.save_model(self.model_path)
 
+    def update(self, clean_df: pd.DataFrame) -> str:
+        """
+        Feed a batch of clean triggers to the incremental model.
+
+        The first call creates an `IncrementalSVMClassifier`, which fits once
+        enough triggers have arrived and afterwards refits or warm-updates
+        only when the clean distribution drifts. Once fit, its model is the
+        pipeline's trainer, so `evaluate` scores with the current model.
+
+        Args:
+            clean_df (pd.DataFrame): New clean triggers.
+
+        Returns:
+            str: The action taken: 'wait', 'skip', 'fit', 'refit' or 'warm_update'.
+        """
+        if self.incremental_model is None:
+            if self.partition_param:
+                logger.warning("Incremental training fits a single model; partitioning is ignored")
+
+            self.incremental_model = IncrementalSVMClassifier(
+                    cutoff_params=self.cutoff_params,
+                    reservoir_size=self.reservoir_size,
+                    drift_threshold=self.drift_threshold,
+                    model_type=self.model_type,
+                    nu=self.nu,
+                    gamma=self.gamma,
+                    random_state=self.random_state,
+                )
+
+        with instrumentation.stage('svm.update', rows_in=len(clean_df)):
+            action = self.incremental_model.update(clean_df)
+
+        if self.incremental_model.classifier.model is not None:
+            self.trainer = self.incremental_model.classifier
+
+        return action
+
+    def _train_model(self) -> None:
+        if self.partition_param:
+            self.trainer = PartitionedSVMClassifier.train_from_data(
+                    self.clean_df,
+                    bin_param=self.partition_param,
+                    n_bins=self.n_partitions,
+                    cutoff_params=self.cutoff_params,
+                    model_type=self.model_type,
+                    n_jobs=self.n_jobs,
+                    random_state=self.random_state,
+                )
+
+        else:
+            self.trainer = SVMClassifier.train_from_data(
+                    self.clean_df,
+                    cutoff_params=self.cutoff_params,
+                    model_type=self.model_type,
+                    nu=self.nu,
+                    gamma=self.gamma,
+                    random_state=self.random_state,
+                )
+
+        if self.partition_param and (self.compress_ratio or self.score_grid):
+            logger.warning("Support vector compression and score grids are not applied to partitioned models")
+
+        elif self.compress_ratio:
+            self.compression_report = self.trainer.compress_model(self.clean_df, ratio=self.compress_ratio)
+
+        if self.score_grid and not self.partition_param:
+            self.trainer.build_score_grid(self.clean_df)
+
+    def _cache_key(self) -> str:
+        features = SVMClassifier(cutoff_params=self.cutoff_params)
+        columns = list(features.cutoff_params)
+
+        if self.partition_param:
+            columns.append(self.partition_param)
+
+        params = {
+            'cutoff_params': features.cutoff_params,
+            'model_type': self.model_type,
+            'nu': self.nu,
+            'gamma': self.gamma,
+            'random_state': self.random_state,
+            'score_grid': self.score_grid,
+            'compress_ratio': self.compress_ratio,
+            'partition_param': self.partition_param,
+            'n_partitions': self.n_partitions,
+        }
+
+        return ModelCache.fingerprint(build_feature_matrix(self.clean_df, columns), params)
+
+    def _load_model(self, path: str | Path) -> Union[SVMClassifier, PartitionedSVMClassifier]:
+        # the artifact records whether it is partitioned; no partition options are needed to load it
+        return load_svm_model(path, cutoff_params=self.cutoff_params)
+
+    def sweep(
+            self,
+            nu_grid: List[float],
+            gamma_grid: Optional[List[Union[str, float]]] = None,
+            n_samples: int = 10000,
+            holdout_fraction: float = 0.2,
+            max_dirty: int = 50000,
+            random_state: Optional[int] = None,
+            save_model: bool = False,
+        ) -> pd.DataFrame:
+        """
+        Train exact models over a grid of `nu` and `gamma` and keep the best.
+
+        Clean triggers are split into a training sample and a held-out set. The
+        scaler is fit once on the training sample, and the training, held-out
+        clean and (up to `max_dirty`) dirty features are scaled once and shared
+        by every fit of the sweep. The best configuration by dirty-vs-clean AUC
+        becomes the pipeline's trainer and is calibrated on the full clean set.
+
+        Args:
+            nu_grid (list[float]): Values of `nu` to try.
+            gamma_grid (list[str or float], optional): Values of `gamma`; defaults to ['scale'].
+            n_samples (int): Size of the clean training sample.
+            holdout_fraction (float): Fraction of clean triggers held out for evaluation.
+            max_dirty (int): Maximum number of dirty triggers used for evaluation.
+            random_state (int, optional): Seed for the train/holdout split.
+            save_model (bool): Save the best model to `model_path`.
+
+        Returns:
+            pd.DataFrame: Per-configuration metrics sorted best first.
+
+        Raises:
+            ValueError: If clean or dirty triggers are missing.
+        """
+        from sklearn.preprocessing import StandardScaler
+
+        if self.clean_df is None or self.dirty_df is None:
+            msg = "Hyperparameter sweep needs both clean and dirty dataframes"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        if self.partition_param or self.model_type != 'exact':
+            logger.warning("Hyperparameter sweep trains a single exact model; partitioning and approx mode are ignored")
+
+        features = SVMClassifier(cutoff_params=self.cutoff_params)
+        clean = features.feature_matrix(self.clean_df)
+        dirty = features.feature_matrix(self.dirty_df)
+
+        rng = np.random.default_rng(random_state)
+        order = rng.permutation(len(clean))
+        n_holdout = int(len(clean) * holdout_fraction)
+
+        train = clean[order[n_holdout:][:n_samples]]
+        clean_holdout = clean[order[:n_holdout]]
+
+        if len(dirty) > max_dirty:
+            dirty = dirty[rng.choice(len(dirty), size=max_dirty, replace=False)]
+
+        scaler = StandardScaler().fit(train)
+
+        search = HyperparameterSweep(nu_grid, gamma_grid or ['scale'], n_jobs=self.n_jobs)
+
+        with instrumentation.stage('svm.sweep', rows_in=len(train)) as rec:
+            self.sweep_results = search.run(
+                    scaler.transform(train),
+                    scaler.transform(clean_holdout),
+                    scaler.transform(dirty),
+                )
+            rec.rows_out = len(self.sweep_results)
+
+        self.trainer = SVMClassifier(
+                cutoff_params=features.cutoff_params,
+                model=search.best_model,
+                scaler=scaler,
+                random_state=random_state,
+                **search.best_params(),
+            )
+        self.trainer.calibrate(self.clean_df)
+
+        if save_model:
+            if not self.model_path:
+                msg = "No model_path specified to save the model"
+                logger.error(msg)
+                raise ValueError(msg)
+
+            self.trainer.save_model(self.model_path)
+
+        return self.sweep_results
+
     def evaluate(self) -> pd.DataFrame:
         """
         Score dirty triggers using the trained SVM model.
@@ -82,14 +362,72 @@ class SVMPipeline:
                 logger.error(msg)
                 raise ValueError(msg)
 
-            self.trainer = SVMClassifier.load_model(self.model_path)
+            self.trainer = self._load_model(self.model_path)
+
+        self.trainer.n_jobs = self.n_jobs
 
-        scored_df = self.trainer.evaluate(self.dirty_df)
+        with instrumentation.stage('svm.evaluate', rows_in=len(self.dirty_df)) as rec:
+            scored_df = self.trainer.evaluate(self.dirty_df)
+            rec.rows_out = len(scored_df)
 
         self.scored_df = scored_df
 
         return self.scored_df
 
+    def evaluate_stream(self, input_path: str | Path, batch_size: int = 100000) -> int:
+        """
+        Score triggers batch by batch and append each scored batch to the output of its IFO.
+
+        Memory use is bounded by `batch_size` rather than the input size, and
+        output is written as soon as the first batch is scored, as CSV rows,
+        Parquet row groups or Arrow record batches per `output_format`. Each
+        batch is split by IFO. Without a preset trainer, every IFO is scored
+        with its own model at `ifo_model_path(model_path, ifo)`, and each IFO's
+        rows go to `<ifo>_scored_df`.
+
+        Args:
+            input_path (str): CSV/Parquet file or directory of dirty triggers.
+            batch_size (int): Rows read and scored per batch.
+
+        Returns:
+            int: Number of triggers scored.
+
+        Raises:
+            ValueError: If no model or output path is available.
+        """
+        if self.trainer is None and not self.model_path:
+            msg = "No model speficied for evaluation"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        if not self.output_path:
+            msg = "No output_path specified to save scored data"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        os.makedirs(self.output_path, exist_ok=True)
+        trainers = {}
+        writers = {}
+
+        try:
+            for batch in TIO.iter_batches(input_path, batch_size=batch_size):
+                for ifo, ifo_batch in TIO.separate_by_ifo(batch).items():
+                    if ifo not in writers:
+                        trainers[ifo] = self.trainer if self.trainer is not None else self._load_model(ifo_model_path(self.model_path, ifo))
+                        trainers[ifo].n_jobs = self.n_jobs
+                        writers[ifo] = BatchWriter(f"{self.output_path}/{ifo}_scored_df", fmt=self.output_format)
+
+                    with instrumentation.stage('svm.evaluate_batch', rows_in=len(ifo_batch), ifo=ifo) as rec:
+                        writers[ifo].write(trainers[ifo].evaluate(ifo_batch))
+                        rec.rows_out = len(ifo_batch)
+
+                logger.info(f"Scored {sum(writer.n_rows for writer in writers.values())} triggers")
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        return sum(writer.n_rows for writer in writers.values())
+
     def save_scored_data(self) -> None:
         """
         Save scored dirty triggers to the specified output path.
@@ -107,13 +445,18 @@ class SVMPipeline:
             logger.error(msg)
             raise ValueError(msg)
 
-        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
-        self._write_scored_df(self.scored_df, self.output_path)
+        os.makedirs(self.output_path, exist_ok=True)
+
+        with instrumentation.stage('svm.write', rows_in=len(self.scored_df)):
+            self._write_scored_df(self.scored_df, self.output_path)
 
     @staticmethod
     def _load_trigger_file(path: str | Path) -> None:
-        return pd.read_csv(path)
+        return TIO.read_table(path)
 
-    @staticmethod
-    def _write_scored_df(df, path: str | Path) -> None:
-        df.to_csv(f"{path}/scored_df.csv", index=False)
+    def _write_scored_df(self, df, path: str | Path) -> None:
+        TIO.write(df, self._scored_path_base(path), fmt=self.output_format)
+
+    def _scored_path_base(self, path: str | Path) -> str:
+        # one file per IFO when several IFOs are scored into the same directory
+        return f"{path}/{self.ifo}_scored_df" if self.ifo else f"{path}/scored_df"
@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 
+import os
 import argparse
 import logging
 
-from pinch.pipelines.svm_pipeline import SVMPipeline
+import pandas as pd
+
+from pinch.pipelines.svm_pipeline import SVMPipeline, ifo_model_path
+from pinch.models.one_class_svm import parse_gamma
+from pinch.models.model_cache import ModelCache
+from pinch.models.ensemble import EnsembleScorer
 from pinch.utils.trigger_io import TIO
+from pinch.utils import instrumentation
 
 logger = logging.getLogger(__name__)
 
@@ -22,23 +29,69 @@ def parse_args():
     train_parser = subparsers.add_parser("train", help="Train an SVM model on clean triggers")
     train_parser.add_argument("--clean-triggers", required=True)
     train_parser.add_argument("--save-model", action="store_true")
-    train_parser.add_argument("--model-path", default="trained_svm.pkl")
+    train_parser.add_argument("--model-path", default="trained_svm.pkl", help="Models are saved per IFO as <IFO>_<name>, or with {ifo} replaced")
+    train_parser.add_argument("--model-type", choices=["exact", "approx"], default="exact")
+    train_parser.add_argument("--nu", type=float, default=0.01)
+    train_parser.add_argument("--gamma", type=parse_gamma, default="scale")
+    train_parser.add_argument("--score-grid", action="store_true")
+    train_parser.add_argument("--compress-svs", type=float)
+    train_parser.add_argument("--partition-param")
+    train_parser.add_argument("--n-partitions", type=int, default=4)
+    train_parser.add_argument("--random-state", type=int)
+    train_parser.add_argument("--model-cache-dir")
+    train_parser.add_argument("--model-cache-max-mb", type=float, default=1024)
 
     # --- SCORE MODE ---
     score_parser = subparsers.add_parser("score", help="Score dirty triggers using trained model")
     score_parser.add_argument("--dirty-triggers", required=True)
-    score_parser.add_argument("--model-path", required=True)
+    score_parser.add_argument("--model-path", help="Each IFO is scored with its own model, <IFO>_<name> or with {ifo} replaced")
+    score_parser.add_argument("--ensemble-models", nargs="+", help="Score against several models, as NAME=PATH")
+    score_parser.add_argument("--aggregates", nargs="+", default=["min", "mean", "max"])
     score_parser.add_argument("--output-path", required=True)
+    score_parser.add_argument("--output-format", choices=["csv", "parquet", "arrow"], default="csv")
+    score_parser.add_argument("--n-jobs", type=int, default=1)
+    score_parser.add_argument("--stream", action="store_true")
+    score_parser.add_argument("--batch-size", type=int, default=100000)
 
     # --- TRAIN AND SCORE MODE ---
     both_parser = subparsers.add_parser("train_and_score", help="Train and immediately score triggers")
     both_parser.add_argument("--clean-triggers", required=True)
     both_parser.add_argument("--dirty-triggers", required=True)
     both_parser.add_argument("--output-path", required=True)
+    both_parser.add_argument("--output-format", choices=["csv", "parquet", "arrow"], default="csv")
     both_parser.add_argument("--save-model", action="store_true")
-    both_parser.add_argument("--model-path", default="trained_svm.pkl")
+    both_parser.add_argument("--model-path", default="trained_svm.pkl", help="Models are saved per IFO as <IFO>_<name>, or with {ifo} replaced")
+    both_parser.add_argument("--model-type", choices=["exact", "approx"], default="exact")
+    both_parser.add_argument("--nu", type=float, default=0.01)
+    both_parser.add_argument("--gamma", type=parse_gamma, default="scale")
+    both_parser.add_argument("--sweep-nu", type=float, nargs="+")
+    both_parser.add_argument("--sweep-gamma", type=parse_gamma, nargs="+")
+    both_parser.add_argument("--n-jobs", type=int, default=1)
+    both_parser.add_argument("--score-grid", action="store_true")
+    both_parser.add_argument("--compress-svs", type=float)
+    both_parser.add_argument("--partition-param")
+    both_parser.add_argument("--n-partitions", type=int, default=4)
+    both_parser.add_argument("--random-state", type=int)
+    both_parser.add_argument("--model-cache-dir")
+    both_parser.add_argument("--model-cache-max-mb", type=float, default=1024)
+
+    for mode_parser in (train_parser, both_parser):
+        mode_parser.add_argument("--incremental", action="store_true", help="Stream clean triggers in batches into an incremental model updated only on drift")
+        mode_parser.add_argument("--batch-size", type=int, default=100000, help="Clean triggers per incremental update")
+        mode_parser.add_argument("--reservoir-size", type=int, default=100000)
+        mode_parser.add_argument("--drift-threshold", type=float, default=0.1)
+        mode_parser.add_argument("--history-dir", help="Write each IFO's incremental update decisions here (train_and_score default: --output-path)")
+
+    for mode_parser in (train_parser, score_parser, both_parser):
+        mode_parser.add_argument("--metrics-dir", help="Write per-stage metrics.json and metrics.prom here")
+        mode_parser.add_argument("--profile", action="store_true", help="Also capture cProfile and tracemalloc per stage")
+
+    args = parser.parse_args()
 
-    return parser.parse_args()
+    if args.profile and not args.metrics_dir:
+        parser.error("--profile requires --metrics-dir")
+
+    return args
 
 
 def main():
@@ -49,36 +102,203 @@ def main():
 
     Modes:
         - train: Only train the model.
-        - score: Only evaluate triggers using a saved model.
+        - score: Only evaluate triggers using a saved model, or several with
+          --ensemble-models; with --stream, triggers are read, scored and
+          written in batches.
         - train_and_score: Train and immediately evaluate.
+
+    With --incremental, train and train_and_score stream the clean triggers
+    in batches into one incremental model per IFO.
     """
     args = parse_args()
+    recorder = None
+
+    if args.metrics_dir:
+        recorder = instrumentation.enable(profile=args.profile, profile_dir=f"{args.metrics_dir}/profiles")
+
+    try:
+        run_mode(args)
+    finally:
+        instrumentation.write_metrics(recorder, args.metrics_dir)
+
+
+def run_mode(args: argparse.Namespace) -> None:
+    """
+    Train and/or score according to `args.mode`.
+    """
+    if args.mode == "score":
+        trainer = None
+
+        if args.ensemble_models:
+            trainer = EnsembleScorer.from_paths(
+                    dict(pair.split("=", 1) for pair in args.ensemble_models),
+                    aggregates=args.aggregates,
+                )
+
+        elif not args.model_path:
+            msg = "score mode needs --model-path or --ensemble-models"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        if args.stream:
+            pipeline = SVMPipeline(
+                    trainer=trainer,
+                    model_path=args.model_path,
+                    output_path=args.output_path,
+                    output_format=args.output_format,
+                    n_jobs=args.n_jobs,
+                )
+            pipeline.evaluate_stream(args.dirty_triggers, batch_size=args.batch_size)
+            return
+
+        for ifo, dirty_df in TIO.read(args.dirty_triggers).items():
+            instrumentation.set_labels(ifo=ifo)
+
+            pipeline = SVMPipeline(
+                    dirty_df=dirty_df,
+                    trainer=trainer,
+                    model_path=ifo_model_path(args.model_path, ifo) if trainer is None else None,
+                    output_path=args.output_path,
+                    output_format=args.output_format,
+                    n_jobs=args.n_jobs,
+                    ifo=ifo,
+                )
+            pipeline.evaluate()
+            pipeline.save_scored_data()
+
+        return
+
+    if args.incremental:
+        run_incremental(args)
+        return
+
+    model_cache = None
+
+    if args.model_cache_dir:
+        model_cache = ModelCache(args.model_cache_dir, max_bytes=int(args.model_cache_max_mb * 1e6))
 
     clean_trigger_dict = TIO.read(args.clean_triggers)
+
+    if args.mode == "train":
+        for ifo, clean_df in clean_trigger_dict.items():
+            instrumentation.set_labels(ifo=ifo)
+            training_pipeline(args, ifo, clean_df, model_cache).train(save_model=args.save_model)
+
+        return
+
+    if args.mode != "train_and_score":
+        msg = f"Unsupported mode: {args.mode}"
+        logger.error(msg)
+        raise ValueError(msg)
+
     dirty_trigger_dict = TIO.read(args.dirty_triggers)
 
     assert set(clean_trigger_dict.keys()) == set(dirty_trigger_dict.keys()), "Mismatch in IFO keys"
 
-    for ifo in clean_trigger_dict.keys():
-        pipeline = SVMPipeline(
-                clean_df=clean_trigger_dict[ifo],
+    for ifo, clean_df in clean_trigger_dict.items():
+        instrumentation.set_labels(ifo=ifo)
+
+        pipeline = training_pipeline(
+                args,
+                ifo,
+                clean_df,
+                model_cache,
                 dirty_df=dirty_trigger_dict[ifo],
                 output_path=args.output_path,
+                output_format=args.output_format,
+                n_jobs=args.n_jobs,
+                ifo=ifo,
             )
 
-        if args.mode == "train":
-            pipeline.train()
-        elif args.mode == "score":
-            pipeline.evaluate()
-        elif args.mode == "train_and_score":
-            pipeline.train()
-            pipeline.evaluate()
-            pipeline.save_scored_data()
+        if args.sweep_nu:
+            sweep_results = pipeline.sweep(args.sweep_nu, args.sweep_gamma, save_model=args.save_model)
+            sweep_results.to_csv(f"{args.output_path}/{ifo}_svm_sweep.csv", index=False)
         else:
-            msg = f"Unsupported mode: {args.mode}"
+            pipeline.train(save_model=args.save_model)
+
+        pipeline.evaluate()
+        pipeline.save_scored_data()
+
+
+def training_pipeline(
+        args: argparse.Namespace,
+        ifo: str,
+        clean_df: pd.DataFrame,
+        model_cache: ModelCache | None = None,
+        **pipeline_kwargs,
+    ) -> SVMPipeline:
+    """
+    Return an SVMPipeline configured from the train options for one IFO's clean triggers.
+
+    Extra keyword arguments (e.g. the dirty triggers and output options of
+    train_and_score) are passed to `SVMPipeline`.
+    """
+    return SVMPipeline(
+            clean_df=clean_df,
+            model_path=ifo_model_path(args.model_path, ifo),
+            model_type=args.model_type,
+            nu=args.nu,
+            gamma=args.gamma,
+            score_grid=args.score_grid,
+            compress_ratio=args.compress_svs,
+            partition_param=args.partition_param,
+            n_partitions=args.n_partitions,
+            random_state=args.random_state,
+            model_cache=model_cache,
+            **pipeline_kwargs,
+        )
+
+
+def run_incremental(args: argparse.Namespace) -> None:
+    """
+    Stream clean triggers into one incremental model per IFO, then save and/or score.
+    """
+    output_path = getattr(args, "output_path", None)
+    history_dir = args.history_dir or output_path
+    pipelines = {}
+
+    for batch in TIO.iter_batches(args.clean_triggers, batch_size=args.batch_size):
+        for ifo, clean_df in TIO.separate_by_ifo(batch).items():
+            if ifo not in pipelines:
+                pipelines[ifo] = SVMPipeline(
+                        output_path=output_path,
+                        model_path=ifo_model_path(args.model_path, ifo),
+                        model_type=args.model_type,
+                        nu=args.nu,
+                        gamma=args.gamma,
+                        random_state=args.random_state,
+                        output_format=getattr(args, "output_format", "csv"),
+                        n_jobs=getattr(args, "n_jobs", 1),
+                        reservoir_size=args.reservoir_size,
+                        drift_threshold=args.drift_threshold,
+                        ifo=ifo,
+                    )
+
+            instrumentation.set_labels(ifo=ifo)
+            pipelines[ifo].update(clean_df)
+
+    dirty_trigger_dict = TIO.read(args.dirty_triggers) if args.mode == "train_and_score" else {}
+
+    for ifo, pipeline in pipelines.items():
+        instrumentation.set_labels(ifo=ifo)
+
+        if history_dir:
+            os.makedirs(history_dir, exist_ok=True)
+            pipeline.incremental_model.return_history().to_csv(f"{history_dir}/{ifo}_incremental_history.csv", index=False)
+
+        if pipeline.trainer is None:
+            msg = f"{ifo}: only {pipeline.incremental_model.n_seen} clean triggers, too few to fit an incremental model"
             logger.error(msg)
             raise ValueError(msg)
 
+        if args.save_model:
+            pipeline.trainer.save_model(pipeline.model_path)
+
+        if args.mode == "train_and_score":
+            pipeline.dirty_df = dirty_trigger_dict[ifo]
+            pipeline.evaluate()
+            pipeline.save_scored_data()
+
 
 if __name__ == '__main__':
     main()
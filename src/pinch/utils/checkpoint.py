@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from pathlib import Path
+
+from pinch.utils.segments import SegmentList
+
+logger = logging.getLogger(__name__)
+
+# bump when the key recipe or storage layout changes so stale checkpoints are never matched
+CHECKPOINT_VERSION = 1
+
+META_FILE = '_meta.json'
+
+
+def _encode(value: object) -> object:
+    """
+    Make parameters JSON-hashable; arrays and segment lists are reduced to digests.
+    """
+    if isinstance(value, SegmentList):
+        return {'segments': _encode(np.concatenate([value.starts, value.ends]))}
+
+    if isinstance(value, np.ndarray):
+        return hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+
+    if isinstance(value, (np.integer, np.floating)):
+        return value.item()
+
+    return str(value)
+
+
+def file_fingerprint(path: str | Path) -> List[object]:
+    """
+    Return the name, size and modification time of a file, or of every file in a directory.
+
+    Stat data stands in for content so that fingerprinting a run's inputs
+    costs one `stat` per file instead of a full read.
+
+    Args:
+        path (str): File or directory.
+
+    Returns:
+        list: [name, size, mtime_ns] entries; empty if the path does not exist.
+    """
+    path = Path(path)
+
+    if path.is_dir():
+        files = sorted(p for p in path.iterdir() if p.is_file())
+    elif path.exists():
+        files = [path]
+    else:
+        return []
+
+    return [[str(p), p.stat().st_size, p.stat().st_mtime_ns] for p in files]
+
+
+def _is_list_column(series: pd.Series) -> bool:
+    if series.dtype != object:
+        return False
+
+    values = series.dropna()
+
+    return bool(len(values)) and isinstance(values.iloc[0], list)
+
+
+class StageCache:
+    """
+    Persist the outputs of pipeline stages so reruns skip completed work.
+
+    A stage's key is a SHA-256 hash of the stage name, its parameters, the
+    keys of the stages it consumes and the stat fingerprint of its input
+    files, so changing any of them invalidates that stage and everything
+    downstream of it while earlier stages are still reused.
+
+    Each stage output is a dict of DataFrames stored under
+    `<cache_dir>/<stage>/<key>/`: one Parquet file per frame, falling back to
+    pickle for frames Arrow cannot type or when pyarrow is missing. Lists in
+    object columns (overlap ids) are restored as lists. The metadata file is
+    written last and the directory is renamed into place, so an interrupted
+    write is never mistaken for a checkpoint.
+
+    With `resume` off, every stage is recomputed and its checkpoint
+    refreshed; with it on, existing checkpoints are loaded instead.
+
+    Attributes:
+        cache_dir (Path): Root directory of the checkpoints.
+        resume (bool): Load existing checkpoints instead of recomputing.
+        events (list[dict]): One record per stage fetched in this run.
+
+    Methods:
+        key(stage, params, upstream, files): Return the key of a stage.
+        fetch(stage, key, compute, ifo): Load a stage output, or compute and store it.
+        return_report(): Return this run's hit/miss record.
+        inventory(): Return every checkpoint on disk.
+    """
+    def __init__(self, cache_dir: str | Path, resume: bool = True) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.resume = resume
+        self.events = []
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(
+            self,
+            stage: str,
+            params: Dict[str, object],
+            upstream: Sequence[Optional[str]] = (),
+            files: Iterable[Optional[str | Path]] = (),
+        ) -> str:
+        """
+        Hash a stage's parameters, upstream stage keys and input files.
+
+        Args:
+            stage (str): Stage name.
+            params (dict): Parameters of the stage; arrays and segment lists are digested.
+            upstream (sequence[str]): Keys of the stages whose outputs this stage reads.
+            files (iterable[str]): Input files or directories read by the stage.
+
+        Returns:
+            str: Hex digest.
+        """
+        payload = {
+            'version': CHECKPOINT_VERSION,
+            'stage': stage,
+            'params': params,
+            'upstream': list(upstream),
+            'files': [file_fingerprint(path) for path in files if path is not None],
+        }
+
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=_encode).encode()).hexdigest()
+
+    def path(self, stage: str, key: str) -> Path:
+        """
+        Return the checkpoint directory of a stage key.
+        """
+        return self.cache_dir / stage / key
+
+    def fetch(
+            self,
+            stage: str,
+            key: str,
+            compute: Callable[[], Dict[str, Optional[pd.DataFrame]]],
+            ifo: Optional[str] = None,
+        ) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Load a stage's output, or compute and checkpoint it.
+
+        Args:
+            stage (str): Stage name.
+            key (str): Stage key from `key`.
+            compute (callable): Runs the stage and returns its frames by name (None allowed).
+            ifo (str, optional): IFO recorded in the report.
+
+        Returns:
+            dict: The stage's frames by name.
+        """
+        start = time.perf_counter()
+        path = self.path(stage, key)
+
+        if self.resume and (path / META_FILE).exists():
+            frames = self._load(path)
+            status = 'hit'
+            logger.info(f"Checkpoint hit: {stage} {ifo or ''} ({key[:12]})")
+        else:
+            frames = compute()
+            self._store(path, frames, stage, ifo)
+            status = 'miss' if self.resume else 'refreshed'
+            logger.info(f"Checkpoint {status}: {stage} {ifo or ''} ({key[:12]}), stored")
+
+        self.events.append({
+            'stage': stage,
+            'ifo': ifo,
+            'key': key[:12],
+            'status': status,
+            'rows': sum(len(df) for df in frames.values() if df is not None),
+            'seconds': time.perf_counter() - start,
+        })
+
+        return frames
+
+    def _store(self, path: Path, frames: Dict[str, Optional[pd.DataFrame]], stage: str, ifo: Optional[str]) -> None:
+        tmp_path = path.parent / f".{path.name}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        meta = {'stage': stage, 'ifo': ifo, 'created': time.time(), 'frames': {}}
+
+        for name, df in frames.items():
+            if df is None:
+                meta['frames'][name] = None
+                continue
+
+            list_columns = [str(c) for c in df.columns if _is_list_column(df[c])]
+            meta['frames'][name] = {'file': self._write_frame(df, tmp_path / name), 'list_columns': list_columns, 'rows': len(df)}
+
+        with open(tmp_path / META_FILE, 'w') as f:
+            json.dump(meta, f)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _write_frame(df: pd.DataFrame, path_base: Path) -> str:
+        try:
+            df.to_parquet(f"{path_base}.parquet", index=True)
+            return f"{path_base.name}.parquet"
+        except ImportError:
+            pass
+        except Exception as exc:
+            logger.debug(f"Checkpointing {path_base.name} as pickle: {exc}")
+
+        df.to_pickle(f"{path_base}.pkl")
+        return f"{path_base.name}.pkl"
+
+    @staticmethod
+    def _load(path: Path) -> Dict[str, Optional[pd.DataFrame]]:
+        with open(path / META_FILE) as f:
+            meta = json.load(f)
+
+        frames = {}
+
+        for name, info in meta['frames'].items():
+            if info is None:
+                frames[name] = None
+                continue
+
+            file = path / info['file']
+            df = pd.read_parquet(file) if file.suffix == '.parquet' else pd.read_pickle(file)
+
+            # Parquet returns list cells as arrays
+            for column in info['list_columns']:
+                df[column] = [v.tolist() if isinstance(v, np.ndarray) else v for v in df[column]]
+
+            frames[name] = df
+
+        return frames
+
+    def return_report(self) -> pd.DataFrame:
+        """
+        Return the stages fetched in this run and whether each was reused.
+
+        Returns:
+            pd.DataFrame: One row per fetch with stage, ifo, key, status, rows and seconds.
+        """
+        return pd.DataFrame(self.events, columns=['stage', 'ifo', 'key', 'status', 'rows', 'seconds'])
+
+    def inventory(self) -> pd.DataFrame:
+        """
+        Return every complete checkpoint on disk.
+
+        Returns:
+            pd.DataFrame: One row per checkpoint with stage, ifo, key, rows, size and creation time.
+        """
+        records = []
+
+        for meta_path in sorted(self.cache_dir.glob(f"*/*/{META_FILE}")):
+            with open(meta_path) as f:
+                meta = json.load(f)
+
+            records.append({
+                'stage': meta['stage'],
+                'ifo': meta['ifo'],
+                'key': meta_path.parent.name[:12],
+                'rows': sum(info['rows'] for info in meta['frames'].values() if info is not None),
+                'mb': sum(p.stat().st_size for p in meta_path.parent.iterdir()) / 1e6,
+                'created': pd.Timestamp(meta['created'], unit='s'),
+            })
+
+        return pd.DataFrame(records, columns=['stage', 'ifo', 'key', 'rows', 'mb', 'created'])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report the stage checkpoints in a checkpoint directory")
+    parser.add_argument('checkpoint_dir', type=str)
+    args = parser.parse_args()
+
+    inventory = StageCache(args.checkpoint_dir).inventory()
+
+    print(inventory.to_string(index=False) if len(inventory) else f"No checkpoints in {args.checkpoint_dir}")
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,7 @@
 import argparse
 import pandas as pd
 import logging
-from typing import Tuple
+from typing import List, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -19,6 +19,8 @@ class ChunkParse:
     Methods:
         parse_chunk_file(chunk, chunk_definition_file):
             Parses the given chunk from the definition file and returns its start and end times.
+        list_chunks(chunk_definition_file):
+            Returns every chunk in the definition file with its start and end times.
     """
 
     def parse_chunk_file(
@@ -69,6 +71,53 @@ class ChunkParse:
             end = df.iloc[int(chunk)-1]['end']
         return start, end
 
+    def list_chunks(self, chunk_definition_file: str | Path) -> List[Tuple[str, float, float]]:
+        """
+        Return every chunk defined in a chunk definition file.
+
+        Args:
+            chunk_definition_file (str): Path to the chunk definition file. Supported formats are `.txt` and `.csv`.
+
+        Returns:
+            list: (chunk, start, end) tuples in file order, with the chunk as a string.
+
+        Raises:
+            ValueError: If the file format is not supported.
+        """
+        chunk_definition_file = str(chunk_definition_file)
+
+        if chunk_definition_file.endswith('.txt'):
+            chunks = []
+            with open(chunk_definition_file, "r") as file:
+                for line in file:
+                    elements = line.split()
+
+                    if not elements or elements[0].startswith('#'):
+                        continue
+
+                    chunks.append((elements[0], float(elements[1]), float(elements[2])))
+
+        elif chunk_definition_file.endswith('.csv'):
+            df = pd.read_csv(
+                    chunk_definition_file,
+                    usecols=['chunk', 'start', 'end'],
+                    index_col=False
+                )
+
+            chunks = [
+                (str(chunk), float(start), float(end))
+                for chunk, start, end in zip(df['chunk'], df['start'], df['end'])
+            ]
+
+        else:
+            msg = f"Unsupported chunk definition file: {chunk_definition_file}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        logger.info(f"Read {len(chunks)} chunks from {chunk_definition_file}")
+
+        return chunks
+
 
 def main() -> None:
     parser = argparse.ArgumentParser()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+import time
+import pandas as pd
+import logging
+from typing import Dict, Optional
+from pathlib import Path
+
+from pinch.utils.trigger_io import CATEGORICAL_COLUMNS, _import_pyarrow, to_arrow_table
+
+logger = logging.getLogger(__name__)
+
+# bookkeeping table with one row per (table, ifo, chunk) written
+CHUNKS_TABLE = 'pinch_chunks'
+CHUNKS_SCHEMA = "(table_name VARCHAR, ifo VARCHAR, chunk VARCHAR, n_rows BIGINT, written_at TIMESTAMP)"
+
+# declared column types per table, so no table's schema depends on the data of its first chunk;
+# dirty and scored triggers have one row per overlapping glitch, with glitch_id a single id
+OVERLAP_COLUMN_TYPES = {'glitch_id': 'VARCHAR[]', 'omic_id': 'BIGINT[]'}
+GLITCH_COLUMN_TYPES = {
+    'glitch_id': 'VARCHAR',
+    'omic_id': 'BIGINT[]',
+    'trigger_group_id': 'BIGINT',
+    'ml_confidence': 'DOUBLE',
+}
+COLUMN_TYPES = {
+    'clean': OVERLAP_COLUMN_TYPES,
+    'other': OVERLAP_COLUMN_TYPES,
+    'dirty': GLITCH_COLUMN_TYPES,
+    'scored': GLITCH_COLUMN_TYPES,
+}
+
+
+def _quote(identifier: str) -> str:
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+class DuckDBSink:
+    """
+    Append clean, dirty and scored triggers to a DuckDB database.
+
+    Each call to `write_chunk` writes every table of one (ifo, chunk) inside
+    a single transaction: rows previously written for that key are deleted
+    and the new rows bulk inserted from an Arrow table, so re-running a chunk
+    replaces its rows instead of duplicating them, and a failed run leaves
+    the database unchanged.
+
+    Tables are named `<name>_triggers` and created on the first write with
+    an explicit column list. Labels, `ifo` and `chunk` are `VARCHAR`, and the
+    overlap columns of clean, dirty and scored triggers have the types in
+    `COLUMN_TYPES`, whatever the first chunk holds. Other columns are typed
+    from their data, all-null columns as `VARCHAR`. Columns first seen in a
+    later chunk are added to the table; columns missing from a chunk are
+    left NULL.
+
+    Attributes:
+        db_path (Path): Path of the DuckDB database file.
+        chunk_column (str): Column holding the chunk id.
+
+    Methods:
+        write_chunk(ifo, chunk, tables): Replace the rows of one (ifo, chunk) in every table.
+        written_chunks(): Return the bookkeeping record of written chunks.
+    """
+    def __init__(self, db_path: str | Path, chunk_column: str = 'chunk') -> None:
+        self.db_path = Path(db_path)
+        self.chunk_column = chunk_column
+
+    def _connect(self):
+        try:
+            import duckdb
+        except ImportError:
+            msg = "DuckDB output requires duckdb"
+            logger.error(msg)
+            raise ImportError(msg)
+
+        if self.db_path.parent != Path(''):
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        return duckdb.connect(str(self.db_path))
+
+    def _arrow_batch(self, df: pd.DataFrame, ifo: str, chunk: str):
+        # index columns from CSV round trips are not part of the schema
+        df = df.loc[:, ~df.columns.astype(str).str.startswith('Unnamed')]
+
+        pa = _import_pyarrow("DuckDB output")
+        table = to_arrow_table(df)
+
+        # labels are plain strings whatever the chunk holds: DuckDB maps Arrow dictionaries to
+        # ENUMs fixed at creation, and an all-null column would otherwise be typed from nothing
+        for i, field in enumerate(table.schema):
+            column = table.column(i)
+            all_null = len(table) > 0 and column.null_count == len(table)
+
+            if field.name in CATEGORICAL_COLUMNS or pa.types.is_null(field.type) or all_null:
+                table = table.set_column(i, field.name, column.cast(pa.string()))
+            elif pa.types.is_dictionary(field.type):
+                table = table.set_column(i, field.name, table.column(i).cast(field.type.value_type))
+
+        if 'ifo' not in table.column_names:
+            table = table.append_column('ifo', pa.array([ifo] * len(table), type=pa.string()))
+
+        if self.chunk_column in table.column_names:
+            table = table.drop([self.chunk_column])
+
+        return table.append_column(self.chunk_column, pa.array([chunk] * len(table), type=pa.string()))
+
+    def _column_types(self, con, name: str) -> Dict[str, str]:
+        # declared types first, the rest as DuckDB reads them from the registered batch
+        declared = {
+            **COLUMN_TYPES.get(name, {}),
+            **{column: 'VARCHAR' for column in CATEGORICAL_COLUMNS},
+            self.chunk_column: 'VARCHAR',
+        }
+
+        return {
+            column: declared.get(column, column_type)
+            for column, column_type, *_ in con.execute("DESCRIBE SELECT * FROM pinch_batch").fetchall()
+        }
+
+    def _write_table(self, con, name: str, batch, ifo: str, chunk: str) -> None:
+        table_name = f"{name}_triggers"
+        table = _quote(table_name)
+        con.register('pinch_batch', batch)
+
+        try:
+            exists = con.execute(
+                    "SELECT count(*) FROM information_schema.tables WHERE table_name = ?",
+                    [table_name],
+                ).fetchone()[0]
+            column_types = self._column_types(con, name)
+
+            if not exists:
+                definitions = ', '.join(f"{_quote(column)} {column_type}" for column, column_type in column_types.items())
+                con.execute(f"CREATE TABLE {table} ({definitions})")
+            else:
+                columns = {row[0] for row in con.execute(f"DESCRIBE {table}").fetchall()}
+
+                for column, column_type in column_types.items():
+                    if column not in columns:
+                        logger.info(f"Adding column {column} ({column_type}) to {table_name}")
+                        con.execute(f"ALTER TABLE {table} ADD COLUMN {_quote(column)} {column_type}")
+
+                con.execute(
+                        f"DELETE FROM {table} WHERE ifo = ? AND {_quote(self.chunk_column)} = ?",
+                        [ifo, chunk],
+                    )
+
+            con.execute(f"INSERT INTO {table} BY NAME SELECT * FROM pinch_batch")
+        finally:
+            con.unregister('pinch_batch')
+
+    def write_chunk(self, ifo: str, chunk: str | int, tables: Dict[str, Optional[pd.DataFrame]]) -> None:
+        """
+        Replace the rows of one (ifo, chunk) in every given table.
+
+        Args:
+            ifo (str): Interferometer of the rows.
+            chunk (str or int): Chunk id of the rows.
+            tables (dict): Triggers keyed by table name, e.g. clean, dirty, scored;
+                None entries are skipped.
+        """
+        chunk = str(chunk)
+        start = time.perf_counter()
+        batches = {
+            name: self._arrow_batch(df, ifo, chunk)
+            for name, df in tables.items()
+            if df is not None
+        }
+
+        con = self._connect()
+
+        try:
+            con.execute(f"CREATE TABLE IF NOT EXISTS {CHUNKS_TABLE} {CHUNKS_SCHEMA}")
+            con.execute("BEGIN TRANSACTION")
+
+            try:
+                for name, batch in batches.items():
+                    self._write_table(con, name, batch, ifo, chunk)
+
+                    con.execute(
+                            f"DELETE FROM {CHUNKS_TABLE} WHERE table_name = ? AND ifo = ? AND chunk = ?",
+                            [f"{name}_triggers", ifo, chunk],
+                        )
+                    con.execute(
+                            f"INSERT INTO {CHUNKS_TABLE} VALUES (?, ?, ?, ?, now())",
+                            [f"{name}_triggers", ifo, chunk, batch.num_rows],
+                        )
+
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+                logger.exception(f"DuckDB write of {ifo} chunk {chunk} failed, rolled back")
+                raise
+        finally:
+            con.close()
+
+        n_rows = {name: batch.num_rows for name, batch in batches.items()}
+        logger.info(f"Wrote {ifo} chunk {chunk} to {self.db_path}: {n_rows} in {time.perf_counter() - start:.2f} s")
+
+    def written_chunks(self) -> pd.DataFrame:
+        """
+        Return the bookkeeping record of written chunks.
+
+        Returns:
+            pd.DataFrame: One row per (table, ifo, chunk) with its row count and write time.
+        """
+        con = self._connect()
+
+        try:
+            con.execute(f"CREATE TABLE IF NOT EXISTS {CHUNKS_TABLE} {CHUNKS_SCHEMA}")
+            return con.execute(f"SELECT * FROM {CHUNKS_TABLE} ORDER BY table_name, ifo, chunk").fetchdf()
+        finally:
+            con.close()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import resource
+import logging
+from typing import Dict, List, Optional
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# the active recorder; None makes every `stage` a no-op
+_ACTIVE = None
+
+# metric name -> (record field, help text, aggregate over repeated stages)
+PROMETHEUS_METRICS = {
+    'pinch_stage_wall_seconds': ('wall_seconds', 'Wall time of a pipeline stage', sum),
+    'pinch_stage_cpu_seconds': ('cpu_seconds', 'CPU time of a pipeline stage, including reaped worker processes', sum),
+    'pinch_stage_peak_rss_bytes': ('peak_rss_bytes', 'Process peak resident set size at the end of a stage', max),
+    'pinch_stage_rows_in': ('rows_in', 'Rows entering a pipeline stage', sum),
+    'pinch_stage_rows_out': ('rows_out', 'Rows leaving a pipeline stage', sum),
+    'pinch_stage_bytes_read': ('bytes_read', 'Bytes read by a pipeline stage', sum),
+    'pinch_stage_calls': ('calls', 'Number of times a pipeline stage ran', sum),
+}
+
+
+def _peak_rss_bytes() -> int:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _children_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _bytes_read() -> Optional[int]:
+    # rchar counts every byte returned by read(), from disk, page cache or sockets
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+
+    return None
+
+
+class _NullStage:
+    """
+    Stand-in returned by `stage` while instrumentation is disabled.
+
+    Writes land on the instance like on a real `Stage`, so stage bodies may
+    read back what they set (e.g. `rec.bytes_read += size`) either way.
+    """
+    rows_in = None
+    rows_out = None
+    bytes_read = None
+
+    def __enter__(self) -> '_NullStage':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+class Stage:
+    """
+    Measurements of one run of a pipeline stage.
+
+    Created by `Instrumentation.stage`; callers may set `rows_in`,
+    `rows_out` and `bytes_read` inside the `with` block. `bytes_read`
+    defaults to the growth of the process's read byte counter.
+    """
+    def __init__(self, recorder: 'Instrumentation', name: str, labels: Dict[str, str], rows_in: Optional[int]) -> None:
+        self.recorder = recorder
+        self.name = name
+        self.labels = labels
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.bytes_read = None
+
+        self._profiler = None
+
+    def __enter__(self) -> 'Stage':
+        recorder = self.recorder
+
+        self.parent = recorder._stack[-1].name if recorder._stack else None
+        self.depth = len(recorder._stack)
+        recorder._stack.append(self)
+
+        if recorder.profile and self.depth == 0:
+            self._start_profile()
+
+        self._start_time = time.time()
+        self._start_read = _bytes_read()
+        self._start_rss = _peak_rss_bytes()
+        self._start_cpu = time.process_time()
+        self._start_children_cpu = _children_cpu_seconds()
+        self._start_wall = time.perf_counter()
+
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        wall = time.perf_counter() - self._start_wall
+        cpu = time.process_time() - self._start_cpu + _children_cpu_seconds() - self._start_children_cpu
+        end_read = _bytes_read()
+
+        if self.bytes_read is None and end_read is not None and self._start_read is not None:
+            self.bytes_read = end_read - self._start_read
+
+        peak_rss = _peak_rss_bytes()
+
+        record = {
+            'stage': self.name,
+            'parent': self.parent,
+            'depth': self.depth,
+            'labels': self.labels,
+            'start': self._start_time,
+            'wall_seconds': wall,
+            'cpu_seconds': cpu,
+            'peak_rss_bytes': peak_rss,
+            'rss_growth_bytes': peak_rss - self._start_rss,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'bytes_read': self.bytes_read,
+            'failed': exc_type is not None,
+        }
+
+        if self._profiler is not None:
+            record.update(self._stop_profile())
+
+        self.recorder._stack.pop()
+        self.recorder.records.append(record)
+
+        logger.debug(
+                f"Stage {self.name} {self.labels}: {wall:.2f} s wall, {cpu:.2f} s CPU, "
+                f"peak RSS {peak_rss / 1e6:.0f} MB, rows {self.rows_in} -> {self.rows_out}"
+            )
+
+    def _start_profile(self) -> None:
+        import cProfile
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.recorder.tracemalloc_frames)
+
+        tracemalloc.reset_peak()
+
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def _stop_profile(self) -> Dict[str, object]:
+        import tracemalloc
+
+        self._profiler.disable()
+
+        recorder = self.recorder
+        recorder._n_profiles += 1
+
+        label = '_'.join(str(v) for v in self.labels.values())
+        stem = f"{recorder._n_profiles:03d}_{self.name}{'_' + label if label else ''}"
+        os.makedirs(recorder.profile_dir, exist_ok=True)
+
+        profile_path = os.path.join(recorder.profile_dir, f"{stem}.prof")
+        self._profiler.dump_stats(profile_path)
+
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        snapshot_path = os.path.join(recorder.profile_dir, f"{stem}.tracemalloc.txt")
+
+        with open(snapshot_path, 'w') as f:
+            for stat in tracemalloc.take_snapshot().statistics('lineno')[:recorder.tracemalloc_top]:
+                f.write(f"{stat}\n")
+
+        return {'tracemalloc_peak_bytes': traced_peak, 'profile': profile_path, 'tracemalloc': snapshot_path}
+
+
+class Instrumentation:
+    """
+    Record wall time, CPU time, peak RSS, rows and bytes read per pipeline stage.
+
+    Code marks stages with the module-level `stage` context manager, which
+    reports to the active recorder. Stages nest: a stage opened inside
+    another records its parent and inherits its labels (e.g. the IFO). With
+    no active recorder `stage` returns a bare no-op object, so disabled
+    instrumentation costs one global lookup and one small allocation per stage.
+
+    With `profile`, every top-level stage also runs under cProfile and
+    tracemalloc; a `.prof` file and the top allocation sites are written to
+    `profile_dir` per stage. Profiling slows the run down considerably and is
+    meant for diagnosis only.
+
+    Attributes:
+        profile (bool): Capture cProfile and tracemalloc per top-level stage.
+        profile_dir (str or None): Directory of profile outputs.
+        records (list[dict]): One record per finished stage.
+        labels (dict): Labels applied to every top-level stage, set with `set_labels`.
+
+    Methods:
+        stage(name, rows_in, **labels): Context manager measuring one stage.
+        write_json(path): Write the records as JSON.
+        write_prometheus(path): Write aggregated metrics in Prometheus text format.
+    """
+    def __init__(
+            self,
+            profile: bool = False,
+            profile_dir: Optional[str | Path] = None,
+            tracemalloc_frames: int = 1,
+            tracemalloc_top: int = 25,
+        ) -> None:
+
+        if profile and profile_dir is None:
+            msg = "Profiling needs a profile_dir"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.profile = profile
+        self.profile_dir = None if profile_dir is None else str(profile_dir)
+        self.tracemalloc_frames = tracemalloc_frames
+        self.tracemalloc_top = tracemalloc_top
+        self.records = []
+        self.labels = {}
+
+        self._stack = []
+        self._n_profiles = 0
+        self._started = time.time()
+
+    def stage(self, name: str, rows_in: Optional[int] = None, **labels: str) -> Stage:
+        """
+        Return a context manager measuring one run of a stage.
+
+        Args:
+            name (str): Stage name, e.g. 'overlap' or 'svm.train'.
+            rows_in (int, optional): Rows entering the stage.
+            **labels: Extra labels such as `ifo`; nested stages inherit them.
+
+        Returns:
+            Stage: The stage measurement.
+        """
+        if self._stack:
+            labels = {**self._stack[-1].labels, **labels}
+        else:
+            labels = {**self.labels, **labels}
+
+        return Stage(self, name, {k: str(v) for k, v in labels.items()}, rows_in)
+
+    def write_json(self, path: str | Path) -> None:
+        """
+        Write every stage record, in completion order, as JSON.
+        """
+        payload = {
+            'run': {'started': self._started, 'argv': sys.argv, 'pid': os.getpid(), 'profile': self.profile},
+            'stages': self.records,
+        }
+
+        with open(path, 'w') as f:
+            json.dump(payload, f, indent=1)
+
+    def write_prometheus(self, path: str | Path) -> None:
+        """
+        Write per-stage metrics in the Prometheus text exposition format.
+
+        Repeated runs of a stage with the same labels (e.g. streamed batches)
+        are summed, except peak RSS which takes the maximum.
+        """
+        series = {}
+
+        for record in self.records:
+            key = (record['stage'], tuple(sorted(record['labels'].items())))
+            series.setdefault(key, []).append({**record, 'calls': 1})
+
+        lines = []
+
+        for metric, (field, help_text, aggregate) in PROMETHEUS_METRICS.items():
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+
+            for (name, labels), records in series.items():
+                values = [r[field] for r in records if r[field] is not None]
+
+                if not values:
+                    continue
+
+                label_text = ','.join(f'{k}="{v}"' for k, v in (('stage', name),) + labels)
+                lines.append(f"{metric}{{{label_text}}} {aggregate(values)}")
+
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+def enable(profile: bool = False, profile_dir: Optional[str | Path] = None) -> Instrumentation:
+    """
+    Install and return a new active recorder.
+    """
+    global _ACTIVE
+    _ACTIVE = Instrumentation(profile=profile, profile_dir=profile_dir)
+
+    return _ACTIVE
+
+
+def disable() -> Optional[Instrumentation]:
+    """
+    Remove and return the active recorder.
+    """
+    global _ACTIVE
+    recorder, _ACTIVE = _ACTIVE, None
+
+    return recorder
+
+
+def stage(name: str, rows_in: Optional[int] = None, **labels: str):
+    """
+    Measure a stage with the active recorder, or do nothing if none is active.
+
+    Example:
+        with stage('overlap', rows_in=len(df), ifo=ifo) as rec:
+            ...
+            rec.rows_out = len(result)
+    """
+    if _ACTIVE is None:
+        return _NullStage()
+
+    return _ACTIVE.stage(name, rows_in, **labels)
+
+
+def set_labels(**labels: str) -> None:
+    """
+    Label every following top-level stage of the active recorder, e.g. with the IFO being processed.
+    """
+    if _ACTIVE is not None:
+        _ACTIVE.labels = labels
+
+
+def write_metrics(recorder: Optional[Instrumentation], metrics_dir: str | Path, prefix: str = '') -> List[str]:
+    """
+    Write a recorder's records as `<prefix>metrics.json` and `<prefix>metrics.prom`.
+
+    Returns:
+        list[str]: The written paths.
+    """
+    if recorder is None:
+        return []
+
+    os.makedirs(metrics_dir, exist_ok=True)
+    json_path = os.path.join(str(metrics_dir), f"{prefix}metrics.json")
+    prom_path = os.path.join(str(metrics_dir), f"{prefix}metrics.prom")
+
+    recorder.write_json(json_path)
+    recorder.write_prometheus(prom_path)
+
+    logger.info(f"Wrote stage metrics to {json_path} and {prom_path}")
+
+    return [json_path, prom_path]
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import numpy as np
+import pandas as pd
+import logging
+from typing import Optional, Tuple, Union
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# LIGO T050017 file naming convention: <OBS>-<TAG>-<GPS START>-<DURATION>.<ext>
+T050017_PATTERN = re.compile(r'^[^-]+-[^-]+-(?P<start>\d+(\.\d+)?)-(?P<duration>\d+(\.\d+)?)\.[^.]+$')
+
+
+class SegmentList:
+    """
+    A sorted, coalesced list of half-open GPS time segments [start, end).
+
+    Segments are stored as two contiguous float64 arrays so that membership and
+    intersection queries can be answered for millions of times at once with
+    `np.searchsorted` instead of per-row loops.
+
+    Attributes:
+        starts (np.ndarray): Sorted segment start times.
+        ends (np.ndarray): Segment end times, aligned with `starts`.
+
+    Methods:
+        from_file(path): Read a segment list from a text or CSV file.
+        contains(times): Mask of times falling inside any segment.
+        intersects(tstart, tend): Mask of intervals overlapping any segment.
+        overlaps_range(start, end): Whether a single interval overlaps any segment.
+        restrict(start, end): Segments clipped to a time range.
+        extent(): Earliest start and latest end of the segment list.
+    """
+    def __init__(
+            self,
+            starts: np.ndarray,
+            ends: np.ndarray,
+        ) -> None:
+
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+
+        if starts.shape != ends.shape:
+            msg = "Segment start and end arrays must have the same shape"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        if np.any(ends < starts):
+            msg = "Segment end times must not precede start times"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.starts, self.ends = self.coalesce(starts, ends)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @staticmethod
+    def coalesce(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sort segments and merge any that overlap or touch.
+
+        Args:
+            starts (np.ndarray): Segment start times.
+            ends (np.ndarray): Segment end times.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Coalesced (starts, ends).
+        """
+        keep = ends > starts
+        starts, ends = starts[keep], ends[keep]
+
+        if not len(starts):
+            return starts, ends
+
+        order = np.argsort(starts, kind='stable')
+        starts, ends = starts[order], ends[order]
+
+        # a new segment begins wherever the start exceeds every end seen so far
+        running_end = np.maximum.accumulate(ends)
+        new_group = np.empty(len(starts), dtype=bool)
+        new_group[0] = True
+        new_group[1:] = starts[1:] > running_end[:-1]
+
+        group_starts = np.flatnonzero(new_group)
+        group_ends = np.append(group_starts[1:], len(starts)) - 1
+
+        return starts[group_starts], running_end[group_ends]
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> 'SegmentList':
+        """
+        Read a segment list file.
+
+        Supported formats are CSV files with `start` and `end` columns and
+        whitespace-delimited text files, either plain `start end` pairs or
+        segwizard `index start end duration` rows. Lines starting with `#`
+        are ignored.
+
+        Args:
+            path (str): Path to the segment list file.
+
+        Returns:
+            SegmentList: The coalesced segments.
+
+        Raises:
+            ValueError: If the file layout is not recognized.
+        """
+        path = str(path)
+
+        if path.endswith('.csv'):
+            df = pd.read_csv(path, usecols=['start', 'end'])
+            return cls(df['start'].values, df['end'].values)
+
+        data = np.loadtxt(path, comments='#', ndmin=2, dtype=np.float64)
+
+        if data.shape[1] == 2:
+            return cls(data[:, 0], data[:, 1])
+
+        if data.shape[1] == 4:
+            return cls(data[:, 1], data[:, 2])
+
+        msg = f"Unrecognized segment file layout with {data.shape[1]} columns: {path}"
+        logger.error(msg)
+        raise ValueError(msg)
+
+    def contains(self, times: np.ndarray) -> np.ndarray:
+        """
+        Return a mask of times that fall inside any segment.
+
+        Args:
+            times (array-like): GPS times.
+
+        Returns:
+            np.ndarray: Boolean mask aligned with `times`.
+        """
+        times = np.asarray(times, dtype=np.float64)
+        idx = np.searchsorted(self.starts, times, side='right') - 1
+        valid = idx >= 0
+
+        mask = np.zeros(times.shape, dtype=bool)
+        mask[valid] = times[valid] < self.ends[idx[valid]]
+
+        return mask
+
+    def intersects(self, tstart: np.ndarray, tend: np.ndarray) -> np.ndarray:
+        """
+        Return a mask of intervals [tstart, tend] that overlap any segment.
+
+        Args:
+            tstart (array-like): Interval start times.
+            tend (array-like): Interval end times.
+
+        Returns:
+            np.ndarray: Boolean mask aligned with the inputs.
+        """
+        tstart = np.asarray(tstart, dtype=np.float64)
+        tend = np.asarray(tend, dtype=np.float64)
+
+        # segments are disjoint and sorted, so the only candidate is the last
+        # segment starting at or before the interval end
+        idx = np.searchsorted(self.starts, tend, side='right') - 1
+        valid = idx >= 0
+
+        mask = np.zeros(tstart.shape, dtype=bool)
+        mask[valid] = self.ends[idx[valid]] > tstart[valid]
+
+        return mask
+
+    def overlaps_range(self, start: float, end: float) -> bool:
+        """
+        Return whether a single interval overlaps any segment.
+
+        Args:
+            start (float): Interval start time.
+            end (float): Interval end time.
+
+        Returns:
+            bool: True if the interval overlaps at least one segment.
+        """
+        return bool(self.intersects(np.array([start]), np.array([end]))[0])
+
+    def restrict(self, start: float, end: float) -> 'SegmentList':
+        """
+        Return the segments clipped to a time range.
+
+        Args:
+            start (float): Range start time.
+            end (float): Range end time.
+
+        Returns:
+            SegmentList: Segments intersected with [start, end).
+        """
+        return SegmentList(
+                np.clip(self.starts, start, end),
+                np.clip(self.ends, start, end),
+            )
+
+    def extent(self) -> Tuple[float, float]:
+        """
+        Return the earliest start and latest end of the segment list.
+
+        Returns:
+            tuple[float, float]: (start, end) of the segment list.
+
+        Raises:
+            ValueError: If the segment list is empty.
+        """
+        if not len(self):
+            msg = "Segment list is empty"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        return float(self.starts[0]), float(self.ends[-1])
+
+    def clip_window(self, start: float, end: float) -> Optional[Tuple[float, float]]:
+        """
+        Shrink a query window to the part covered by the segment list.
+
+        Args:
+            start (float): Window start time.
+            end (float): Window end time.
+
+        Returns:
+            tuple[float, float] or None: The clipped window, or None if the
+            window lies entirely outside the segments.
+        """
+        restricted = self.restrict(start, end)
+
+        if not len(restricted):
+            return None
+
+        return restricted.extent()
+
+
+def file_coverage(path: Union[str, Path]) -> Optional[Tuple[float, float]]:
+    """
+    Return the GPS coverage encoded in a T050017-style file name.
+
+    Args:
+        path (str): Path to a file named `<OBS>-<TAG>-<START>-<DURATION>.<ext>`.
+
+    Returns:
+        tuple[float, float] or None: (start, end) of the file, or None if the
+        name does not follow the convention.
+    """
+    match = T050017_PATTERN.match(os.path.basename(str(path)))
+
+    if not match:
+        return None
+
+    start = float(match.group('start'))
+
+    return start, start + float(match.group('duration'))
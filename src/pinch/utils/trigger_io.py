@@ -4,16 +4,93 @@ import os
 import numpy as np
 import pandas as pd
 import logging
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Iterator
 from collections import defaultdict
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# output format -> file extension
+FORMATS = {'csv': 'csv', 'parquet': 'parquet', 'arrow': 'arrow'}
+TABLE_EXTENSIONS = ('.csv', '.parquet', '.arrow', '.feather')
+
+# low-cardinality label columns stored dictionary-encoded
+CATEGORICAL_COLUMNS = ('ifo', 'ml_label', 'label')
+
+
+def _import_pyarrow(purpose: str):
+    try:
+        import pyarrow
+    except ImportError:
+        msg = f"{purpose} requires pyarrow"
+        logger.error(msg)
+        raise ImportError(msg)
+
+    return pyarrow
+
+
+def _list_type(column: str, pa):
+    """
+    Return the Arrow type of overlap id list columns (including `_pad` variants).
+    """
+    if column == 'glitch_id' or column.startswith('glitch_id_pad'):
+        return pa.list_(pa.string())
+
+    if column == 'omic_id' or column.startswith('omic_id_pad'):
+        return pa.list_(pa.int64())
+
+    return None
+
+
+def to_arrow_table(df: pd.DataFrame):
+    """
+    Convert triggers to an Arrow table with typed list and dictionary columns.
+
+    Overlap id columns become `list<string>` (Gravity Spy ids) and
+    `list<int64>` (Omicron row ids) so every output shares one schema, even
+    when a batch has no overlaps. Label columns in `CATEGORICAL_COLUMNS` are
+    dictionary-encoded. Other columns are typed by Arrow; a column it cannot
+    type (e.g. mixed objects) is stored as strings with a warning.
+
+    Args:
+        df (pd.DataFrame): Triggers.
+
+    Returns:
+        pyarrow.Table: The converted table.
+    """
+    pa = _import_pyarrow("Arrow output")
+    arrays = []
+
+    for column in df.columns:
+        series = df[column]
+
+        if column in CATEGORICAL_COLUMNS and pd.api.types.is_string_dtype(series.dtype):
+            series = series.astype('category')
+
+        arrow_type = _list_type(str(column), pa)
+        array = None
+
+        for candidate in ([arrow_type] if arrow_type is not None else []) + [None]:
+            try:
+                array = pa.array(series, type=candidate, from_pandas=True)
+                break
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                continue
+
+        if array is None:
+            logger.warning(f"Column {column} has mixed types, storing it as strings")
+            array = pa.array(series.astype(str), from_pandas=True)
+
+        arrays.append(array)
+
+    return pa.Table.from_arrays(arrays, names=[str(c) for c in df.columns])
+
 
 class TIO:
     def __init__(
             self,
-            input_path: Optional[str, Path] = None,
-            output_path: Optional[str, Path] = None,
+            input_path: Optional[str | Path] = None,
+            output_path: Optional[str | Path] = None,
     ) -> None:
         self.input_path = input_path
         self.output_path = output_path
@@ -76,12 +153,13 @@ class TIO:
         dfs = defaultdict(list)
 
         for file in os.listdir(path):
-            if file.endswith('.csv'):
+            if file.endswith(TABLE_EXTENSIONS):
                 full_path = os.path.join(path, file)
-                df = pd.read_csv(full_path)
+                df = cls.read_table(full_path)
 
-                for ifo in cls.determine_ifos(df):
-                    dfs[ifo].append(df)
+                # a file may hold several IFOs; each gets only its own rows
+                for ifo, ifo_df in cls.separate_by_ifo(df).items():
+                    dfs[ifo].append(ifo_df)
 
         for ifo in dfs.keys():
             dfs[ifo] = pd.concat(dfs[ifo], ignore_index=True)
@@ -90,6 +168,256 @@ class TIO:
 
     @classmethod
     def _read_file(cls, path: str | Path) -> Dict[str, pd.DataFrame]:
-        df = pd.read_csv(path)
+        df = cls.read_table(path)
 
         return cls.separate_by_ifo(df)
+
+    @staticmethod
+    def read_table(path: str | Path) -> pd.DataFrame:
+        """
+        Read one CSV, Parquet or Arrow IPC file, chosen by extension.
+
+        Args:
+            path (str): File path.
+
+        Returns:
+            pd.DataFrame: The triggers; list columns come back as arrays.
+        """
+        path = str(path)
+
+        if path.endswith('.parquet'):
+            _import_pyarrow(f"Reading {path}")
+            return pd.read_parquet(path)
+
+        if path.endswith(('.arrow', '.feather')):
+            _import_pyarrow(f"Reading {path}")
+            return pd.read_feather(path)
+
+        return pd.read_csv(path)
+
+    @staticmethod
+    def write(
+            df: pd.DataFrame,
+            path_base: str | Path,
+            fmt: str = 'csv',
+            sort_column: Optional[str] = 'tstart',
+            compression: str = 'zstd',
+            row_group_size: int = 131072,
+            **csv_kwargs,
+    ) -> str:
+        """
+        Write triggers as CSV, Parquet or Arrow IPC.
+
+        Parquet and Arrow outputs are sorted by `sort_column` so the per row
+        group min/max statistics on it let readers skip row groups by time,
+        keep overlap id lists as list columns and labels as dictionaries, and
+        are compressed with `compression`.
+
+        Args:
+            df (pd.DataFrame): Triggers to write.
+            path_base (str): Output path without extension.
+            fmt (str): 'csv', 'parquet' or 'arrow'.
+            sort_column (str, optional): Column to sort binary outputs by.
+            compression (str): Codec for binary outputs.
+            row_group_size (int): Rows per Parquet row group / Arrow record batch.
+            **csv_kwargs: Extra arguments for `DataFrame.to_csv`.
+
+        Returns:
+            str: The written file path.
+
+        Raises:
+            ValueError: If `fmt` is not supported.
+        """
+        if fmt not in FORMATS:
+            msg = f"Unsupported output format: {fmt}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        path = f"{path_base}.{FORMATS[fmt]}"
+
+        if fmt == 'csv':
+            df.to_csv(path, **{'index': False, **csv_kwargs})
+            return path
+
+        if sort_column in df.columns:
+            df = df.sort_values(sort_column, kind='stable')
+
+        table = to_arrow_table(df)
+
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(table, path, compression=compression, row_group_size=row_group_size)
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(table, path, compression=compression, chunksize=row_group_size)
+
+        return path
+
+    @classmethod
+    def list_tables(cls, input_path: str | Path) -> List[str]:
+        """
+        Return the trigger file, or the sorted trigger files of a directory.
+
+        Args:
+            input_path (str): File or directory of `.csv`/`.parquet`/`.arrow` files.
+
+        Returns:
+            list[str]: File paths.
+
+        Raises:
+            ValueError: If `input_path` is neither a file nor a directory.
+        """
+        path_type = cls.determine_input_type(input_path)
+
+        if path_type == 'dir':
+            return [
+                os.path.join(input_path, file)
+                for file in sorted(os.listdir(input_path))
+                if file.endswith(TABLE_EXTENSIONS)
+            ]
+
+        if path_type == 'file':
+            return [str(input_path)]
+
+        msg = 'Input path is neither path nor file'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    @classmethod
+    def iter_batches(cls, input_path: str | Path, batch_size: int = 100000) -> Iterator[pd.DataFrame]:
+        """
+        Yield triggers from a CSV/Parquet/Arrow file, or a directory of them, in batches.
+
+        Only one batch is held in memory at a time. CSV files are read with
+        `chunksize`; Parquet and Arrow IPC files are read by record batch with pyarrow.
+
+        Args:
+            input_path (str): File or directory of `.csv`/`.parquet`/`.arrow` files.
+            batch_size (int): Maximum rows per batch.
+
+        Yields:
+            pd.DataFrame: A batch of triggers.
+        """
+        for file in cls.list_tables(input_path):
+            if str(file).endswith('.parquet'):
+                yield from cls._iter_parquet_batches(file, batch_size)
+            elif str(file).endswith(('.arrow', '.feather')):
+                yield from cls._iter_arrow_batches(file, batch_size)
+            else:
+                yield from pd.read_csv(file, chunksize=batch_size)
+
+    @staticmethod
+    def _iter_parquet_batches(path: str | Path, batch_size: int) -> Iterator[pd.DataFrame]:
+        _import_pyarrow(f"Reading {path}")
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield batch.to_pandas()
+
+    @staticmethod
+    def _iter_arrow_batches(path: str | Path, batch_size: int) -> Iterator[pd.DataFrame]:
+        pa = _import_pyarrow(f"Reading {path}")
+
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+
+                for start in range(0, batch.num_rows, batch_size):
+                    yield batch.slice(start, batch_size).to_pandas()
+
+
+class BatchWriter:
+    """
+    Append DataFrame batches to one CSV, Parquet or Arrow IPC file.
+
+    The CSV header is written with the first batch only. Parquet batches are
+    written as row groups and Arrow batches as record batches, all cast to
+    the schema of the first batch; Arrow IPC files store label columns as
+    plain strings since they cannot change dictionaries between batches.
+
+    Attributes:
+        path (str): Output file path.
+        fmt (str): 'csv', 'parquet' or 'arrow'.
+        compression (str): Codec for binary outputs.
+        n_rows (int): Rows written so far.
+
+    Methods:
+        write(df): Append a batch.
+        close(): Finish the file.
+    """
+    def __init__(self, path_base: str | Path, fmt: str = 'csv', compression: str = 'zstd') -> None:
+        if fmt not in FORMATS:
+            msg = f"Unsupported output format: {fmt}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.path = f"{path_base}.{FORMATS[fmt]}"
+        self.fmt = fmt
+        self.compression = compression
+        self.n_rows = 0
+
+        self._file = None
+        self._writer = None
+        self._schema = None
+
+    def __enter__(self) -> 'BatchWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Append a batch of triggers to the output.
+
+        Args:
+            df (pd.DataFrame): Batch to append.
+        """
+        if self.fmt == 'csv':
+            header = self._file is None
+
+            if header:
+                self._file = open(self.path, 'w', newline='')
+
+            df.to_csv(self._file, header=header, index=False)
+            self._file.flush()
+
+        else:
+            pa = _import_pyarrow("Arrow output")
+            import pyarrow.parquet as pq
+
+            table = to_arrow_table(df)
+
+            if self._writer is None:
+                self._schema = table.schema
+
+                if self.fmt == 'arrow':
+                    # IPC files allow one dictionary per field, so labels are stored plain
+                    self._schema = pa.schema([
+                        field.with_type(field.type.value_type) if pa.types.is_dictionary(field.type) else field
+                        for field in self._schema
+                    ])
+
+                if self.fmt == 'parquet':
+                    self._writer = pq.ParquetWriter(self.path, self._schema, compression=self.compression)
+                else:
+                    options = pa.ipc.IpcWriteOptions(compression=self.compression)
+                    self._writer = pa.ipc.new_file(self.path, self._schema, options=options)
+
+            self._writer.write_table(table.cast(self._schema))
+
+        self.n_rows += len(df)
+
+    def close(self) -> None:
+        """
+        Flush and close the output file.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
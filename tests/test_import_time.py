@@ -0,0 +1,14 @@
+import pytest
+
+from pinch.benchmarks.harness import IMPORT_TARGETS, measure_import
+
+# entry points import in well under a second; the budget leaves room for slow CI machines
+IMPORT_BUDGET_SECONDS = 5.0
+
+
+@pytest.mark.parametrize('module', IMPORT_TARGETS)
+def test_entry_point_imports_lazily(module):
+    record = measure_import(module, repeats=1)
+
+    assert record['eager'] == []
+    assert record['seconds'] < IMPORT_BUDGET_SECONDS